@@ -0,0 +1,1585 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import os
+import sys
+import re
+import io
+import json
+import hashlib
+import contextlib
+import time
+import random
+import argparse
+import tracemalloc
+import tempfile
+import unicodedata
+from pathlib import Path
+from html.parser import HTMLParser
+
+import extract_site_products as esp
+
+
+def legacy_clean_text(text):
+    """최적화 이전의 ProductExtractor.clean_text (결과 비교 기준)"""
+    # HTML 엔티티 정리
+    text = text.replace('&nbsp;', ' ').replace('&amp;', '&')
+    text = text.replace('&lt;', '<').replace('&gt;', '>')
+    text = text.replace('&quot;', '"').replace('&apos;', "'")
+
+    # 유니코드 정규화
+    text = unicodedata.normalize('NFKC', text)
+
+    # 불필요한 문자 제거
+    text = re.sub(r'[\r\n\t]+', ' ', text)  # 개행문자를 공백으로
+    text = re.sub(r'\s+', ' ', text)       # 연속 공백을 하나로
+
+    # 앞뒤 공백 및 특수문자 제거
+    text = text.strip(' \t\n\r\f\v｜|[]()<>{}"\'')
+
+    # 인코딩이 깨진 텍스트 필터링 강화
+    if len(text) > 0:
+        # 1. null 문자나 제어 문자 제거
+        text = re.sub(r'[\x00-\x08\x0B\x0C\x0E-\x1F\x7F]', '', text)
+
+        # 2. 깨진 문자 비율 계산 (의미있는 문자 외의 특수문자)
+        broken_chars = len(re.findall(r'[^\w\s가-힣぀-ゟ゠-ヿ一-龯\-\(\)\[\]\.\,\:\;\'\"\/]', text))
+        total_chars = len(text)
+        broken_ratio = broken_chars / total_chars if total_chars > 0 else 0
+
+        # 3. 깨진 문자가 25% 이상이면 제거 (더 엄격하게)
+        if broken_ratio > 0.25:
+            return ""
+
+        # 4. 연속된 특수문자 체크
+        if re.search(r'[^\w\s가-힣぀-ゟ゠-ヿ一-龯]{5,}', text):
+            return ""
+
+        # 5. 의미있는 텍스트가 너무 짧으면 제거
+        meaningful_chars = len(re.findall(r'[\w가-힣぀-ゟ゠-ヿ一-龯]', text))
+        if meaningful_chars < 3:
+            return ""
+
+    return text
+
+
+def legacy_is_potential_gunpla(site_name, text):
+    """최적화 이전의 ProductExtractor.is_potential_gunpla (결과 비교 기준)"""
+    if len(text) < 3 or len(text) > 150:
+        return False
+
+    exclude_patterns = [
+        r'cookie', r'copyright', r'privacy', r'terms',
+        r'navigation', r'menu', r'search', r'login',
+        r'카트', r'장바구니', r'회원', r'로그인',
+        r'주문', r'결제', r'배송', r'문의',
+        r'\d{4}-\d{2}-\d{2}',
+        r'^[\d\s\-\.]+$',
+        r'^[가-힣]{1,2}$',
+        r'다운로드', r'업로드', r'페이지', r'사이트',
+        r'링크', r'클릭', r'버튼', r'메뉴'
+    ]
+    for pattern in exclude_patterns:
+        if re.search(pattern, text, re.IGNORECASE):
+            return False
+
+    primary_keywords, secondary_keywords, model_keywords = esp.SITE_KEYWORDS.get(site_name, esp.DEFAULT_SITE_KEYWORDS)
+    text_lower = text.lower()
+    has_primary = any(keyword.lower() in text_lower for keyword in primary_keywords)
+    has_scale = re.search(r'1/(?:144|100|60|48)', text)
+    has_brand = any(keyword.lower() in text_lower for keyword in secondary_keywords)
+    has_model = any(keyword.lower() in text_lower for keyword in model_keywords)
+
+    score = 0
+    if has_primary: score += 3
+    if has_scale and has_brand: score += 2
+    elif has_scale or has_brand: score += 1
+    if has_model: score += 1
+    if re.search(r'(HG|RG|MG|PG|RE)\s+1/\d+', text, re.IGNORECASE):
+        score += 2
+    return score >= 1
+
+
+def legacy_quality_score(text):
+    """최적화 이전의 validate_and_filter_products 품질 점수 (결과 비교 기준)"""
+    quality_score = 0
+    if re.search(r'(HG|RG|MG|PG|RE)\s+1/\d+\s+\S+', text, re.IGNORECASE):
+        quality_score += 5
+    if re.search(r'1/(?:144|100|60|48)', text):
+        quality_score += 2
+    if re.search(r'\b(HG|RG|MG|PG|RE)\b', text, re.IGNORECASE):
+        quality_score += 2
+    if any(term in text for term in ['건담', '건프라', '프라모델', '모빌슈트']):
+        quality_score += 1
+    model_terms = ['스트라이크', '유니콘', '엑시아', '프리덤', '발바토스', '자쿠', '짐', '샤아', '큐베레이', '노이에질', '지온', '아무로', '데스티니', '임펄스', '저스티스', '세라비']
+    if any(term in text for term in model_terms):
+        quality_score += 1
+    return quality_score
+
+
+def legacy_should_include_as_reference(text):
+    """최적화 이전의 ProductExtractor.should_include_as_reference (결과 비교 기준)"""
+    if len(text) > 80:
+        return False
+    if re.search(r'(HG|RG|MG|PG|RE)', text):
+        korean_words = re.findall(r'[가-힣]{2,}', text)
+        if korean_words and len(korean_words) >= 1:
+            return True
+    has_brand = bool(re.search(r'(HG|RG|MG|PG|RE)', text))
+    has_scale = bool(re.search(r'1/\d+', text))
+    korean_words = re.findall(r'[가-힣]{2,}', text)
+    has_korean_model = len(korean_words) >= 1
+    if has_brand and has_scale and has_korean_model:
+        return True
+    has_japanese = bool(re.search(r'[\u3040-\u309f\u30a0-\u30ff\u4e00-\u9faf]', text))
+    if has_japanese and has_korean_model and has_brand:
+        return True
+    return False
+
+
+def legacy_is_binary_file(file_path, sample_size=1024):
+    """최적화 이전의 is_binary_file (앞 1KB를 UTF-8/CP949로만 디코딩)"""
+    try:
+        with open(file_path, 'rb') as f:
+            sample = f.read(sample_size)
+        if b'\x00' in sample:
+            return True
+        try:
+            sample.decode('utf-8')
+            return False
+        except UnicodeDecodeError:
+            try:
+                sample.decode('cp949')
+                return False
+            except UnicodeDecodeError:
+                return True
+    except Exception:
+        return True
+
+
+def legacy_read_html_content(html_file):
+    """최적화 이전의 HTML 읽기 (파일 2회 읽기, chardet는 파일 전체에 적용)"""
+    if legacy_is_binary_file(html_file):
+        return None
+    file_size = Path(html_file).stat().st_size
+    if file_size > 10 * 1024 * 1024:
+        return None
+    with open(html_file, 'rb') as f:
+        raw_content = f.read()
+    if len(raw_content) == 0:
+        return None
+    head_content = raw_content[:10240].decode('utf-8', errors='ignore')
+    detected_encoding = esp.detect_encoding_from_meta(head_content)
+    if not detected_encoding and esp.HAS_CHARDET:
+        try:
+            result = esp.chardet.detect(raw_content)
+            detected_encoding = result['encoding']
+            if result.get('confidence', 0) < 0.7:
+                detected_encoding = None
+        except Exception:
+            pass
+    if not detected_encoding:
+        detected_encoding = 'utf-8'
+    try:
+        content = raw_content.decode(detected_encoding)
+    except (UnicodeDecodeError, LookupError):
+        for fallback_encoding in ['utf-8', 'cp949', 'euc-kr', 'iso-8859-1']:
+            try:
+                content = raw_content.decode(fallback_encoding, errors='ignore')
+                break
+            except (UnicodeDecodeError, LookupError):
+                continue
+        else:
+            content = raw_content.decode('utf-8', errors='ignore')
+    if len(content.strip()) < 100:
+        return None
+    return content
+
+
+class TextChunkCollector(HTMLParser):
+    """handle_data로 들어오는 텍스트 조각을 그대로 수집"""
+
+    def __init__(self):
+        super().__init__()
+        self.chunks = []
+
+    def handle_data(self, data):
+        self.chunks.append(data)
+
+
+def load_text_chunks(mirror_dir, max_files=0):
+    """미러 디렉터리의 HTML에서 handle_data 텍스트 조각 수집"""
+    chunks = []
+    file_count = 0
+    for html_file in esp.iter_html_files(mirror_dir):
+        content = esp.read_html_content(html_file)
+        if content is None:
+            continue
+        collector = TextChunkCollector()
+        collector.feed(content)
+        chunks.extend(collector.chunks)
+        file_count += 1
+        if max_files and file_count >= max_files:
+            break
+    return chunks, file_count
+
+
+# 무작위 비교용 문자 집합 (ASCII, 공백/제어 문자, 엔티티, 전각, 가나, 한글, 한자, 기호, 결합 문자)
+RANDOM_TEXT_POOLS = [
+    'abcXYZ019_-()[].,:;\'"/|<>{}!?@#$%^*+=~`',
+    ' \t\n\r\f\v\x0b\x0c\x1c\x1d\x1e\x1f\x85\xa0 　 ',
+    '\x00\x01\x07\x08\x0e\x1b\x7f',
+    '｜（）［］ＡＢＣ１２３／＆＿',
+    'あいうゃゝゞアイウーヽヾ・゠ｱｲｳﾞﾟ',
+    '가각힣ㄱㅏ건담프라',
+    '一丁鿯龠々〆〇',
+    '★☆◆◇■□●○※→←↑↓♪♥',
+    '̸゙゚́̈',
+]
+RANDOM_TEXT_FRAGMENTS = ['&nbsp;', '&amp;', '&lt;', '&gt;', '&quot;', '&apos;', '&amp;lt;', 'HG 1/144 ', 'ガンダム', '건담']
+# 분류 비교용 조각 (브랜드/스케일/날짜/키워드 경계 사례)
+CLASSIFY_TEXT_FRAGMENTS = [
+    'HG', 'hg', 'Rg', 'RE/100', 'RE', 'MGEX', 'HGUC', 'PG', '_HG_', 'xHGx', ' ', '  ', '\t', '_', '-', '/',
+    '1/144', '1/100', '1/60', '1/48', '1/1440', '1/1', '1/', '11/144', '1/2024-01-01', '2024-01-01', '123-45',
+    '건담', '건프라', '스트라이크', '유니콘', '자쿠', '짐', '가', '로그인', '메뉴', '회원',
+    'ガンダム', 'ガンダムX', 'ウイングガンダム', 'ザク', 'ジム', 'モビルスーツ', 'MS', 'ms',
+    'Gundam', 'gundam', 'Wing Gundam', 'GM', 'Char', 'Neue Ziel', 'menu', 'Cookie', 'SEARCH',
+    'フリーダム', '프리덤', '一', '字', '.', '...', '０', '١٤٤',
+]
+
+
+def random_text(rng):
+    """clean_text 비교용 무작위 문자열 생성"""
+    parts = []
+    for _ in range(rng.randint(0, 12)):
+        if rng.random() < 0.2:
+            parts.append(rng.choice(RANDOM_TEXT_FRAGMENTS))
+        else:
+            pool = rng.choice(RANDOM_TEXT_POOLS)
+            parts.append(''.join(rng.choice(pool) for _ in range(rng.randint(1, 6))))
+    return ''.join(parts)
+
+
+def random_classify_text(rng):
+    """분류 비교용 무작위 문자열 생성"""
+    return ''.join(rng.choice(CLASSIFY_TEXT_FRAGMENTS) for _ in range(rng.randint(1, 8)))
+
+
+def verify_clean_text(samples, label):
+    """legacy_clean_text와 결과가 완전히 같은지 확인"""
+    extractor = esp.ProductExtractor('benchmark')
+    mismatches = 0
+    for text in samples:
+        expected = legacy_clean_text(text)
+        actual = extractor.clean_text(text)
+        if expected != actual:
+            mismatches += 1
+            if mismatches <= 5:
+                print(f"  불일치: {text!r} -> 기존 {expected!r}, 신규 {actual!r}")
+    print(f"{label}: {len(samples)}개 비교, 불일치 {mismatches}개")
+    return mismatches == 0
+
+
+def time_chunks(func, chunks, repeat):
+    """chunks/sec 측정 (repeat회 중 최고값)"""
+    best = 0.0
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for chunk in chunks:
+            func(chunk)
+        elapsed = time.perf_counter() - start
+        if elapsed > 0:
+            best = max(best, len(chunks) / elapsed)
+    return best
+
+
+def bench_clean_text(args):
+    """clean_text 처리량 측정 + 기존 구현과의 결과 동일성 검증"""
+    ok = True
+
+    rng = random.Random(args.seed)
+    samples = [random_text(rng) for _ in range(args.samples)]
+    ok &= verify_clean_text(samples, "무작위 문자열")
+
+    if args.mirror_dir:
+        chunks, file_count = load_text_chunks(args.mirror_dir, args.max_files)
+        print(f"{args.mirror_dir}: HTML {file_count}개, 텍스트 조각 {len(chunks)}개")
+        if not chunks:
+            print("측정할 텍스트 조각이 없습니다 (미러 디렉토리 경로 확인)")
+            return 1
+        ok &= verify_clean_text(chunks, "코퍼스 텍스트 조각")
+    else:
+        chunks = samples
+
+    extractor = esp.ProductExtractor('benchmark')
+
+    def uncached(text):
+        return esp._clean_text(text)
+
+    def cached(text):
+        return extractor.clean_text(text)
+
+    legacy_rate = time_chunks(legacy_clean_text, chunks, args.repeat)
+    uncached_rate = time_chunks(uncached, chunks, args.repeat)
+    esp._clean_text_cached.cache_clear()
+    # 캐시는 첫 회차부터 누적되므로 1회만 측정 (콜드 → 반복 템플릿 적중)
+    cached_rate = time_chunks(cached, chunks, 1)
+
+    print("\n=== clean_text 처리량 (chunks/sec) ===")
+    print(f"기존 구현: {legacy_rate:,.0f}")
+    print(f"단일 패스: {uncached_rate:,.0f} ({uncached_rate / legacy_rate:.2f}x)")
+    print(f"단일 패스 + LRU 캐시: {cached_rate:,.0f} ({cached_rate / legacy_rate:.2f}x)")
+    print(f"캐시 통계: {esp._clean_text_cached.cache_info()}")
+
+    return 0 if ok else 1
+
+
+CLASSIFY_SITES = list(esp.SITE_KEYWORDS) + ['dalong', 'gundaminfo']
+
+
+def verify_classifier(samples, label):
+    """SiteClassifier 결과가 기존 정규식 기반 판정과 같은지 확인"""
+    mismatches = 0
+    for site_name in CLASSIFY_SITES:
+        classifier = esp.get_site_classifier(site_name)
+        for text in samples:
+            expected = (legacy_is_potential_gunpla(site_name, text), legacy_quality_score(text),
+                        legacy_should_include_as_reference(text))
+            actual = (classifier.is_potential_gunpla(text), classifier.quality_score(text),
+                      classifier.should_include_as_reference(text))
+            if expected != actual:
+                mismatches += 1
+                if mismatches <= 5:
+                    print(f"  불일치 [{site_name}]: {text!r} -> 기존 {expected}, 신규 {actual}")
+    print(f"{label}: {len(samples)}개 x 사이트 {len(CLASSIFY_SITES)}개 비교, 불일치 {mismatches}개")
+    return mismatches == 0
+
+
+def bench_classify(args):
+    """is_potential_gunpla + 품질 점수 처리량 측정 및 결과 동일성 검증"""
+    ok = True
+
+    rng = random.Random(args.seed)
+    samples = [random_classify_text(rng) for _ in range(args.samples)]
+    ok &= verify_classifier(samples, "무작위 문자열")
+
+    if args.mirror_dir:
+        chunks, file_count = load_text_chunks(args.mirror_dir, args.max_files)
+        extractor = esp.ProductExtractor(args.site_name)
+        texts = [text for text in (extractor.clean_text(chunk) for chunk in chunks) if text]
+        print(f"{args.mirror_dir}: HTML {file_count}개, 정제된 텍스트 {len(texts)}개")
+        if not texts:
+            print("측정할 텍스트가 없습니다 (미러 디렉토리 경로 확인)")
+            return 1
+        ok &= verify_classifier(texts, "코퍼스 텍스트")
+    else:
+        texts = samples
+
+    def legacy(text):
+        if legacy_is_potential_gunpla(args.site_name, text):
+            legacy_quality_score(text)
+
+    def compiled(text):
+        classifier = esp.get_site_classifier(args.site_name)
+        if classifier.is_potential_gunpla(text):
+            classifier.quality_score(text)
+
+    legacy_rate = time_chunks(legacy, texts, args.repeat)
+    # 분류 엔진 컴파일과 문자열 캐시를 비운 상태에서 1회 측정
+    esp.get_site_classifier.cache_clear()
+    compiled_rate = time_chunks(compiled, texts, 1)
+
+    print(f"\n=== 판정 + 품질 점수 처리량 (texts/sec, {args.site_name}) ===")
+    print(f"기존 구현: {legacy_rate:,.0f}")
+    print(f"분류 엔진: {compiled_rate:,.0f} ({compiled_rate / legacy_rate:.2f}x)")
+
+    return 0 if ok else 1
+
+
+# 기존 dict 후보의 source/confidence 문자열 (코드 상수로 공유되던 값)
+LEGACY_SOURCE_NAMES = {source: source.name.lower() for source in esp.Source}
+LEGACY_CONFIDENCE_NAMES = {confidence: confidence.name.lower() for confidence in esp.Confidence}
+
+
+def legacy_candidate_dict(product, file_paths):
+    """후보 레코드를 최적화 이전의 dict 형태로 변환 (파일 경로 문자열은 파일 단위로 공유)"""
+    return {
+        'text': product.text,
+        'source': LEGACY_SOURCE_NAMES[product.source],
+        'tag': product.tag,
+        'confidence': LEGACY_CONFIDENCE_NAMES[product.confidence],
+        'file': file_paths[product.file_index],
+        'quality_score': product.quality_score,
+        'is_high_quality': product.is_high_quality,
+    }
+
+
+def measure_candidates(mirror_dir, site_name, as_dict):
+    """검증을 통과한 후보 전체를 보관했을 때의 메모리(tracemalloc) 측정"""
+    file_paths = []
+    stats = esp.ExtractionStats()
+    tracemalloc.start()
+    products = esp.process_mirror_directory(mirror_dir, site_name, stats, file_paths)
+    validated = esp.validate_and_filter_products(products, site_name, stats)
+    if as_dict:
+        kept = [legacy_candidate_dict(product, file_paths) for product in validated]
+    else:
+        kept = list(validated)
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return len(kept), current, peak
+
+
+def bench_memory(args):
+    """후보 레코드(__slots__)와 기존 dict 후보의 메모리 사용량 비교"""
+    results = []
+    for label, as_dict in (("dict 후보 (기존)", True), ("slots 레코드", False)):
+        # 두 측정이 같은 조건이 되도록 캐시를 비우고 시작
+        esp._clean_text_cached.cache_clear()
+        esp.get_site_classifier.cache_clear()
+        count, current, peak = measure_candidates(args.mirror_dir, args.site_name, as_dict)
+        results.append((label, count, current, peak))
+
+    print(f"\n=== 후보 {results[0][1]:,}개 보관 시 메모리 ({args.site_name}) ===")
+    for label, count, current, peak in results:
+        print(f"{label}: 보관 {current / 1024 / 1024:,.1f}MB (후보당 {current / max(count, 1):,.0f}B), "
+              f"최대 {peak / 1024 / 1024:,.1f}MB")
+    baseline = results[0][2]
+    print(f"감소율: {(baseline - results[1][2]) / max(baseline, 1) * 100:.1f}%")
+    return 0
+
+
+def time_reads(read, html_files):
+    """HTML 파일 전체를 읽는 데 걸린 시간과 읽은(None이 아닌) 파일 수"""
+    start = time.perf_counter()
+    contents = [read(html_file) for html_file in html_files]
+    return time.perf_counter() - start, contents
+
+
+def bench_read(args):
+    """HTML 읽기/인코딩 감지 처리량 측정 (기존 구현, 캐시 없음, 캐시 적중)"""
+    html_files = list(esp.iter_html_files(args.mirror_dir))
+    if args.max_files:
+        html_files = html_files[:args.max_files]
+
+    legacy_time, legacy_contents = time_reads(legacy_read_html_content, html_files)
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        with esp.ExtractionCache(str(Path(tmp_dir) / 'extract_cache.db')) as cache:
+            cold_time, contents = time_reads(lambda html_file: esp.read_html_content(html_file, cache), html_files)
+            warm_time, warm_contents = time_reads(lambda html_file: esp.read_html_content(html_file, cache), html_files)
+
+    # 기존 구현이 읽은 파일은 같은 내용으로 읽어야 함 (잘린 멀티바이트 문자로 바이너리 오판되던 파일은 추가로 읽힘)
+    mismatches = sum(1 for old, new in zip(legacy_contents, contents) if old is not None and old != new)
+    mismatches += sum(1 for cold, warm in zip(contents, warm_contents) if cold != warm)
+    legacy_read = sum(1 for content in legacy_contents if content is not None)
+    new_read = sum(1 for content in contents if content is not None)
+
+    print(f"\n=== HTML 읽기 처리량 (files/sec, {len(html_files)}개, chardet {'사용' if esp.HAS_CHARDET else '없음'}) ===")
+    print(f"기존 구현: {len(html_files) / legacy_time:,.0f} (읽은 파일 {legacy_read}개)")
+    print(f"단일 읽기: {len(html_files) / cold_time:,.0f} ({legacy_time / cold_time:.2f}x, 읽은 파일 {new_read}개)")
+    print(f"캐시 적중: {len(html_files) / warm_time:,.0f} ({legacy_time / warm_time:.2f}x)")
+    print(f"내용 불일치: {mismatches}개")
+    return 0 if mismatches == 0 else 1
+
+
+def extract_candidates(content, site_name, backend):
+    """한 페이지를 지정한 백엔드로 추출한 후보 목록 (비교용 튜플)"""
+    extractor = esp.ProductExtractor(site_name, backend=backend)
+    extractor.feed(content)
+    return [(product.text, product.source, product.tag, product.confidence) for product in extractor.products]
+
+
+def bench_backends(args):
+    """HTML 백엔드별 처리량(pages/sec) 측정 및 html.parser와 후보 동일성 검증"""
+    contents = []
+    for html_file in esp.iter_html_files(args.mirror_dir):
+        content = esp.read_html_content(html_file)
+        if content is not None:
+            contents.append(content)
+        if args.max_files and len(contents) >= args.max_files:
+            break
+    print(f"{args.mirror_dir}: 페이지 {len(contents)}개, 사이트 {args.site_name}")
+    if not contents:
+        # gcd처럼 JSON만 있는 사이트는 HTML 백엔드를 측정할 페이지가 없음
+        print("측정할 HTML 페이지가 없습니다")
+        return 1
+
+    reference = [extract_candidates(content, args.site_name, esp.DEFAULT_HTML_BACKEND) for content in contents]
+    ok = True
+    rates = {}
+    for backend in esp.HTML_BACKENDS:
+        # 정제/분류 캐시는 백엔드와 무관하게 같은 상태에서 측정
+        best = float('inf')
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            results = [extract_candidates(content, args.site_name, backend) for content in contents]
+            best = min(best, time.perf_counter() - start)
+        rates[backend] = len(contents) / best
+
+        mismatches = [index for index, (expected, actual) in enumerate(zip(reference, results)) if expected != actual]
+        print(f"{backend}: 후보 불일치 페이지 {len(mismatches)}개")
+        for index in mismatches[:3]:
+            missing = [c for c in reference[index] if c not in results[index]]
+            extra = [c for c in results[index] if c not in reference[index]]
+            print(f"  페이지 {index}: 누락 {missing[:3]}, 추가 {extra[:3]}")
+        ok &= not mismatches
+
+    print(f"\n=== HTML 백엔드별 처리량 (pages/sec) ===")
+    for backend, rate in rates.items():
+        print(f"{backend}: {rate:,.0f} ({rate / rates[esp.DEFAULT_HTML_BACKEND]:.2f}x)")
+    unavailable = [name for name in ('lxml',) if name not in esp.HTML_BACKENDS]
+    if unavailable:
+        print(f"설치되지 않은 백엔드: {', '.join(unavailable)}")
+    return 0 if ok else 1
+
+
+def legacy_get_product_name_from_file(file_path):
+    """기존 상세 페이지 파서 (줄마다 NFKC 정규화 + 최대 5번 re.search, 파일 끝까지 읽음)"""
+    product_name = ""
+    brand = ""
+    scale = ""
+    year = ""
+
+    with file_path.open("r", encoding="utf-8") as infile:
+        for line in infile:
+            line = unicodedata.normalize('NFKC', line)
+
+            m = re.search(r'<h2 class="el_title"><span>(?P<scale>1/\d{1,4})\s*(?P<product_name>.+)</span></h2>', line)
+            if m:
+                brand = ""
+                scale = m.group("scale")
+                scale = re.sub(r"/", "_", scale)
+                product_name = m.group("product_name")
+                year = ""
+                continue
+
+            m = re.search(r'<h2 class="el_title"><span>(?P<brand>30MM|30MS|30MF|SDW HEROES|Figure-rise Standard|SDガンダム EX|SDガンダム|SDBD:R|SDBF|SDBD|ADVANCE OF Z|BB戦士|HGBF|HGBC|FULL MECHANICS|HGBD:R|HGBD|HGFC|ENTRY GRADE|RE/?100|HGAC|HGCE|EXPO|MGSD|HGCC|HGAW|HGUC|MGEX|RG|MG|PG|HG).*(?P<scale>1/\d{1,4})[ \u3000\xa0\s]*(?P<product_name>.+)</span></h2>', line)
+            if m:
+                brand = m.group("brand")
+                brand = unicodedata.normalize('NFKC', re.sub(r'[“”"]', '\'', brand))
+                brand = re.sub(r"RE/100", "RE100", brand)
+                scale = m.group("scale")
+                scale = re.sub(r"/", "_", scale)
+                product_name = m.group("product_name")
+                year = ""
+                continue
+
+            m = re.search(r'<h2 class="el_title"><span>(?P<brand>30MM|30MS|30MF|SDW HEROES|Figure-rise Standard|SDガンダム EX|SDガンダム|SDBD:R|SDBF|SDBD|ADVANCE OF Z|BB戦士|HGBF|HGBC|FULL MECHANICS|HGBD:R|HGBD|HGFC|ENTRY GRADE|RE/?100|HGAC|HGCE|EXPO|MGSD|HGCC|HGAW|HGUC|MGEX|RG|MG|PG|HG)[ \u3000\xa0\s]*(?P<product_name>.+)</span></h2>', line)
+            if m:
+                brand = m.group("brand")
+                brand = unicodedata.normalize('NFKC', re.sub(r'[“”"]', '\'', brand))
+                brand = re.sub(r"RE/100", "RE100", brand)
+                scale = ""
+                product_name = m.group("product_name")
+                year = ""
+                continue
+
+            m = re.search(r'<h2 class="el_title"><span>(?P<product_name>.+)</span></h2>', line)
+            if m:
+                brand = ""
+                scale = ""
+                product_name = m.group("product_name")
+                year = ""
+                continue
+
+            m = re.search(r'<dd class="bl_detail_box_txt">(?P<year>(19|20)\d\d)年.*</dd>', line)
+            if m:
+                year = m.group("year")
+
+    return product_name, brand, scale, year
+
+
+DETAIL_TITLE_TEXTS = ['HG 1/144 ガンダム', 'HGUC 1/144 ザクII', 'ＨＧ　１／１４４　ガンダムエアリアル', 'RE/100 ナイチンゲール',
+                      'RE100 ガンダム', 'SDガンダム EX スタンダード', 'MGEX ストライクフリーダム', 'MG 1/100 ν', '1/100 ガンダムX',
+                      '１／６０ PG ユニコーン', 'HGUC', 'HG', 'ENTRY GRADE RX-78-2', 'HGBD:R 1/144 コアガンダム', 'BB戦士 三国伝',
+                      'ガンダム', 'HG 1/144', 'Figure-rise Standard 1/48 アスナ', '30MM 1/144 eEXM-17', 'HG "ガンダム"']
+DETAIL_LINE_PARTS = ['<h2 class="el_title"><span>{title}</span></h2>', '<h2 class="el_title"><span>{title}</span>',
+                     '<div class="el_title">{title}</div>', '<dd class="bl_detail_box_txt">{year}年{month}月</dd>',
+                     '<dd class="bl_detail_box_txt">{year}年</dd>', '<dd class="bl_detail_box_txt">未定</dd>',
+                     '<dd class="bl_detail_box_txt">１９９９年１月</dd>', '<p>本文 el_title bl_detail_box_txt</p>', '<p>{title}</p>', '']
+DETAIL_NEWLINES = ['\n', '\n', '\r\n', '\r']
+
+
+def random_detail_page(rng):
+    """줄 구성/개행/전각 문자/상품명 줄 수를 무작위로 섞은 상세 페이지"""
+    lines = []
+    for _ in range(rng.randint(0, 12)):
+        parts = rng.sample(DETAIL_LINE_PARTS, rng.randint(1, 2))
+        lines.append(''.join(part.format(title=rng.choice(DETAIL_TITLE_TEXTS), year=rng.randint(1980, 2030), month=rng.randint(1, 12))
+                             for part in parts))
+    return ''.join(line + rng.choice(DETAIL_NEWLINES) for line in lines).encode('utf-8')
+
+
+def bench_detail(args):
+    """상세 페이지 파서 처리량 측정 + 기존 구현과 결과 비교 (미러 전체 + 무작위 페이지)"""
+    # requests 의존성이 있는 변환 스크립트는 이 측정에서만 불러옴
+    from convert_bandai_product_ja2ko import get_product_name_from_file
+
+    mismatches = 0
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        rng = random.Random(args.seed)
+        sample_path = Path(tmp_dir) / 'sample.html'
+        for _ in range(args.samples):
+            sample_path.write_bytes(random_detail_page(rng))
+            expected = legacy_get_product_name_from_file(sample_path)
+            actual = get_product_name_from_file(sample_path)
+            if expected != actual:
+                mismatches += 1
+                if mismatches <= 5:
+                    print(f"불일치 (무작위): {sample_path.read_bytes()!r}\n  기존: {expected}\n  신규: {actual}")
+    print(f"무작위 페이지 {args.samples}개 비교: 불일치 {mismatches}개")
+
+    if not args.detail_dir:
+        return 0 if mismatches == 0 else 1
+
+    file_paths = sorted(path for path in Path(args.detail_dir).iterdir() if path.is_file())
+    legacy_time = new_time = float('inf')
+    for _ in range(args.repeat):
+        start = time.perf_counter()
+        expected = [legacy_get_product_name_from_file(path) for path in file_paths]
+        legacy_time = min(legacy_time, time.perf_counter() - start)
+        start = time.perf_counter()
+        actual = [get_product_name_from_file(path) for path in file_paths]
+        new_time = min(new_time, time.perf_counter() - start)
+
+    for path, old, new in zip(file_paths, expected, actual):
+        if old != new:
+            mismatches += 1
+            print(f"불일치: {path}\n  기존: {old}\n  신규: {new}")
+
+    print(f"\n=== 상세 페이지 파서 처리량 (files/sec, {len(file_paths)}개) ===")
+    print(f"기존 구현: {len(file_paths) / legacy_time:,.0f}")
+    print(f"신규 구현: {len(file_paths) / new_time:,.0f} ({legacy_time / new_time:.2f}x)")
+    print(f"결과 불일치: {mismatches}개")
+    return 0 if mismatches == 0 else 1
+
+
+def legacy_convert_ja_to_ko(translation_data, product_name, brand, scale):
+    """기존 번역 검색 (정확한 키 4가지만 시도)"""
+    product_name = unicodedata.normalize('NFKC', re.sub(r'[“”"]', '\'', product_name))
+    brand = unicodedata.normalize('NFKC', re.sub(r'[“”"]', '\'', brand))
+    for key in (product_name + " " + brand + " " + scale, product_name + " " + brand, product_name + " " + scale, product_name):
+        if key in translation_data:
+            result = translation_data[key]
+            if result:
+                return re.sub(r'[/"]', '', result), "success"
+            return "", "empty"
+    return product_name, "not_found"
+
+
+# 가나 표기 흔들림 (유사 일치 질의 생성용)
+KANA_VARIANTS = [('ヴァ', 'バ'), ('ヴィ', 'ビ'), ('ヴェ', 'ベ'), ('ウィ', 'ウイ'), ('ウイ', 'ウィ'), ('ティ', 'テイ'),
+                 ('ディ', 'デイ'), ('ェ', 'エ'), ('ヴ', 'ブ'), ('ュ', 'ユ')]
+
+
+def enlarge_mapping(translation_data, size):
+    """실제 매핑 키에 형식번호/색상 접미사를 붙여 size개까지 늘린 매핑"""
+    mapping = dict(translation_data)
+    keys = sorted(translation_data)
+    n = 0
+    while len(mapping) < size:
+        key = keys[n % len(keys)]
+        suffix = n // len(keys) + 1
+        mapping[f"{key}(カラー{suffix})"] = f"{translation_data[key]} (컬러 {suffix})" if translation_data[key] else ""
+        n += 1
+    return mapping
+
+
+def same_translation(a, b):
+    """번역 비교 (대소문자/띄어쓰기/하이픈과 변환 시 지우는 문자 차이는 무시 - 정규화 키가 무시하는 차이)"""
+    return re.sub(r'[\s/"\-]', '', a).lower() == re.sub(r'[\s/"\-]', '', b).lower()
+
+
+def bench_translate_holdout(translation_data, holdout, seed, threshold):
+    """
+    매핑 일부를 빼고 만든 인덱스로 뺀 키를 다시 검색해 정규화/유사 일치가 고른 번역이 맞는지 확인
+    (빠진 상품이 다른 상품의 번역으로 잘못 연결되는지 보는 정밀도 검사)
+    키를 holdout 비율 크기의 묶음으로 나눠 묶음마다 한 번씩 빼므로 모든 키를 한 번씩 검사 → 다른 번역으로 일치한 수
+    """
+    from convert_bandai_product_ja2ko import TranslationIndex
+
+    rng = random.Random(seed)
+    keys = sorted(key for key in translation_data if translation_data[key])
+    rng.shuffle(keys)
+    folds = max(2, round(1 / holdout))
+
+    counts = {'canonical': [0, 0], 'fuzzy': [0, 0]}
+    wrong = []
+    for fold in range(folds):
+        held_out = keys[fold::folds]
+        held_out_set = set(held_out)
+        index = TranslationIndex({key: value for key, value in translation_data.items() if key not in held_out_set}, threshold)
+        for key in held_out:
+            match = index.lookup(key, '', '')
+            if match is None or match[1] == 'exact':
+                continue
+            translation = index.translation_data[match[0]]
+            correct = same_translation(translation, translation_data[key])
+            counts[match[1]][0 if correct else 1] += 1
+            if not correct:
+                wrong.append((match[1], key, match[0], translation, translation_data[key]))
+
+    print(f"\n=== 보류 검사 (번역이 있는 키 {len(keys):,}개를 {folds}묶음으로 나눠 묶음마다 빼고 검색) ===")
+    for match_type, (correct, incorrect) in counts.items():
+        print(f"{match_type:9s} 일치 {correct + incorrect:,}개: 같은 번역 {correct:,}개, 다른 번역 {incorrect:,}개")
+    for match_type, key, matched_key, translation, expected in wrong[:10]:
+        print(f"  {match_type}: {key} → {matched_key} ({translation}, 매핑: {expected})")
+    return len(wrong)
+
+
+def bench_translate(args):
+    """
+    번역 매핑 검색 처리량 측정 (정확/정규화/유사/없음 질의별) + 정확한 키 결과가 기존 검색과 같은지 검증
+    + 정규화/유사 질의가 원래 키의 번역을 찾는지, 보류한 키가 다른 상품 번역으로 일치하지 않는지 검사
+    """
+    # requests 의존성이 있는 변환 스크립트는 이 측정에서만 불러옴
+    from convert_bandai_product_ja2ko import TranslationIndex, convert_ja_to_ko, read_translation
+
+    real_data = read_translation(Path(args.mapping))
+    translation_data = enlarge_mapping(real_data, args.size)
+    start = time.perf_counter()
+    index = TranslationIndex(translation_data, args.threshold)
+    build_time = time.perf_counter() - start
+
+    rng = random.Random(args.seed)
+    keys = sorted(translation_data)
+    translated = [key for key in keys if translation_data[key]]
+    queries = {'exact': [], 'canonical': [], 'fuzzy': [], 'miss': []}
+    # 질의: (상품명, 브랜드, 스케일, 기대하는 번역 - 없으면 확인 안 함)
+    for key in rng.sample(keys, min(args.queries, len(keys))):
+        queries['exact'].append((key, rng.choice(['', 'HG', 'RG', 'MG']), rng.choice(['', '1_144', '1_100']), None))
+    for key in rng.sample(translated, min(args.queries, len(translated))):
+        queries['canonical'].append((key.replace('・', ' ').replace('ー', '') + ' ', '', '', translation_data[key]))
+        variants = [(a, b) for a, b in KANA_VARIANTS if a in key]
+        if variants:
+            a, b = rng.choice(variants)
+            queries['fuzzy'].append((key.replace(a, b, 1), '', '', translation_data[key]))
+        queries['miss'].append((''.join(rng.choice('アイウエオカキクケコサシスセソタチツテトナニヌネノ') for _ in range(rng.randint(4, 16))), '', '', None))
+
+    mismatches = 0
+    for product_name, brand, scale, _ in queries['exact']:
+        if legacy_convert_ja_to_ko(translation_data, product_name, brand, scale) != convert_ja_to_ko(index, product_name, brand, scale):
+            mismatches += 1
+
+    print(f"=== 번역 매핑 검색 (키 {len(translation_data):,}개, 정규화 키 {len(index.canonical):,}개) ===")
+    print(f"인덱스 생성: {build_time:.3f}초")
+    wrong = 0
+    for name, items in queries.items():
+        if not items:
+            continue
+        best = float('inf')
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            results = [convert_ja_to_ko(index, *item[:3]) for item in items]
+            best = min(best, time.perf_counter() - start)
+        found = sum(status != 'not_found' for _, status in results)
+        line = f"{name:9s} 질의 {len(items):6,}개: {best / len(items) * 1e6:8.1f}µs/건, 번역 찾음 {found:,}개"
+        if items[0][3] is not None:
+            # 다른 상품의 번역 (같은 정규화 키/유사 키에 번역이 같은 다른 키가 일치한 것은 맞은 것으로 셈)
+            incorrect = sum(status != 'not_found' and not same_translation(translation, item[3])
+                            for (translation, status), item in zip(results, items))
+            wrong += incorrect
+            line += f" (다른 번역 {incorrect:,}개)"
+        print(line)
+    print(f"정확한 키 결과 불일치 (기존 검색 대비): {mismatches}개")
+    wrong += bench_translate_holdout(real_data, args.holdout, args.seed, args.threshold)
+    return 0 if mismatches == 0 and wrong == 0 else 1
+
+
+def bench_compose(args):
+    """번역 메모리 조각 조합 제안의 정확도 측정 (매핑 일부를 보류하고 나머지로 배운 뒤 보류 항목 제안과 비교)"""
+    from translation_memory import TranslationMemory
+
+    with open(args.mapping, encoding='utf-8') as infile:
+        translation_data = {unicodedata.normalize('NFKC', ja): ko for ja, ko in json.load(infile).items() if ko}
+    rng = random.Random(args.seed)
+    keys = sorted(translation_data)
+    rng.shuffle(keys)
+    held_out = keys[:int(len(keys) * args.holdout)]
+    training = {key: translation_data[key] for key in keys[len(held_out):]}
+
+    start = time.perf_counter()
+    memory = TranslationMemory.from_mapping(training)
+    build_time = time.perf_counter() - start
+    print(f"=== 번역 메모리 (학습 {len(training):,}쌍, 정렬 {memory.aligned_pairs:,}쌍, 조각 {len(memory.segments):,}개, {build_time:.2f}초) ===")
+
+    results = []
+    start = time.perf_counter()
+    for key in held_out:
+        proposal = memory.propose(key)
+        if proposal:
+            expected = translation_data[key]
+            results.append((proposal[1], proposal[0] == expected,
+                            proposal[0].replace(' ', '') == expected.replace(' ', ''), key, proposal[0], expected))
+    propose_time = time.perf_counter() - start
+    print(f"보류 {len(held_out):,}개 중 제안 {len(results):,}개 ({propose_time / max(1, len(held_out)) * 1e6:.0f}µs/건)")
+
+    print(f"{'신뢰도 이상':>10} {'제안':>6} {'정확':>6} {'띄어쓰기 무시':>12} {'보류 대비':>8}")
+    for threshold in [float(value) for value in args.thresholds.split(',')]:
+        selected = [result for result in results if result[0] >= threshold]
+        if not selected:
+            print(f"{threshold:>10.2f} {0:>6}")
+            continue
+        exact = sum(result[1] for result in selected)
+        loose = sum(result[2] for result in selected)
+        print(f"{threshold:>10.2f} {len(selected):>6} {exact / len(selected):>6.1%} {loose / len(selected):>12.1%} "
+              f"{len(selected) / len(held_out):>8.1%}")
+
+    if args.show:
+        for confidence, exact, loose, key, proposal, expected in sorted(results, reverse=True)[:args.show]:
+            if not loose:
+                print(f"  {confidence:.2f} {key} → {proposal} (매핑: {expected})")
+    return 0
+
+
+def bench_merge(args):
+    """새 번역 쌍 병합 측정: 항목마다 매핑을 읽고 백업 복사 후 다시 쓰는 기존 방식 vs 한 번에 병합 + 압축 백업 (결과 비교)"""
+    import shutil
+    from convert_bandai_product_ja2ko import clean_text
+    from mapping_merge import MergeResult, merge_mapping, validate_pairs
+
+    with open(args.mapping, encoding='utf-8') as infile:
+        translation_data = enlarge_mapping(json.load(infile), args.size)
+    pairs = [(str(n), f"ベンチマーク新規{n}(テスト)", f"벤치마크 신규 {n} (테스트)") for n in range(args.pairs)]
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        legacy_path = Path(tmp_dir) / "legacy" / "mapping.json"
+        merged_path = Path(tmp_dir) / "merged" / "mapping.json"
+        for path in (legacy_path, merged_path):
+            path.parent.mkdir()
+            with path.open('w', encoding='utf-8') as outfile:
+                json.dump(translation_data, outfile, ensure_ascii=False, indent=2, sort_keys=True)
+        print(f"=== 매핑 {len(translation_data):,}개 ({legacy_path.stat().st_size / 1e6:.1f}MB)에 새 번역 {len(pairs):,}개 병합 ===")
+
+        # 기존 방식: 항목마다 백업 복사 + 전체 읽기/쓰기
+        start = time.perf_counter()
+        for n, ja, ko in pairs:
+            shutil.copy(legacy_path, legacy_path.with_name(f"{legacy_path.name}.{n}.bak"))
+            with legacy_path.open('r', encoding='utf-8') as infile:
+                data = json.load(infile)
+            data[clean_text(ja)] = ko
+            with legacy_path.open('w', encoding='utf-8') as outfile:
+                json.dump(data, outfile, ensure_ascii=False, indent=2, sort_keys=True)
+        legacy_time = time.perf_counter() - start
+        legacy_backup = sum(path.stat().st_size for path in legacy_path.parent.glob("*.bak"))
+
+        start = time.perf_counter()
+        result = MergeResult()
+        merge_mapping(merged_path, validate_pairs(pairs, result), result=result)
+        merge_time = time.perf_counter() - start
+        merged_backup = sum(path.stat().st_size for path in merged_path.parent.glob("*.gz"))
+
+        same = legacy_path.read_bytes() == merged_path.read_bytes()
+
+    print(f"{'':<12} {'시간':>10} {'백업 크기':>12}")
+    print(f"{'항목별 쓰기':<12} {legacy_time:>9.2f}초 {legacy_backup / 1e6:>10.1f}MB")
+    print(f"{'한 번에 병합':<12} {merge_time:>9.2f}초 {merged_backup / 1e6:>10.1f}MB  (추가 {result.added:,}개)")
+    print(f"결과 매핑 동일: {'예' if same else '아니오'}")
+    return 0 if same else 1
+
+def bench_startup(args):
+    """변환 시작 시간 측정: 매핑 JSON 읽기 + 인덱스 생성 vs 컴파일 결과 불러오기 (매핑 크기별) + 결과 비교"""
+    from convert_bandai_product_ja2ko import (TranslationIndex, load_translation_index, load_translation_memory,
+                                              read_translation)
+    from translation_memory import TranslationMemory
+
+    with open(args.mapping, encoding='utf-8') as infile:
+        base_mapping = json.load(infile)
+
+    mismatches = 0
+    print(f"{'매핑 키 수':>10} {'JSON 크기':>10} {'JSON+인덱스':>12} {'컴파일(첫 실행)':>14} {'컴파일 결과':>12} {'결과 크기':>10}"
+          + (f" {'메모리 생성':>10} {'메모리 복원':>10}" if args.memory else ""))
+    for size in [int(value) for value in args.sizes.split(',')]:
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            mapping_path = Path(tmp_dir) / "mapping.json"
+            compiled_path = Path(tmp_dir) / "mapping.marshal"
+            with mapping_path.open('w', encoding='utf-8') as outfile:
+                json.dump(enlarge_mapping(base_mapping, size), outfile, ensure_ascii=False, indent=2, sort_keys=True)
+
+            start = time.perf_counter()
+            legacy_index = TranslationIndex(read_translation(mapping_path))
+            legacy_time = time.perf_counter() - start
+
+            start = time.perf_counter()
+            load_translation_index(mapping_path, compiled_path=compiled_path)
+            cold_time = time.perf_counter() - start
+
+            warm_times = []
+            for _ in range(args.repeat):
+                start = time.perf_counter()
+                index = load_translation_index(mapping_path, compiled_path=compiled_path)
+                warm_times.append(time.perf_counter() - start)
+
+            if index.translation_data != legacy_index.translation_data or index.state() != legacy_index.state():
+                print(f"  {size}: 컴파일 결과가 JSON으로 만든 인덱스와 다름")
+                mismatches += 1
+
+            line = (f"{len(index.translation_data):>10,} {mapping_path.stat().st_size / 1e6:>8.1f}MB {legacy_time:>11.3f}초 "
+                    f"{cold_time:>13.3f}초 {min(warm_times):>11.3f}초 {compiled_path.stat().st_size / 1e6:>8.1f}MB")
+            if args.memory:
+                start = time.perf_counter()
+                memory = load_translation_memory(index)
+                build_time = time.perf_counter() - start
+                start = time.perf_counter()
+                restored = TranslationMemory.from_state(load_translation_index(mapping_path, compiled_path=compiled_path).compiled['memory'])
+                restore_time = time.perf_counter() - start
+                if restored.segments != memory.segments:
+                    print(f"  {size}: 복원한 번역 메모리가 다름")
+                    mismatches += 1
+                line += f" {build_time:>9.3f}초 {restore_time:>9.3f}초"
+            print(line)
+
+            # 매핑이 바뀌면(mtime) 다시 만들어야 함
+            file_stat = mapping_path.stat()
+            os.utime(mapping_path, ns=(file_stat.st_atime_ns, file_stat.st_mtime_ns + 1_000_000_000))
+            index = load_translation_index(mapping_path, compiled_path=compiled_path)
+            if index.compiled.get('memory') is not None:
+                print(f"  {size}: 매핑이 바뀌었는데 이전 컴파일 결과를 사용함")
+                mismatches += 1
+
+    print(f"결과 불일치: {mismatches}개")
+    return 1 if mismatches else 0
+
+# 기존 HTML 목록의 부분 문자열 퍼지 매칭 (항목마다 슬라이딩 윈도우 Levenshtein) - catalog 측정에서 비교용
+LEGACY_CATALOG_JS = r"""
+function levenshtein(a, b) {
+  var m = a.length, n = b.length;
+  if (m === 0) return n;
+  if (n === 0) return m;
+  var dp = [];
+  for (var i = 0; i <= m; i++) dp[i] = [i];
+  for (var j = 0; j <= n; j++) dp[0][j] = j;
+  for (i = 1; i <= m; i++) {
+    for (j = 1; j <= n; j++) {
+      var cost = a[i-1] === b[j-1] ? 0 : 1;
+      dp[i][j] = Math.min(dp[i-1][j] + 1, dp[i][j-1] + 1, dp[i-1][j-1] + cost);
+    }
+  }
+  return dp[m][n];
+}
+function removeSpaces(s) { return s.replace(/\s+/g, ''); }
+function fuzzyContains(target, query, threshold) {
+  target = target.toLowerCase();
+  query = query.toLowerCase();
+  if (query.length === 0) return true;
+  if (target.indexOf(query) !== -1 || removeSpaces(target).indexOf(removeSpaces(query)) !== -1) return true;
+  var t = removeSpaces(target);
+  var q = removeSpaces(query);
+  if (q.length > t.length) return levenshtein(t, q) <= threshold;
+  var minDist = Infinity;
+  for (var i = 0; i <= t.length - q.length; i++) {
+    var d = levenshtein(t.substring(i, i + q.length), q);
+    if (d < minDist) minDist = d;
+    if (minDist === 0) return true;
+  }
+  return minDist <= threshold;
+}
+function exactContains(target, query) {
+  var t = target.toLowerCase(), q = query.toLowerCase();
+  return t.indexOf(q) !== -1 || removeSpaces(t).indexOf(removeSpaces(q)) !== -1;
+}
+"""
+
+# node로 생성된 페이지의 검색 코드와 기존 매칭을 같은 질의로 실행
+# (argv: HTML 파일, 질의 JSON 파일, 기존 방식 질의 수, 분할 목록 디렉토리 - 분할 목록 검색 결과도 같은지 확인)
+CATALOG_NODE_SCRIPT = r"""
+const fs = require('fs');
+const path = require('path');
+const [htmlPath, queriesPath, legacyLimit, catalogDir] = process.argv.slice(1);
+const html = fs.readFileSync(htmlPath, 'utf8');
+const indexText = html.match(/<script type="application\/json" id="searchIndex">([\s\S]*?)<\/script>/)[1];
+const workerSource = html.match(/<script type="text\/plain" id="searchWorker">([\s\S]*?)<\/script>/)[1];
+const names = [...html.matchAll(/<li data-name='([^']*)'/g)].map(m => m[1]);
+const numbers = [...html.matchAll(/\/pdf\/(\d+)\.pdf/g)].map(m => Number(m[1]));
+const queries = JSON.parse(fs.readFileSync(queriesPath, 'utf8'));
+eval(LEGACY);
+let start = process.hrtime.bigint();
+const searcher = new Function(workerSource + '\nreturn createSearcher;')()(indexText);
+const loadMs = Number(process.hrtime.bigint() - start) / 1e6;
+
+// 분할 목록: 샤드를 차례로 더한 검색기 + 전체 목록 번호 → 제품번호
+const manifest = JSON.parse(fs.readFileSync(path.join(catalogDir, 'catalog.json'), 'utf8'));
+const shardSearcher = new Function(workerSource + '\nreturn createCatalogSearcher;')()();
+const shardNumbers = [];
+for (const shard of manifest.shards) {
+  const text = fs.readFileSync(path.join(catalogDir, shard.file), 'utf8');
+  shardSearcher.add(text, shardNumbers.length, manifest.total);
+  for (const item of JSON.parse(text).items) shardNumbers.push(item[0]);
+}
+function matchedNumbers(matches, ids) {
+  const found = [];
+  for (let id = 0; id < matches.length; id++) if (matches[id]) found.push(ids[id]);
+  return found.sort((a, b) => a - b).join(',');
+}
+const results = [];
+for (const [i, q] of queries.entries()) {
+  const request = {name: q.name, brand: '', scale: '', fuzzy: q.threshold > 0, threshold: q.threshold};
+  start = process.hrtime.bigint();
+  const result = searcher.search(request);
+  const newMs = Number(process.hrtime.bigint() - start) / 1e6;
+  const row = {name: q.name, threshold: q.threshold, shown: result.shown, ms: newMs, shardMismatch: 0};
+  for (const brand of ['', 'mg']) {
+    const brandRequest = Object.assign({}, request, {brand: brand});
+    const expected = brand ? searcher.search(brandRequest).matches : result.matches;
+    start = process.hrtime.bigint();
+    const shardResult = shardSearcher.search(brandRequest);
+    row[brand ? 'shardBrandMs' : 'shardMs'] = Number(process.hrtime.bigint() - start) / 1e6;
+    if (matchedNumbers(shardResult.matches, shardNumbers) !== matchedNumbers(expected, numbers)) row.shardMismatch++;
+  }
+  if (i < Number(legacyLimit)) {
+    start = process.hrtime.bigint();
+    let shown = 0, missing = 0;
+    for (let id = 0; id < names.length; id++) {
+      const match = q.threshold > 0 ? fuzzyContains(names[id], q.name, q.threshold) : exactContains(names[id], q.name);
+      if (match) { shown++; if (!result.matches[id]) missing++; }
+    }
+    row.legacyMs = Number(process.hrtime.bigint() - start) / 1e6;
+    row.legacyShown = shown;
+    row.missing = missing;
+  }
+  results.push(row);
+}
+console.log(JSON.stringify({items: names.length, loadMs, results}));
+"""
+
+
+def bench_catalog(args):
+    """HTML 목록 검색 측정: 검색 인덱스 생성 시간/크기 + (node가 있으면) 페이지 검색 코드와 기존 퍼지 매칭의 질의 시간과 결과 비교"""
+    import shutil
+    import subprocess
+    import gzip
+    from convert_bandai_product_ja2ko import CATALOG_SHELL_NAME, build_search_index, write_catalog_directory, write_html_catalog
+
+    with open(args.mapping, encoding='utf-8') as infile:
+        mapping = enlarge_mapping(json.load(infile), args.size)
+    rng = random.Random(args.seed)
+    brands = ['', 'HG', 'RG', 'MG', 'PG', 'HGUC']
+    scales = ['', '1_144', '1_100', '1_60']
+    html_items = []
+    for number, korean in enumerate(sorted(value for value in mapping.values() if value)):
+        korean = re.sub(r"[/\"']", ' ', korean)
+        brand, scale = rng.choice(brands), rng.choice(scales)
+        full_name = korean + ((" " + brand) if brand else "") + ((" " + scale) if scale else "")
+        html_items.append((100000 + number, full_name, korean, brand, scale))
+
+    start = time.perf_counter()
+    index = build_search_index(html_items)
+    index_time = time.perf_counter() - start
+    postings = sum(len(ids) for ids in index['postings'].values())
+
+    # 질의: 항목 이름의 일부 (그대로 / 한 글자 바꿈 / 한 글자 뺌)
+    queries = []
+    for _ in range(args.queries):
+        name = rng.choice(html_items)[2].replace(' ', '')
+        length = min(len(name), rng.randint(2, 8))
+        start_pos = rng.randint(0, len(name) - length)
+        query = name[start_pos:start_pos + length]
+        kind = rng.choice(['exact', 'replace', 'delete'])
+        if kind == 'replace' and len(query) > 2:
+            pos = rng.randrange(len(query))
+            query = query[:pos] + rng.choice('건담가나다라마바사') + query[pos + 1:]
+        elif kind == 'delete' and len(query) > 2:
+            pos = rng.randrange(len(query))
+            query = query[:pos] + query[pos + 1:]
+        queries.append({'name': query, 'threshold': rng.choice([0, 1, 1, 2])})
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        html_path = Path(tmp_dir) / "gundam.html"
+        write_html_catalog(html_path, html_items)
+        html_bytes = html_path.read_bytes()
+        print(f"=== 항목 {len(html_items):,}개: HTML {len(html_bytes) / 1e6:.1f}MB (gzip {len(gzip.compress(html_bytes)) / 1e6:.1f}MB), "
+              f"인덱스 생성 {index_time:.3f}초 (bigram {len(index['postings']):,}개, 항목 번호 {postings:,}개) ===")
+
+        # 분할 목록: 첫 화면에 필요한 페이지 크기, 샤드 크기, 바뀌지 않았을 때 다시 쓰는 파일 수
+        catalog_dir = Path(tmp_dir) / "catalog"
+        start = time.perf_counter()
+        written, total_files = write_catalog_directory(catalog_dir, html_items)
+        first_time = time.perf_counter() - start
+        start = time.perf_counter()
+        rewritten, _ = write_catalog_directory(catalog_dir, html_items)
+        second_time = time.perf_counter() - start
+        shard_paths = sorted((catalog_dir / "shards").glob("*.json"), key=lambda path: path.stat().st_size)
+        shell_path = catalog_dir / CATALOG_SHELL_NAME
+        gz_total = sum(path.stat().st_size for path in catalog_dir.rglob("*.gz"))
+        print(f"분할 목록: 페이지 {shell_path.stat().st_size / 1e3:.1f}KB "
+              f"(gzip {shell_path.with_name(shell_path.name + '.gz').stat().st_size / 1e3:.1f}KB), "
+              f"샤드 {len(shard_paths)}개 (최대 {shard_paths[-1].stat().st_size / 1e6:.1f}MB), 압축본 합계 {gz_total / 1e6:.1f}MB")
+        print(f"분할 목록 쓰기: 처음 {first_time:.2f}초 (파일 {written}/{total_files}개), "
+              f"바뀌지 않은 목록 다시 쓰기 {second_time:.2f}초 (파일 {rewritten}/{total_files}개)")
+        if rewritten:
+            print("바뀌지 않은 분할 목록을 다시 썼습니다")
+            return 1
+
+        node = shutil.which('node')
+        if not node:
+            print("node가 없어 페이지 검색 코드 측정은 건너뜀")
+            return 0
+        queries_path = Path(tmp_dir) / "queries.json"
+        queries_path.write_text(json.dumps(queries, ensure_ascii=False), encoding='utf-8')
+        script = CATALOG_NODE_SCRIPT.replace('eval(LEGACY);', LEGACY_CATALOG_JS)
+        completed = subprocess.run([node, '-e', script, html_path, queries_path, str(args.legacy_queries), catalog_dir],
+                                   capture_output=True, text=True)
+    if completed.returncode != 0:
+        print(f"node 실행 실패: {completed.stderr.strip()[-500:]}")
+        return 1
+    report = json.loads(completed.stdout)
+
+    results = report['results']
+    print(f"인덱스 불러오기: {report['loadMs']:.0f}ms")
+    missing = 0
+    for threshold in sorted({row['threshold'] for row in results}):
+        rows = [row for row in results if row['threshold'] == threshold]
+        times = sorted(row['ms'] for row in rows)
+        line = f"허용 거리 {threshold}: 질의 {len(rows)}개, 새 검색 중앙값 {times[len(times) // 2]:.2f}ms / 최대 {times[-1]:.2f}ms"
+        legacy_rows = [row for row in rows if 'legacyMs' in row]
+        if legacy_rows:
+            legacy_times = sorted(row['legacyMs'] for row in legacy_rows)
+            line += f", 기존 중앙값 {legacy_times[len(legacy_times) // 2]:.1f}ms ({len(legacy_rows)}개)"
+            missing += sum(row['missing'] for row in legacy_rows)
+        print(line)
+    extra = sum(row['shown'] - row['legacyShown'] for row in results if 'legacyMs' in row)
+    print(f"기존 결과 중 새 검색에서 빠진 항목: {missing}개 (새 검색에만 있는 항목: {extra}개, 길이가 다른 부분 문자열 일치)")
+    shard_times = sorted(row['shardMs'] for row in results)
+    shard_brand_times = sorted(row['shardBrandMs'] for row in results)
+    shard_mismatch = sum(row['shardMismatch'] for row in results)
+    print(f"분할 목록 검색: 중앙값 {shard_times[len(shard_times) // 2]:.2f}ms, 등급 지정(mg) 중앙값 "
+          f"{shard_brand_times[len(shard_brand_times) // 2]:.2f}ms, 한 페이지 목록과 결과가 다른 질의 {shard_mismatch}개")
+    return 1 if missing or shard_mismatch else 0
+
+# 합성 코퍼스 생성용 어휘 (사이트별 페이지 형태를 흉내냄)
+CORPUS_BRANDS = ['HG', 'HGUC', 'HGCE', 'RG', 'MG', 'MGEX', 'PG', 'RE/100', 'ENTRY GRADE', 'SDガンダム EX']
+CORPUS_SCALES = ['1/144', '1/144', '1/144', '1/100', '1/60', '1/48']
+CORPUS_JA_NAMES = ['ガンダム', 'ストライクフリーダムガンダム', 'ユニコーンガンダム', 'ザクII', 'ジム', 'キュベレイ',
+                   'ガンダムエアリアル', 'ガンダムバルバトスルプス', 'ウイングガンダムゼロEW', 'ガンダムX', 'ノイエ・ジール',
+                   'インパルスガンダム', 'デスティニーガンダム', 'ジャスティスガンダム', 'エクシア', 'νガンダム']
+CORPUS_KO_NAMES = ['건담', '스트라이크 프리덤 건담', '유니콘 건담', '자쿠 II', '짐', '큐베레이', '건담 에어리얼',
+                   '건담 바르바토스 루푸스', '윙건담 제로 EW', '건담 X', '노이에 질', '임펄스 건담', '데스티니 건담',
+                   '저스티스 건담', '엑시아', '뉴 건담']
+CORPUS_JA_PROSE = ['今回はキットのレビューです。', '可動範囲は広く、プロポーションも良好です。', '付属品はビームライフル、シールド。',
+                   'ランナー構成は以下の通り。', '塗装せずに組み立てました。']
+# 목록 페이지마다 하나씩 들어가는 상품명 (공통 목록 CORPUS_KO_NAMES에는 없는 이름)
+CORPUS_KO_LISTING_NAMES = ['건담 에피온', '건담 데스사이즈', '톨기스', '건캐논', '건탱크', '구프', '돔', '겔구그', '백식',
+                           '제타 건담', '더블오 건담', '건담 아스트레이', '사자비', '시난주', '크샤트리야', '하이뉴 건담']
+CORPUS_KO_PROSE = ['이번 신제품을 소개합니다.', '가동 범위가 넓고 프로포션이 좋습니다.', '부속품은 빔 라이플, 실드입니다.',
+                   '발매일과 가격은 아래와 같습니다.', '자세한 내용은 공식 사이트를 확인하세요.']
+
+
+def corpus_product_name(rng, names):
+    """브랜드/스케일 조합 상품명"""
+    parts = []
+    if rng.random() < 0.8:
+        parts.append(rng.choice(CORPUS_BRANDS))
+    if rng.random() < 0.7:
+        parts.append(rng.choice(CORPUS_SCALES))
+    parts.append(rng.choice(names))
+    if rng.random() < 0.2:
+        parts.append(rng.choice(['Ver.Ka', '(リバイブ版)', '커스텀', 'Ver.2.0']))
+    return ' '.join(parts)
+
+
+def dalong_page(rng, index):
+    """dalong 스타일 리뷰 페이지 (Shift_JIS/EUC-KR, 테이블 레이아웃 + 공통 네비게이션)"""
+    encoding = rng.choice(['shift_jis', 'shift_jis', 'euc-kr'])
+    name = corpus_product_name(rng, CORPUS_JA_NAMES)
+    rows = ''.join(f'<tr><td class="item">{corpus_product_name(rng, CORPUS_JA_NAMES)}</td><td>{rng.randint(1000, 9000)}円</td></tr>'
+                   for _ in range(rng.randint(3, 12)))
+    prose = ''.join(f'<p>{rng.choice(CORPUS_JA_PROSE)}{rng.choice(CORPUS_JA_PROSE)}</p>' for _ in range(rng.randint(2, 8)))
+    html = (f'<html><head><meta http-equiv="Content-Type" content="text/html; charset={encoding}">'
+            f'<title>{name} レビュー - Dalong.net</title></head><body>'
+            '<table class="menu"><tr><td><a href="/">ホーム</a></td><td><a href="/reviews/">レビュー menu</a></td>'
+            '<td><a href="/search/">検索 search</a></td></tr></table>'
+            f'<h2>{name}</h2><table class="spec">{rows}</table>{prose}'
+            f'<b>{rng.choice(CORPUS_JA_NAMES)}</b><img src="p{index}.jpg"><br>'
+            '<div class="footer">Copyright (c) Dalong.net All rights reserved.</div></body></html>')
+    return html.encode(encoding, errors='xmlcharrefreplace')
+
+
+def gundaminfo_page(rng, index):
+    """gundaminfo 스타일 한국어 제품 페이지 (UTF-8, 10개 중 1개는 목록 페이지, 1개는 카운터/날짜만 다른 공지 페이지)"""
+    if index % 10 == 8:
+        return gundaminfo_listing_page(rng, index)
+    if index % 10 == 9:
+        return gundaminfo_notice_page(rng, index)
+    name = corpus_product_name(rng, CORPUS_KO_NAMES)
+    items = ''.join(f'<li class="item"><a href="/product/{rng.randint(1, 99999)}">{corpus_product_name(rng, CORPUS_KO_NAMES)}</a></li>'
+                    for _ in range(rng.randint(4, 16)))
+    prose = ''.join(f'<p>{rng.choice(CORPUS_KO_PROSE)}</p>' for _ in range(rng.randint(2, 6)))
+    html = (f'<html><head><meta charset="utf-8"><meta name="og:title" content="{name} | 건담 인포">'
+            f'<title>{name} | GUNDAM.INFO</title></head><body>'
+            '<nav><a href="/">홈</a><a href="/news/">뉴스</a><a href="/product/">제품 정보</a><a href="/login/">로그인</a></nav>'
+            f'<div class="product-name">{name}</div><dl><dt>코드네임</dt><dd class="codename">{rng.choice(CORPUS_KO_NAMES)}</dd></dl>'
+            f'{prose}<ul class="related">{items}</ul>'
+            '<footer>© SOTSU·SUNRISE 사이트맵 개인정보처리방침</footer></body></html>')
+    return html.encode('utf-8')
+
+
+def gundaminfo_layout(title, body):
+    """gundaminfo 공통 레이아웃 (네비게이션 + 푸터)"""
+    html = (f'<html><head><meta charset="utf-8"><title>{title} | GUNDAM.INFO</title></head><body>'
+            '<nav><a href="/">홈</a><a href="/news/">뉴스</a><a href="/product/">제품 정보</a><a href="/login/">로그인</a></nav>'
+            f'{body}<footer>© SOTSU·SUNRISE 사이트맵 개인정보처리방침</footer></body></html>')
+    return html.encode('utf-8')
+
+
+def gundaminfo_listing_page(rng, index):
+    """gundaminfo 제품 목록 페이지 (title과 상품 약 300개가 모든 페이지에 공통이고 페이지마다 상품 하나만 다름)
+
+    SimHash 거리는 가깝지만 상품 목록이 달라 유사 중복으로 합치면 안 되는 경우.
+    """
+    shared = random.Random('gundaminfo-listing')
+    names = [corpus_product_name(shared, CORPUS_KO_NAMES) for _ in range(300)]
+    names.insert(rng.randrange(len(names) + 1), f'{rng.choice(CORPUS_BRANDS)} {rng.choice(CORPUS_KO_LISTING_NAMES)}')
+    items = ''.join(f'<li class="item"><a href="/product/{shared.randint(1, 99999)}">{name}</a></li>' for name in names)
+    page = index // 10 + 1
+    return gundaminfo_layout('제품 목록', f'<ul class="list">{items}</ul>'
+                             f'<div class="paging"><a href="?page={page - 1}">이전</a> {page} <a href="?page={page + 1}">다음</a></div>')
+
+
+def gundaminfo_notice_page(rng, index):
+    """gundaminfo 공지 페이지 (본문은 모두 같고 방문자 수/날짜만 다른 유사 중복)"""
+    shared = random.Random('gundaminfo-notice')
+    prose = ''.join(f'<p>{shared.choice(CORPUS_KO_PROSE)}</p>' for _ in range(6))
+    items = ''.join(f'<li class="item">{corpus_product_name(shared, CORPUS_KO_NAMES)}</li>' for _ in range(8))
+    return gundaminfo_layout('공지사항', f'{prose}<ul class="related">{items}</ul>'
+                             f'<div class="counter">방문자 {rng.randint(1000, 999999)} 명 '
+                             f'{rng.randint(2020, 2025)}-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}</div>')
+
+
+def bandai_detail_page(rng, index):
+    """Bandai Manual 상세 페이지 (h2.el_title 상품명 + 발매년)"""
+    name = corpus_product_name(rng, CORPUS_JA_NAMES)
+    html = (f'<html><head><meta charset="UTF-8"><title>{name} | BANDAI HOBBY SITE</title></head><body>\n'
+            '<header><ul><li><a href="/">TOP</a></li><li><a href="/menus/">組立説明書</a></li></ul></header>\n'
+            f'<h2 class="el_title"><span>{name}</span></h2>\n'
+            f'<dl><dt>発売日</dt><dd class="bl_detail_box_txt">{rng.randint(1990, 2025)}年{rng.randint(1, 12):02d}月</dd></dl>\n'
+            + ''.join(f'<p>{rng.choice(CORPUS_JA_PROSE)}</p>\n' for _ in range(rng.randint(1, 4)))
+            + f'<a href="/pdf/{index}.pdf">PDF</a>\n</body></html>\n')
+    return html.encode('utf-8')
+
+
+def gcd_json_page(rng, page, articles_per_page=50):
+    """gcd(네이버 카페 게시판 API) JSON 페이지"""
+    article_list = []
+    for k in range(articles_per_page):
+        article_id = 1_000_000 - page * articles_per_page - k
+        subject = f"[{rng.choice(['완성작', '리뷰', '질문', '정보'])}] {corpus_product_name(rng, CORPUS_KO_NAMES + CORPUS_JA_NAMES)}"
+        article_list.append({'type': 'ARTICLE', 'item': {'articleId': article_id, 'subject': subject,
+                                                          'writeDateTimestamp': 1_700_000_000_000 + article_id}})
+    return json.dumps({'result': {'articleList': article_list}}, ensure_ascii=False).encode('utf-8')
+
+
+# 코퍼스 형식 버전 (페이지 생성 방식이 바뀌면 올려서 이전 코퍼스를 다시 생성)
+CORPUS_VERSION = 2
+
+# 코퍼스 사이트: (디렉터리, 사이트 이름, 페이지 생성 함수, 파일 경로 형식)
+CORPUS_SITES = [
+    ('www.dalong.net', 'dalong.net', dalong_page, 'reviews/{dir}/r{index}.htm'),
+    ('kr.gundam.info', 'kr.gundam.info', gundaminfo_page, 'product/{dir}/{index}.html'),
+    ('manual.bandai-hobby.net', 'manual.bandai-hobby.net', bandai_detail_page, 'menus/detail/{index}.html'),
+]
+
+
+def generate_corpus(root, files, seed=0):
+    """사이트별 files개 HTML + gcd JSON(기사 약 files개) 합성 코퍼스 생성 (같은 시드는 같은 코퍼스)"""
+    root = Path(root)
+    marker = root / '.complete'
+    if marker.exists() and marker.read_text() == f'{CORPUS_VERSION} {files} {seed}':
+        return root
+
+    for site_dir, site_name, make_page, path_format in CORPUS_SITES:
+        rng = random.Random(f'{seed}-{site_name}')
+        for index in range(files):
+            path = root / site_dir / path_format.format(dir=index % 97, index=index)
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_bytes(make_page(rng, index))
+
+    rng = random.Random(f'{seed}-gcd')
+    gcd_dir = root / 'gcd'
+    gcd_dir.mkdir(parents=True, exist_ok=True)
+    for page in range(1, max(1, files // 50) + 1):
+        (gcd_dir / f'articles_page_{page:04d}.json').write_bytes(gcd_json_page(rng, page))
+
+    marker.write_text(f'{CORPUS_VERSION} {files} {seed}')
+    return root
+
+
+def bench_corpus(args):
+    """합성 코퍼스 생성"""
+    start = time.perf_counter()
+    generate_corpus(args.output_dir, args.files, args.seed)
+    print(f"{args.output_dir}: 사이트별 {args.files}개 파일 생성 ({time.perf_counter() - start:.1f}s)")
+    return 0
+
+
+def output_hash(output_file):
+    """출력 파일 해시 (실행 날짜 줄 제외)"""
+    digest = hashlib.sha256()
+    with open(output_file, 'rb') as f:
+        for line in f:
+            if not line.startswith('# 날짜:'.encode('utf-8')):
+                digest.update(line)
+    return digest.hexdigest()[:16]
+
+
+def candidates_hash(products):
+    """추출 후보 목록 해시"""
+    digest = hashlib.sha256()
+    for product in products:
+        digest.update(f"{product.text}\t{product.source.name}\t{product.tag}\t{product.confidence.name}\n".encode('utf-8'))
+    return digest.hexdigest()[:16]
+
+
+def reset_caches():
+    """측정 구간마다 같은 조건이 되도록 정제/분류 캐시 초기화"""
+    esp._clean_text_cached.cache_clear()
+    esp.get_site_classifier.cache_clear()
+
+
+def timed(stage, results, items, func):
+    """func 실행 시간 측정 후 결과 기록"""
+    reset_caches()
+    start = time.perf_counter()
+    value = func()
+    elapsed = time.perf_counter() - start
+    results[stage] = {'items': items if not callable(items) else items(value), 'seconds': elapsed}
+    return value
+
+
+def run_site_suite(mirror_dir, site_name, max_chunks, work_dir):
+    """한 사이트의 단계별 처리량/해시/최대 메모리 측정"""
+    results = {}
+    html_files = list(esp.iter_html_files(mirror_dir))
+    with contextlib.redirect_stdout(io.StringIO()):
+        contents = [esp.read_html_content(html_file) for html_file in html_files]
+
+    chunks = []
+    for content in contents:
+        if content is None or len(chunks) >= max_chunks:
+            continue
+        collector = TextChunkCollector()
+        collector.feed(content)
+        chunks.extend(collector.chunks)
+    chunks = chunks[:max_chunks]
+
+    cleaned = timed('clean_text', results, len(chunks), lambda: [esp.clean_text(chunk) for chunk in chunks])
+    cleaned = [text for text in cleaned if text]
+    timed('is_potential_gunpla', results, len(cleaned),
+          lambda: [esp.get_site_classifier(site_name).is_potential_gunpla(text) for text in cleaned])
+
+    def extract_all():
+        with contextlib.redirect_stdout(io.StringIO()):
+            return [product for html_file in html_files for product in esp.extract_products_from_html(html_file, site_name)]
+    products = timed('extract_products_from_html', results, len(html_files), extract_all)
+    results['extract_products_from_html']['hash'] = candidates_hash(products)
+    del products
+
+    def process_all():
+        with contextlib.redirect_stdout(io.StringIO()):
+            stream = esp.process_mirror_directory(mirror_dir, site_name)
+            return list(esp.validate_and_filter_products(stream, site_name))
+    validated = timed('process_mirror_directory', results, len(html_files), process_all)
+
+    output_file = os.path.join(work_dir, f'{site_name}_products.txt')
+    def save_all():
+        with contextlib.redirect_stdout(io.StringIO()):
+            esp.save_semi_structured_data(iter(validated), output_file, site_name)
+    timed('save_semi_structured_data', results, len(validated), save_all)
+    results['save_semi_structured_data']['hash'] = output_hash(output_file)
+    del validated
+
+    # 유사 중복 페이지를 건너뛰어도 출력이 같아야 함 (해시가 다르면 suite 실패)
+    near_duplicates = esp.NearDuplicateIndex()
+    dedup_output_file = os.path.join(work_dir, f'{site_name}_products_dedup.txt')
+    def save_dedup():
+        with contextlib.redirect_stdout(io.StringIO()), \
+                esp.ExtractionCache(os.path.join(work_dir, f'extract_cache_{site_name}.db')) as cache:
+            stream = esp.process_mirror_directory(mirror_dir, site_name, cache=cache, near_duplicates=near_duplicates)
+            esp.save_semi_structured_data(esp.validate_and_filter_products(stream, site_name), dedup_output_file, site_name)
+        return near_duplicates.collapsed
+    timed('near_duplicates', results, len(html_files), save_dedup)
+    results['near_duplicates']['hash'] = output_hash(dedup_output_file)
+    results['near_duplicates']['collapsed'] = near_duplicates.collapsed
+
+    # 전체 스트림(추출 → 검증 → 저장)의 최대 메모리
+    reset_caches()
+    tracemalloc.start()
+    with contextlib.redirect_stdout(io.StringIO()):
+        stream = esp.process_mirror_directory(mirror_dir, site_name)
+        esp.save_semi_structured_data(esp.validate_and_filter_products(stream, site_name), output_file, site_name)
+    results['peak_memory_mb'] = tracemalloc.get_traced_memory()[1] / 1024 / 1024
+    tracemalloc.stop()
+    return results
+
+
+def run_gcd_suite(mirror_dir, work_dir):
+    """gcd JSON 적재 + 내보내기 처리량/해시 측정"""
+    results = {}
+    output_file = os.path.join(work_dir, 'gcd_products.txt')
+    with esp.ExtractionCache(os.path.join(work_dir, 'extract_cache_gcd.db')) as cache:
+        def ingest():
+            with contextlib.redirect_stdout(io.StringIO()):
+                esp.ingest_gcd_directory(mirror_dir, cache)
+            return cache.count_gcd_articles()
+        timed('ingest_gcd_directory', results, lambda count: count, ingest)
+        timed('save_gcd_subjects', results, lambda count: count, lambda: esp.save_gcd_subjects(cache, output_file))
+    results['save_gcd_subjects']['hash'] = output_hash(output_file)
+    return results
+
+
+def bench_suite(args):
+    """합성 코퍼스 크기별 추출 단계 처리량, 최대 메모리, 출력 해시 측정 (회귀 비교 가능)"""
+    sizes = [int(size) for size in args.sizes.split(',')]
+    report = {}
+    ok = True
+    for size in sizes:
+        corpus_dir = Path(args.work_dir) / f'corpus-{size}-{args.seed}'
+        start = time.perf_counter()
+        generate_corpus(corpus_dir, size, args.seed)
+        print(f"\n=== 코퍼스 {size:,}개/사이트 ({corpus_dir}, 준비 {time.perf_counter() - start:.1f}s) ===")
+
+        with tempfile.TemporaryDirectory() as work_dir:
+            size_report = {}
+            for site_dir, site_name, _, _ in CORPUS_SITES:
+                size_report[site_name] = run_site_suite(corpus_dir / site_dir, site_name, args.max_chunks, work_dir)
+            size_report['gcd'] = run_gcd_suite(corpus_dir / 'gcd', work_dir)
+        report[str(size)] = size_report
+
+        for site_name, results in size_report.items():
+            for stage, result in results.items():
+                if stage == 'peak_memory_mb':
+                    print(f"{site_name:24} {'최대 메모리':28} {result:>12,.1f}MB")
+                    continue
+                rate = result['items'] / result['seconds'] if result['seconds'] > 0 else 0
+                print(f"{site_name:24} {stage:28} {result['items']:>10,}개 {rate:>12,.0f}/s  {result.get('hash', '')}")
+                if stage == 'near_duplicates':
+                    same = result['hash'] == results['save_semi_structured_data']['hash']
+                    ok &= same
+                    print(f"{site_name:24} {'':28} 건너뛴 페이지 {result['collapsed']:,}개  "
+                          f"{'결과 동일' if same else '결과 다름 (-d 없이 실행한 출력과 다름)'}")
+
+    if args.compare:
+        with open(args.compare, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+        print(f"\n=== {args.compare} 대비 ===")
+        for size, size_report in report.items():
+            for site_name, results in size_report.items():
+                for stage, result in results.items():
+                    base = baseline.get(size, {}).get(site_name, {}).get(stage)
+                    if base is None or stage == 'peak_memory_mb':
+                        continue
+                    speedup = base['seconds'] / result['seconds'] if result['seconds'] > 0 else 0
+                    same = base.get('hash') == result.get('hash')
+                    ok &= same
+                    print(f"{size:>7} {site_name:24} {stage:28} {speedup:6.2f}x  {'결과 동일' if same else '결과 다름'}")
+    if args.save:
+        with open(args.save, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print(f"\n결과 저장: {args.save}")
+    return 0 if ok else 1
+
+
+def main():
+    parser = argparse.ArgumentParser(description='추출/변환 성능 측정 도구')
+    sub_parsers = parser.add_subparsers(dest='command', required=True)
+
+    clean_parser = sub_parsers.add_parser('clean-text', help='clean_text 처리량 측정 및 결과 동일성 검증')
+    clean_parser.add_argument('mirror_dir', nargs='?', help='텍스트 조각을 수집할 미러 디렉터리 (예: www.dalong.net)')
+    clean_parser.add_argument('--max-files', type=int, default=0, help='읽을 최대 HTML 파일 수 (0: 전체)')
+    clean_parser.add_argument('--samples', type=int, default=20000, help='무작위 비교 문자열 수')
+    clean_parser.add_argument('--seed', type=int, default=0, help='무작위 시드')
+    clean_parser.add_argument('--repeat', type=int, default=3, help='측정 반복 횟수')
+    clean_parser.set_defaults(func=bench_clean_text)
+
+    classify_parser = sub_parsers.add_parser('classify', help='건프라 판정/품질 점수 처리량 측정 및 결과 동일성 검증')
+    classify_parser.add_argument('mirror_dir', nargs='?', help='텍스트를 수집할 미러 디렉터리')
+    classify_parser.add_argument('--site-name', default='dalong.net', help='측정할 사이트 이름')
+    classify_parser.add_argument('--max-files', type=int, default=0, help='읽을 최대 HTML 파일 수 (0: 전체)')
+    classify_parser.add_argument('--samples', type=int, default=20000, help='무작위 비교 문자열 수')
+    classify_parser.add_argument('--seed', type=int, default=0, help='무작위 시드')
+    classify_parser.add_argument('--repeat', type=int, default=3, help='측정 반복 횟수')
+    classify_parser.set_defaults(func=bench_classify)
+
+    memory_parser = sub_parsers.add_parser('memory', help='추출 후보 보관 메모리 측정 (dict 대비 slots 레코드)')
+    memory_parser.add_argument('mirror_dir', help='측정할 미러 디렉터리')
+    memory_parser.add_argument('--site-name', default='dalong.net', help='측정할 사이트 이름')
+    memory_parser.set_defaults(func=bench_memory)
+
+    read_parser = sub_parsers.add_parser('read', help='HTML 읽기/인코딩 감지 처리량 측정')
+    read_parser.add_argument('mirror_dir', help='측정할 미러 디렉터리')
+    read_parser.add_argument('--max-files', type=int, default=0, help='읽을 최대 HTML 파일 수 (0: 전체)')
+    read_parser.set_defaults(func=bench_read)
+
+    backends_parser = sub_parsers.add_parser('backends', help='HTML 백엔드별 처리량 측정 및 후보 동일성 검증')
+    backends_parser.add_argument('mirror_dir', help='측정할 미러 디렉터리')
+    backends_parser.add_argument('--site-name', default='dalong.net', help='측정할 사이트 이름')
+    backends_parser.add_argument('--max-files', type=int, default=0, help='읽을 최대 HTML 파일 수 (0: 전체)')
+    backends_parser.add_argument('--repeat', type=int, default=3, help='측정 반복 횟수')
+    backends_parser.set_defaults(func=bench_backends)
+
+    detail_parser = sub_parsers.add_parser('detail', help='Bandai 상세 페이지 파서 처리량 측정 및 결과 동일성 검증')
+    detail_parser.add_argument('detail_dir', nargs='?', help='상세 페이지 디렉터리 (예: manual.bandai-hobby.net/menus/detail)')
+    detail_parser.add_argument('--samples', type=int, default=5000, help='무작위 비교 페이지 수')
+    detail_parser.add_argument('--seed', type=int, default=0, help='무작위 시드')
+    detail_parser.add_argument('--repeat', type=int, default=3, help='측정 반복 횟수')
+    detail_parser.set_defaults(func=bench_detail)
+
+    translate_parser = sub_parsers.add_parser('translate', help='번역 매핑 검색 (정확/정규화/유사 일치) 처리량 측정 및 결과 검증')
+    translate_parser.add_argument('--mapping', default='mapping/bandai_product_ja_ko_mapping.json', help='번역 매핑 파일')
+    translate_parser.add_argument('--size', type=int, default=50000, help='매핑 키 수 (실제 키에 접미사를 붙여 늘림)')
+    translate_parser.add_argument('--queries', type=int, default=2000, help='질의 종류별 개수')
+    translate_parser.add_argument('--threshold', type=float, default=0.8, help='유사 일치 임계값')
+    translate_parser.add_argument('--holdout', type=float, default=0.2, help='보류 검사에서 한 번에 매핑에서 뺄 비율 (1/비율 번 반복해 모든 키를 검사)')
+    translate_parser.add_argument('--seed', type=int, default=0, help='무작위 시드')
+    translate_parser.add_argument('--repeat', type=int, default=3, help='측정 반복 횟수')
+    translate_parser.set_defaults(func=bench_translate)
+
+    compose_parser = sub_parsers.add_parser('compose', help='번역 메모리 조각 조합 제안의 신뢰도별 정확도 측정 (보류 데이터)')
+    compose_parser.add_argument('--mapping', default='mapping/bandai_product_ja_ko_mapping.json', help='번역 매핑 파일')
+    compose_parser.add_argument('--holdout', type=float, default=0.2, help='보류할 매핑 비율')
+    compose_parser.add_argument('--thresholds', default='0,0.5,0.7,0.8,0.9,0.95', help='정확도를 볼 신뢰도 목록')
+    compose_parser.add_argument('--show', type=int, default=0, help='신뢰도가 높은 순서로 이 개수 안의 틀린 제안 출력')
+    compose_parser.add_argument('--seed', type=int, default=0, help='무작위 시드')
+    compose_parser.set_defaults(func=bench_compose)
+
+    merge_parser = sub_parsers.add_parser('merge', help='새 번역 쌍 병합 시간/백업 크기 측정 (항목별 쓰기 vs 한 번에 병합) 및 결과 비교')
+    merge_parser.add_argument('--mapping', default='mapping/bandai_product_ja_ko_mapping.json', help='번역 매핑 파일')
+    merge_parser.add_argument('--size', type=int, default=50000, help='매핑 키 수 (실제 키에 접미사를 붙여 늘림)')
+    merge_parser.add_argument('--pairs', type=int, default=100, help='병합할 새 번역 쌍 수')
+    merge_parser.set_defaults(func=bench_merge)
+
+    startup_parser = sub_parsers.add_parser('startup', help='번역 매핑 불러오기 시간 측정 (JSON + 인덱스 생성 vs 컴파일 결과) 및 결과 비교')
+    startup_parser.add_argument('--mapping', default='mapping/bandai_product_ja_ko_mapping.json', help='번역 매핑 파일')
+    startup_parser.add_argument('--sizes', default='10000,100000', help='매핑 키 수 목록 (실제 키에 접미사를 붙여 늘림)')
+    startup_parser.add_argument('--repeat', type=int, default=3, help='컴파일 결과 불러오기 반복 횟수 (최솟값 사용)')
+    startup_parser.add_argument('--memory', action='store_true', help='번역 메모리 생성/복원 시간도 측정 (큰 매핑에서는 오래 걸림)')
+    startup_parser.set_defaults(func=bench_startup)
+
+    catalog_parser = sub_parsers.add_parser('catalog', help='HTML 목록 검색 인덱스 생성/질의 시간 측정 (node가 있으면 기존 퍼지 매칭과 결과 비교)')
+    catalog_parser.add_argument('--mapping', default='mapping/bandai_product_ja_ko_mapping.json', help='번역 매핑 파일')
+    catalog_parser.add_argument('--size', type=int, default=50000, help='목록 항목 수 (실제 번역에 접미사를 붙여 늘림)')
+    catalog_parser.add_argument('--queries', type=int, default=200, help='질의 수')
+    catalog_parser.add_argument('--legacy-queries', type=int, default=20, help='기존 퍼지 매칭으로도 실행할 질의 수 (느림)')
+    catalog_parser.add_argument('--seed', type=int, default=0, help='무작위 시드')
+    catalog_parser.set_defaults(func=bench_catalog)
+
+    corpus_parser = sub_parsers.add_parser('corpus', help='사이트별 합성 코퍼스 생성 (dalong/gundaminfo/bandai HTML + gcd JSON)')
+    corpus_parser.add_argument('output_dir', help='코퍼스를 만들 디렉터리')
+    corpus_parser.add_argument('--files', type=int, default=1000, help='사이트별 파일 수')
+    corpus_parser.add_argument('--seed', type=int, default=0, help='무작위 시드')
+    corpus_parser.set_defaults(func=bench_corpus)
+
+    suite_parser = sub_parsers.add_parser('suite', help='코퍼스 크기별 추출 단계 처리량/최대 메모리/출력 해시 측정')
+    suite_parser.add_argument('--sizes', default='1000,10000', help='사이트별 파일 수 목록 (예: 1000,10000,100000)')
+    suite_parser.add_argument('--work-dir', default='bench_corpus', help='코퍼스를 만들고 재사용할 디렉터리')
+    suite_parser.add_argument('--seed', type=int, default=0, help='무작위 시드')
+    suite_parser.add_argument('--max-chunks', type=int, default=200000, help='clean_text/is_potential_gunpla 측정에 쓸 최대 텍스트 조각 수')
+    suite_parser.add_argument('--save', help='결과를 JSON으로 저장')
+    suite_parser.add_argument('--compare', help='이전에 저장한 결과와 속도/출력 해시 비교')
+    suite_parser.set_defaults(func=bench_suite)
+
+    args = parser.parse_args()
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
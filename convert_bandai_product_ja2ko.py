@@ -1,20 +1,64 @@
 #!/usr/bin/env python
 
 
+import os
 import sys
+import math
 import re
 import json
+import gzip
 import getopt
+import hashlib
+import marshal
 import unicodedata
 import requests
 import time
+import sqlite3
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
 from pathlib import Path
+from urllib.parse import urlparse
+from requests.adapters import HTTPAdapter
 from typing import Optional
 
+from reference_index import KANA_CLASSES
+from translation_memory import AUTO_ACCEPT_CONFIDENCE, TranslationMemory
+
+# brotli가 있으면 분할 HTML 목록에 .br 압축본도 생성
+try:
+    import brotli
+    HAS_BROTLI = True
+except ImportError:
+    HAS_BROTLI = False
+
 
 MANUAL_DIR_PATH = Path("manual.bandai-hobby.net")
 BASE_URL = "https://manual.bandai-hobby.net"
 
+# 누락된 PDF 다운로드 설정
+DOWNLOAD_WORKERS = 8          # 동시 다운로드 수
+DOWNLOAD_PER_HOST = 4         # 호스트별 동시 연결 수
+DOWNLOAD_RETRIES = 3          # 실패 시 재시도 횟수
+DOWNLOAD_BACKOFF = 1.0        # 재시도 대기 시간 (초, 재시도마다 2배)
+DOWNLOAD_DELAY = 0.1          # 다운로드 후 대기 (서버 부하 방지)
+DOWNLOAD_TIMEOUT = (10, 30)   # (연결, 읽기) 타임아웃
+DOWNLOAD_CHUNK_SIZE = 64 * 1024
+
+# 상세 페이지 파싱 프로세스 수 (파싱할 페이지가 PARALLEL_PARSE_MIN_PAGES개 이상일 때만 프로세스 풀 사용)
+PARSE_WORKERS = os.cpu_count() or 1
+PARALLEL_PARSE_MIN_PAGES = 200
+
+# 상세 페이지 파싱 결과 캐시 (미러 디렉터리 옆)
+DETAIL_CACHE_PATH = Path("bandai_detail_cache.db")
+# get_product_name_from_file의 결과가 바뀌도록 수정하면 올림 (이전 버전의 캐시는 모두 무효)
+PARSER_VERSION = 1
+
+# 번역 매핑 컴파일 결과 (clean_text로 정규화한 매핑 + 검색 인덱스 + 번역 메모리, marshal)
+# 매핑 JSON의 경로/크기/mtime이 같을 때만 사용하고, 다르면 실행 중에 다시 만들어 저장
+COMPILED_MAPPING_PATH = Path("bandai_mapping_cache.marshal")
+# clean_text/canonical_key/TranslationIndex/TranslationMemory의 결과나 저장 형식이 바뀌도록 수정하면 올림
+COMPILED_MAPPING_VERSION = 2
+
 # 사용된 번역 키들을 추적하기 위한 전역 변수
 used_translation_keys = set()
 
@@ -27,8 +71,8 @@ def read_translation(translation_file_path: Path) -> dict[str, str]:
 
 
 def write_translation(translation_file_path: Path, translation_data: dict[str, str]) -> None:
-    with translation_file_path.open("w", encoding="utf-8") as outfile:
-        json.dump(translation_data, outfile, ensure_ascii=False, indent=2, sort_keys=True)
+    # 쓰는 도중에 중단돼도 이전 매핑이 남도록 임시 파일에 쓴 뒤 교체
+    write_text_atomic(translation_file_path, json.dumps(translation_data, ensure_ascii=False, indent=2, sort_keys=True))
 
 
 def convert_full_character_to_half(text: str) -> str:
@@ -40,182 +84,655 @@ def clean_text(text: str) -> str:
     return convert_full_character_to_half(text)
 
 
+BRAND_PATTERN = r'(?P<brand>30MM|30MS|30MF|SDW HEROES|Figure-rise Standard|SDガンダム EX|SDガンダム|SDBD:R|SDBF|SDBD|ADVANCE OF Z|BB戦士|HGBF|HGBC|FULL MECHANICS|HGBD:R|HGBD|HGFC|ENTRY GRADE|RE/?100|HGAC|HGCE|EXPO|MGSD|HGCC|HGAW|HGUC|MGEX|RG|MG|PG|HG)'
+
+# 상세 페이지 상품명 줄 패턴 (위에서부터 먼저 맞는 패턴 사용): 스케일만, 브랜드 + 스케일, 브랜드만, 상품명만
+TITLE_SCALE_RE = re.compile(r'<h2 class="el_title"><span>(?P<scale>1/\d{1,4})\s*(?P<product_name>.+)</span></h2>')
+TITLE_BRAND_SCALE_RE = re.compile(r'<h2 class="el_title"><span>' + BRAND_PATTERN + r'.*(?P<scale>1/\d{1,4})[ \u3000\xa0\s]*(?P<product_name>.+)</span></h2>')
+TITLE_BRAND_RE = re.compile(r'<h2 class="el_title"><span>' + BRAND_PATTERN + r'[ \u3000\xa0\s]*(?P<product_name>.+)</span></h2>')
+TITLE_RE = re.compile(r'<h2 class="el_title"><span>(?P<product_name>.+)</span></h2>')
+YEAR_RE = re.compile(r'<dd class="bl_detail_box_txt">(?P<year>(19|20)\d\d)年.*</dd>')
+
+TITLE_MARKER = b'el_title'
+YEAR_MARKER = b'bl_detail_box_txt'
+
+
+def find_line(data: bytes, marker: bytes, start: int, end: int) -> Optional[tuple[int, int]]:
+    """data[start:end]에서 marker가 있는 마지막 줄의 (시작, 끝) 위치 (줄 구분: \n, \r\n, \r)"""
+    pos = data.rfind(marker, start, end)
+    if pos < 0:
+        return None
+    line_start = max(data.rfind(b'\n', 0, pos), data.rfind(b'\r', 0, pos)) + 1
+    line_end = len(data)
+    for newline in (b'\n', b'\r'):
+        newline_pos = data.find(newline, pos)
+        if 0 <= newline_pos < line_end:
+            line_end = newline_pos
+    return line_start, line_end
+
+
+def parse_title_line(line: str) -> tuple[str, str, str]:
+    """상품명 줄에서 (상품명, 브랜드, 스케일) 추출"""
+    m = TITLE_SCALE_RE.search(line)
+    if m:
+        return m.group("product_name"), "", m.group("scale").replace("/", "_")
+
+    m = TITLE_BRAND_SCALE_RE.search(line)
+    if m:
+        brand = clean_text(m.group("brand")).replace("RE/100", "RE100")
+        return m.group("product_name"), brand, m.group("scale").replace("/", "_")
+
+    m = TITLE_BRAND_RE.search(line)
+    if m:
+        brand = clean_text(m.group("brand")).replace("RE/100", "RE100")
+        return m.group("product_name"), brand, ""
+
+    return TITLE_RE.search(line).group("product_name"), "", ""
+
+
 def get_product_name_from_file(file_path: Path) -> tuple[str, str, str, str]:
-    product_name = ""
-    brand = ""
-    scale = ""
+    """상세 페이지에서 (상품명, 브랜드, 스케일, 발매년) 추출
+
+    페이지 전체를 줄 단위로 정규화/검색하지 않고 원본 바이트에서 el_title, bl_detail_box_txt가 있는 줄만
+    뒤에서부터 찾아 그 줄만 NFKC 정규화 후 검사한다. 마지막 상품명 줄과 그 뒤의 마지막 발매년 줄을 찾으면 종료한다.
+    """
+    data = file_path.read_bytes()
+
+    # 마지막 상품명 줄 (상품명 줄 앞의 발매년은 사용하지 않음)
+    product_name = brand = scale = ""
+    title_end = 0
+    end = len(data)
+    while True:
+        found = find_line(data, TITLE_MARKER, 0, end)
+        if found is None:
+            break
+        line_start, line_end = found
+        line = convert_full_character_to_half(data[line_start:line_end].decode("utf-8"))
+        if TITLE_RE.search(line):
+            product_name, brand, scale = parse_title_line(line)
+            title_end = line_end
+            break
+        end = line_start
+
+    # 상품명 줄 뒤의 마지막 발매년 줄
     year = ""
+    end = len(data)
+    while True:
+        found = find_line(data, YEAR_MARKER, title_end, end)
+        if found is None:
+            break
+        line_start, line_end = found
+        m = YEAR_RE.search(convert_full_character_to_half(data[line_start:line_end].decode("utf-8")))
+        if m:
+            year = m.group("year")
+            break
+        end = line_start
 
-    with file_path.open("r", encoding="utf-8") as infile:
-        for line in infile:
-            line = convert_full_character_to_half(line)
-
-            m = re.search(r'<h2 class="el_title"><span>(?P<scale>1/\d{1,4})\s*(?P<product_name>.+)</span></h2>', line)
-            if m:
-                brand = ""
-                scale = m.group("scale")
-                scale = re.sub(r"/", "_", scale)
-                product_name = m.group("product_name")
-                year = ""
-                continue
+    return product_name, brand, scale, year
 
-            m = re.search(r'<h2 class="el_title"><span>(?P<brand>30MM|30MS|30MF|SDW HEROES|Figure-rise Standard|SDガンダム EX|SDガンダム|SDBD:R|SDBF|SDBD|ADVANCE OF Z|BB戦士|HGBF|HGBC|FULL MECHANICS|HGBD:R|HGBD|HGFC|ENTRY GRADE|RE/?100|HGAC|HGCE|EXPO|MGSD|HGCC|HGAW|HGUC|MGEX|RG|MG|PG|HG).*(?P<scale>1/\d{1,4})[ \u3000\xa0\s]*(?P<product_name>.+)</span></h2>', line)
-            if m:
-                brand = m.group("brand")
-                brand = clean_text(brand)
-                brand = re.sub(r"RE/100", "RE100", brand)
-                scale = m.group("scale")
-                scale = re.sub(r"/", "_", scale)
-                product_name = m.group("product_name")
-                year = ""
-                continue
 
-            m = re.search(r'<h2 class="el_title"><span>(?P<brand>30MM|30MS|30MF|SDW HEROES|Figure-rise Standard|SDガンダム EX|SDガンダム|SDBD:R|SDBF|SDBD|ADVANCE OF Z|BB戦士|HGBF|HGBC|FULL MECHANICS|HGBD:R|HGBD|HGFC|ENTRY GRADE|RE/?100|HGAC|HGCE|EXPO|MGSD|HGCC|HGAW|HGUC|MGEX|RG|MG|PG|HG)[ \u3000\xa0\s]*(?P<product_name>.+)</span></h2>', line)
-            if m:
-                brand = m.group("brand")
-                brand = clean_text(brand)
-                brand = re.sub(r"RE/100", "RE100", brand)
-                scale = ""
-                product_name = m.group("product_name")
-                year = ""
+class DetailPageCache:
+    """상세 페이지 파싱 결과 캐시 (제품번호별, 파일 mtime/크기와 파서 버전이 같을 때만 유효)"""
+
+    def __init__(self, db_path: Path = DETAIL_CACHE_PATH):
+        self.db_path = db_path
+        self.conn = sqlite3.connect(db_path)
+        self.init_database()
+        # 상품 수천 개 규모이므로 한 번에 읽어 메모리에서 조회
+        self.pages = {row[0]: row[1:] for row in self.conn.execute(
+            "SELECT product_number, mtime_ns, size, product_name, brand, scale, year FROM detail_pages")}
+        self.hits = 0
+        self.misses = 0
+
+    def init_database(self):
+        """데이터베이스 초기화"""
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS cache_info (
+                key TEXT PRIMARY KEY,
+                value TEXT
+            )
+        """)
+
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS detail_pages (
+                product_number INTEGER PRIMARY KEY,
+                mtime_ns INTEGER,
+                size INTEGER,
+                product_name TEXT,
+                brand TEXT,
+                scale TEXT,
+                year TEXT
+            )
+        """)
+
+        # 파서 버전이 바뀌었으면 전체 무효화
+        row = self.conn.execute("SELECT value FROM cache_info WHERE key = 'parser_version'").fetchone()
+        if row is None or row[0] != str(PARSER_VERSION):
+            self.conn.execute("DELETE FROM detail_pages")
+            self.conn.execute("INSERT OR REPLACE INTO cache_info (key, value) VALUES ('parser_version', ?)", (str(PARSER_VERSION),))
+        self.conn.commit()
+
+    def lookup(self, product_number: int, file_stat: os.stat_result) -> Optional[tuple[str, str, str, str]]:
+        """캐시된 파싱 결과 (없거나 파일이 바뀌었으면 None)"""
+        cached = self.pages.get(product_number)
+        if cached and cached[0] == file_stat.st_mtime_ns and cached[1] == file_stat.st_size:
+            self.hits += 1
+            return cached[2:]
+        return None
+
+    def store(self, product_number: int, file_stat: os.stat_result, result: tuple[str, str, str, str]) -> None:
+        """새로 파싱한 결과 저장 (커밋은 close 시 한 번에)"""
+        self.misses += 1
+        self.conn.execute("""
+            INSERT OR REPLACE INTO detail_pages (product_number, mtime_ns, size, product_name, brand, scale, year)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+        """, (product_number, file_stat.st_mtime_ns, file_stat.st_size, *result))
+
+    def close(self):
+        self.conn.commit()
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+def parse_detail_pages(detail_pages: list[tuple[int, Path]], cache: Optional[DetailPageCache] = None,
+                       workers: int = PARSE_WORKERS) -> list[tuple[str, str, str, str]]:
+    """
+    (제품번호, 상세 페이지) 목록을 파싱해 같은 순서의 (상품명, 브랜드, 스케일, 발매년) 목록 반환
+    캐시에 없거나 바뀐 페이지만 파싱하며, 파싱할 페이지가 많으면 프로세스 풀로 나눠 파싱
+    """
+    results: list = [None] * len(detail_pages)
+    misses = []  # (인덱스, 제품번호, 파일, stat)
+    for index, (product_number, file_path) in enumerate(detail_pages):
+        file_stat = None
+        if cache is not None:
+            file_stat = file_path.stat()
+            cached = cache.lookup(product_number, file_stat)
+            if cached is not None:
+                results[index] = cached
                 continue
+        misses.append((index, product_number, file_path, file_stat))
+
+    file_paths = [file_path for _, _, file_path, _ in misses]
+    if workers > 1 and len(file_paths) >= PARALLEL_PARSE_MIN_PAGES:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            chunksize = max(1, len(file_paths) // (workers * 4))
+            parsed = list(executor.map(get_product_name_from_file, file_paths, chunksize=chunksize))
+    else:
+        parsed = [get_product_name_from_file(file_path) for file_path in file_paths]
+
+    for (index, product_number, file_path, file_stat), result in zip(misses, parsed):
+        results[index] = result
+        if cache is not None:
+            cache.store(product_number, file_stat, result)
+    return results
+
+
+# 정규화 키: 장음/가운뎃점/공백/따옴표/하이픈 차이를 무시하고 브랜드/스케일 토큰을 제거
+CANONICAL_BRAND_RE = re.compile(r'(?<![A-Za-z0-9])' + BRAND_PATTERN + r'(?![A-Za-z0-9])', re.IGNORECASE)
+CANONICAL_SCALE_RE = re.compile(r'1/\d{1,4}')
+CANONICAL_STRIP_RE = re.compile(r'[\sー\-‐‑–—―~〜・·•\'"‘’“”`´「」『』]+')
+
+# 유사 일치: 정규화 키의 문자 bigram Dice 유사도가 이 값 이상인 후보 중
+# 가나 외 부분 (형식번호/영문/한자/괄호)과 가나 자음 순서가 같고 가나 표기 차이가 작은 키만 번역으로 사용 (표시해서 출력)
+# (작은 가나 표기 흔들림만 허용: ヴァ/バ, ィ/イ, ュ/ユ, ッ 유무 등, マスター/バスター처럼 자음이 다르거나
+#  オーガンダム/ガンダム처럼 모음/반모음 글자가 더하거나 빠지면 다른 상품)
+FUZZY_MATCH_THRESHOLD = 0.8
+FUZZY_MATCH_MIN_GRAMS = 3
+FUZZY_MATCH_CHARS_PER_EDIT = 10   # 정규화 키 길이 10자당 가나 한 글자 차이 허용 (최소 1)
+KANA_RE = re.compile(r'[\u3041-\u30ff]')
+
+# 유사 일치 자음 순서에서는 모음(V)/반모음(Y, W)도 한 글자로 셈 (작은 글자는 큰 글자와 같은 클래스: ティ/テイ)
+# ヴ 뒤의 모음과 ブ 뒤의 작은 모음은 앞 글자와 한 음절이므로 세지 않음 (ヴァ/ヴア/ブァ/バ)
+FUZZY_VOWEL_CLASSES = {}
+for _vowel_class, _row in {'V': 'あいうえおぁぃぅぇぉ', 'Y': 'やゆよゃゅょ', 'W': 'わをゎ'}.items():
+    for _kana in _row:
+        FUZZY_VOWEL_CLASSES[_kana] = _vowel_class
+        FUZZY_VOWEL_CLASSES[chr(ord(_kana) + 0x60)] = _vowel_class  # 가타카나
+SMALL_VOWELS = 'ぁぃぅぇぉァィゥェォ'
+
+
+def canonical_key(text: str) -> str:
+    """번역 키 비교용 정규화 (NFKC, 브랜드/스케일 제거, 장음/가운뎃점/공백/따옴표 제거, 소문자)"""
+    text = convert_full_character_to_half(text)
+    text = CANONICAL_BRAND_RE.sub(' ', text)
+    text = CANONICAL_SCALE_RE.sub(' ', text)
+    return CANONICAL_STRIP_RE.sub('', text).lower()
+
+
+def kana_consonants(text: str) -> str:
+    """가나의 자음/모음 클래스 순서 (같은 클래스가 이어져도 줄이지 않음: ウイング ≠ ウイニング, ガンダム ≠ オーガンダム)"""
+    classes = []
+    for i, ch in enumerate(text):
+        if ch in FUZZY_VOWEL_CLASSES:
+            if i and FUZZY_VOWEL_CLASSES[ch] == 'V' and (text[i - 1] in 'ゔヴ' or (ch in SMALL_VOWELS and text[i - 1] in 'ぶブ')):
+                continue
+            classes.append(FUZZY_VOWEL_CLASSES[ch])
+        else:
+            classes.append(KANA_CLASSES.get(ch, ''))
+    return ''.join(classes)
+
+
+def key_grams(key: str) -> frozenset[str]:
+    return frozenset(key[i:i + 2] for i in range(len(key) - 1))
+
+
+def edit_distance(a: str, b: str, limit: int) -> int:
+    """레벤슈타인 거리 (limit를 넘으면 limit + 1)"""
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    previous = list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        current = [i]
+        for j, cb in enumerate(b, 1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (ca != cb)))
+        if min(current) > limit:
+            return limit + 1
+        previous = current
+    return min(previous[-1], limit + 1)
 
-            m = re.search(r'<h2 class="el_title"><span>(?P<product_name>.+)</span></h2>', line)
-            if m:
-                brand = ""
-                scale = ""
-                product_name = m.group("product_name")
-                product_name = product_name
-                year = ""
+
+class TranslationIndex:
+    """
+    번역 매핑 검색 인덱스 (실행마다 한 번 생성)
+    1) 정확한 키 2) 정규화 키 3) 정규화 키 bigram 역색인으로 찾은 유사 키 순서로 검색
+    정규화/유사 검색은 번역값이 있는 키만 사용하고, 같은 정규화 키에 번역값이 서로 다르면 사용하지 않음
+    """
+
+    def __init__(self, translation_data: dict[str, str], fuzzy_threshold: float = FUZZY_MATCH_THRESHOLD):
+        self.translation_data = translation_data
+        self.fuzzy_threshold = fuzzy_threshold
+        # load_translation_index로 만든 경우 컴파일 결과 (번역 메모리를 추가 저장할 때 사용)
+        self.compiled_path: Optional[Path] = None
+        self.compiled: Optional[dict] = None
+
+        canonical: dict[str, Optional[str]] = {}
+        for key in sorted(translation_data):
+            value = translation_data[key]
+            if not value:
                 continue
+            ckey = canonical_key(key)
+            if not ckey:
+                continue
+            if ckey not in canonical:
+                canonical[ckey] = key
+            elif canonical[ckey] is not None and translation_data[canonical[ckey]] != value:
+                canonical[ckey] = None  # 번역값이 다른 키끼리 충돌 → 모호
+        self.canonical = {ckey: key for ckey, key in canonical.items() if key is not None}
+
+        # 가나 외 부분 → bigram → 정규화 키 번호 목록 (유사 검색 후보는 가나 외 부분이 같은 키로 한정)
+        self.fuzzy_keys = sorted(self.canonical)
+        self.fuzzy_grams = [key_grams(ckey) for ckey in self.fuzzy_keys]
+        self.fuzzy_consonants = [kana_consonants(ckey) for ckey in self.fuzzy_keys]
+        self.postings: dict[str, dict[str, list[int]]] = {}
+        for key_id, (ckey, grams) in enumerate(zip(self.fuzzy_keys, self.fuzzy_grams)):
+            postings = self.postings.setdefault(KANA_RE.sub('', ckey), {})
+            for gram in grams:
+                if gram in postings:
+                    postings[gram].append(key_id)
+                else:
+                    postings[gram] = [key_id]
+
+    def state(self) -> tuple:
+        """저장용 상태 (정규화 키, 유사 검색 키/bigram/자음 순서, 역색인)"""
+        return self.canonical, self.fuzzy_keys, self.fuzzy_grams, self.fuzzy_consonants, self.postings
+
+    @classmethod
+    def from_state(cls, translation_data: dict[str, str], state: tuple,
+                   fuzzy_threshold: float = FUZZY_MATCH_THRESHOLD) -> "TranslationIndex":
+        """state()로 저장한 상태에서 복원 (키 정규화와 역색인 생성을 건너뜀)"""
+        index = cls.__new__(cls)
+        index.translation_data = translation_data
+        index.fuzzy_threshold = fuzzy_threshold
+        index.compiled_path = None
+        index.compiled = None
+        index.canonical, index.fuzzy_keys, index.fuzzy_grams, index.fuzzy_consonants, index.postings = state
+        return index
+
+    def lookup(self, product_name: str, brand: str, scale: str) -> Optional[tuple[str, str]]:
+        """(매핑 키, 일치 방식) 반환, 일치 방식: "exact", "canonical", "fuzzy" """
+        for key in (product_name + " " + brand + " " + scale, product_name + " " + brand, product_name + " " + scale, product_name):
+            if key in self.translation_data:
+                return key, "exact"
+
+        ckey = canonical_key(product_name)
+        if ckey in self.canonical:
+            return self.canonical[ckey], "canonical"
+
+        key_id = self.fuzzy_lookup(ckey)
+        if key_id is not None:
+            return self.canonical[self.fuzzy_keys[key_id]], "fuzzy"
+        return None
+
+    def fuzzy_lookup(self, ckey: str) -> Optional[int]:
+        """
+        Dice(bigram) 유사도가 높은 순서로, 가나 외 부분과 가나 자음 순서가 같고 가나 차이가 허용 범위인 정규화 키 번호 (없으면 None)
+        임계값 t를 넘으려면 질의 bigram 중 최소 ceil(t*|A|/(2-t))개를 공유해야 하므로,
+        역색인에 있는 bigram 중 드문 것부터 (개수 - 그 수 + 1)개의 목록만 훑어 후보를 모음 (흔한 bigram의 긴 목록은 건너뜀)
+        """
+        grams = key_grams(ckey)
+        t = self.fuzzy_threshold
+        if len(grams) < FUZZY_MATCH_MIN_GRAMS or not 0 < t <= 1:
+            return None
+        size = len(grams)
+        min_overlap = math.ceil(t * size / (2 - t) - 1e-9)
+        postings = self.postings.get(KANA_RE.sub('', ckey), {})
+        prefix = sorted((gram for gram in grams if gram in postings), key=lambda gram: (len(postings[gram]), gram))
+        prefix = prefix[:len(prefix) - min_overlap + 1]
+
+        min_size = t * size / (2 - t) - 1e-9
+        max_size = (2 - t) * size / t + 1e-9
+        candidates = []
+        seen = set()
+        for gram in prefix:
+            for key_id in postings[gram]:
+                if key_id in seen:
+                    continue
+                seen.add(key_id)
+                candidate = self.fuzzy_grams[key_id]
+                if not min_size <= len(candidate) <= max_size:
+                    continue
+                score = 2 * len(grams & candidate) / (size + len(candidate))
+                if score >= t - 1e-9:
+                    candidates.append((-score, key_id))
+
+        # 점수가 같으면 정렬 순서가 앞선 키
+        max_edits = max(1, len(ckey) // FUZZY_MATCH_CHARS_PER_EDIT)
+        consonants = kana_consonants(ckey)
+        for _, key_id in sorted(candidates):
+            if self.fuzzy_consonants[key_id] != consonants:
+                continue
+            if edit_distance(ckey, self.fuzzy_keys[key_id], max_edits) <= max_edits:
+                return key_id
+        return None
 
-            m = re.search(r'<dd class="bl_detail_box_txt">(?P<year>(19|20)\d\d)年.*</dd>', line)
-            if m:
-                year = m.group("year")
 
-    return product_name, brand, scale, year
+def mapping_signature(translation_file_path: Path) -> tuple:
+    """컴파일 결과가 유효한지 비교할 값 (매핑 경로/크기/mtime, 컴파일 버전, marshal 형식이 바뀔 수 있는 파이썬 버전)"""
+    file_stat = translation_file_path.stat()
+    return (str(translation_file_path.resolve()), file_stat.st_size, file_stat.st_mtime_ns,
+            COMPILED_MAPPING_VERSION, tuple(sys.version_info[:2]))
 
 
-def convert_ja_to_ko(translation_data: dict[str, str], product_name: str, brand: str, scale: str) -> tuple[str, str]:
+def read_compiled_mapping(compiled_path: Path, signature: tuple) -> Optional[dict]:
+    """컴파일 결과 (없거나, 깨졌거나, 다른 매핑/버전이면 None)"""
+    try:
+        # marshal.load(파일)은 객체마다 조금씩 읽어 느리므로 한 번에 읽어서 변환
+        compiled = marshal.loads(compiled_path.read_bytes())
+    except (OSError, EOFError, ValueError, TypeError):
+        return None
+    if not isinstance(compiled, dict) or compiled.get("signature") != signature:
+        return None
+    return compiled
+
+
+def write_compiled_mapping(compiled_path: Path, compiled: dict) -> None:
+    """컴파일 결과 저장 (임시 파일에 쓴 뒤 교체, 저장하지 못해도 실행은 계속)"""
+    tmp_path = compiled_path.with_name(compiled_path.name + ".tmp")
+    try:
+        tmp_path.write_bytes(marshal.dumps(compiled))
+        os.replace(tmp_path, compiled_path)
+    except (OSError, ValueError) as e:
+        sys.stderr.write(f"can't write compiled mapping '{compiled_path}': {e}\n")
+
+
+def load_translation_index(translation_file_path: Path, fuzzy_threshold: float = FUZZY_MATCH_THRESHOLD,
+                           compiled_path: Optional[Path] = COMPILED_MAPPING_PATH) -> TranslationIndex:
+    """
+    번역 매핑 검색 인덱스: 컴파일 결과가 유효하면 그대로 불러오고, 없거나 매핑이 바뀌었으면
+    JSON을 읽어 새로 만든 뒤 저장 (compiled_path가 None이면 컴파일 결과를 쓰지 않음)
+    """
+    if compiled_path is None:
+        return TranslationIndex(read_translation(translation_file_path), fuzzy_threshold)
+
+    signature = mapping_signature(translation_file_path)
+    compiled = read_compiled_mapping(compiled_path, signature)
+    if compiled is not None:
+        translation_index = TranslationIndex.from_state(compiled["translation_data"], compiled["index"], fuzzy_threshold)
+    else:
+        translation_index = TranslationIndex(read_translation(translation_file_path), fuzzy_threshold)
+        # 번역 메모리는 처음 필요할 때 만들어 추가 저장
+        compiled = {"signature": signature, "translation_data": translation_index.translation_data,
+                    "index": translation_index.state(), "memory": None}
+        write_compiled_mapping(compiled_path, compiled)
+    translation_index.compiled_path = compiled_path
+    translation_index.compiled = compiled
+    return translation_index
+
+
+def load_translation_memory(translation_index: TranslationIndex) -> TranslationMemory:
+    """번역 메모리: 컴파일 결과에 있으면 복원하고, 없으면 매핑으로 만든 뒤 컴파일 결과에 추가 저장"""
+    compiled = translation_index.compiled
+    if compiled is not None and compiled.get("memory") is not None:
+        return TranslationMemory.from_state(compiled["memory"])
+    translation_memory = TranslationMemory.from_mapping(translation_index.translation_data)
+    if compiled is not None:
+        compiled["memory"] = translation_memory.state()
+        write_compiled_mapping(translation_index.compiled_path, compiled)
+    return translation_memory
+
+
+def convert_ja_to_ko(translation_index: TranslationIndex, product_name: str, brand: str, scale: str) -> tuple[str, str]:
     """
     번역 시도하고 (번역결과, 상태) 튜플 반환
-    상태: "success", "empty", "not_found"
+    상태: "success" (정확한 키), "canonical" (정규화 키), "fuzzy" (유사 키, 확인 필요), "empty", "not_found"
     """
     # cleaning
     product_name = clean_text(product_name)
     brand = clean_text(brand)
 
-    # 각 키를 순차적으로 시도하고 사용된 키를 기록
-    key = product_name + " " + brand + " " + scale
-    if key in translation_data:
-        result = translation_data[key]
-        used_translation_keys.add(key)
-        if result:
-            return re.sub(r'[/"]', '', result), "success"
-        else:
-            return "", "empty"
-
-    key = product_name + " " + brand
-    if key in translation_data:
-        result = translation_data[key]
-        used_translation_keys.add(key)
-        if result:
-            return re.sub(r'[/"]', '', result), "success"
-        else:
-            return "", "empty"
-
-    key = product_name + " " + scale
-    if key in translation_data:
-        result = translation_data[key]
-        used_translation_keys.add(key)
-        if result:
-            return re.sub(r'[/"]', '', result), "success"
-        else:
-            return "", "empty"
-
-    key = product_name
-    if key in translation_data:
-        result = translation_data[key]
-        used_translation_keys.add(key)
-        if result:
-            return re.sub(r'[/"]', '', result), "success"
-        else:
-            return "", "empty"
+    # 정확한 키 → 정규화 키 → 유사 키 순서로 찾고 사용된 키를 기록
+    match = translation_index.lookup(product_name, brand, scale)
+    if match is None:
+        return product_name, "not_found"
+
+    key, match_type = match
+    used_translation_keys.add(key)
+    result = translation_index.translation_data[key]
+    if result:
+        return re.sub(r'[/"]', '', result), "success" if match_type == "exact" else match_type
+    else:
+        return "", "empty"
 
-    # 기존 방식으로 찾지 못한 경우
-    return product_name, "not_found"
 
+def create_download_session() -> requests.Session:
+    """다운로드 풀에서 공유하는 requests 세션 생성 (연결 풀 크기 = 동시 다운로드 수)"""
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=DOWNLOAD_WORKERS, pool_maxsize=DOWNLOAD_WORKERS)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
 
-def download_pdf(product_number: int, pdf_dir_path: Path) -> bool:
+
+def download_pdf(product_number: int, pdf_dir_path: Path, session: Optional[requests.Session] = None,
+                 host_limit: Optional[threading.Semaphore] = None) -> bool:
     """
     제품번호에 해당하는 PDF 파일을 다운로드
+    임시 파일(.part)로 스트리밍한 뒤 완료되면 이름을 바꾸고, 네트워크 오류/429/5xx는 백오프 후 재시도
     """
     url = f"{BASE_URL}/pdf/{product_number}.pdf"
     target_file = pdf_dir_path / f"{product_number}.pdf"
+    part_file = pdf_dir_path / f"{product_number}.pdf.part"
+    http = session or requests
+
+    for attempt in range(DOWNLOAD_RETRIES + 1):
+        if attempt:
+            time.sleep(DOWNLOAD_BACKOFF * 2 ** (attempt - 1))
+        try:
+            print(f"DEBUG: PDF 다운로드 시도 - {url}" + (f" (재시도 {attempt})" if attempt else ""))
+            if host_limit is not None:
+                host_limit.acquire()
+            try:
+                with http.get(url, timeout=DOWNLOAD_TIMEOUT, stream=True) as response:
+                    response.raise_for_status()
+                    with part_file.open("wb") as f:
+                        for chunk in response.iter_content(DOWNLOAD_CHUNK_SIZE):
+                            f.write(chunk)
+                time.sleep(DOWNLOAD_DELAY)  # 서버 부하 방지
+            finally:
+                if host_limit is not None:
+                    host_limit.release()
+
+            os.replace(part_file, target_file)
+            print(f"DEBUG: PDF 다운로드 성공 - {product_number}.pdf")
+            return True
+
+        except requests.exceptions.RequestException as e:
+            part_file.unlink(missing_ok=True)
+            status_code = e.response.status_code if e.response is not None else None
+            print(f"DEBUG: PDF 다운로드 실패 - {product_number}.pdf, {e}")
+            # 404 등 재시도해도 소용없는 응답은 바로 포기
+            if status_code is not None and status_code != 429 and status_code < 500:
+                return False
+        except Exception as e:
+            part_file.unlink(missing_ok=True)
+            print(f"DEBUG: PDF 다운로드 오류 - {product_number}.pdf, {e}")
+            return False
+
+    return False
+
+
+def download_pdfs(pending_downloads: list[tuple[Path, Path, int]], pdf_dir_path: Path, st: "Stats",
+                  snapshot: Optional["PdfDirectorySnapshot"] = None) -> None:
+    """
+    스캔 중 모은 누락 PDF를 제한된 동시 다운로드 풀로 받아, 끝나는 대로 심볼릭링크 생성 (기존 링크는 교체)
+    pending_downloads: (링크, target, 제품번호) 목록
+    snapshot이 주어지면 받은 PDF와 만든 링크를 반영
+    """
+    if not pending_downloads:
+        return
+
+    start = time.perf_counter()
+    session = create_download_session()
+    host_limits = {urlparse(BASE_URL).netloc: threading.BoundedSemaphore(DOWNLOAD_PER_HOST)}
+    with ThreadPoolExecutor(max_workers=DOWNLOAD_WORKERS) as executor:
+        futures = {
+            executor.submit(download_pdf, product_number, pdf_dir_path, session, host_limits[urlparse(BASE_URL).netloc]):
+                (link, target, product_number)
+            for link, target, product_number in pending_downloads
+        }
+        for future in as_completed(futures):
+            link, target, product_number = futures[future]
+            st.download_attempts += 1
+            if not future.result():
+                st.symlink_target_missing += 1
+                continue
+            st.downloaded_bytes += target.stat().st_size
+            if snapshot is not None:
+                snapshot.pdf_files.add(target.name)
+            try:
+                replace_symbolic_link(link, target.name)
+                print(f"{link.name} -> {target.name} (다운로드 후 생성)")
+                st.symlink_downloaded_and_created += 1
+                if snapshot is not None:
+                    snapshot.links[link.name] = target.name
+            except Exception as e:
+                print(f"DEBUG: 다운로드 후 심볼릭링크 생성 실패 - {link.name}, {e}")
+                st.symlink_creation_failed += 1
+    session.close()
+    st.download_seconds = time.perf_counter() - start
 
-    try:
-        print(f"DEBUG: PDF 다운로드 시도 - {url}")
-        response = requests.get(url, timeout=30)
-        response.raise_for_status()
 
-        with target_file.open("wb") as f:
-            f.write(response.content)
+class PdfDirectorySnapshot:
+    """pdf 디렉터리를 한 번의 os.scandir로 읽은 상태 (실제 PDF 파일 이름, 심볼릭링크 이름 → 링크 대상)"""
+
+    def __init__(self, pdf_dir_path: Path):
+        self.pdf_files: set[str] = set()
+        self.links: dict[str, str] = {}
+        with os.scandir(pdf_dir_path) as it:
+            for entry in it:
+                if entry.is_symlink():
+                    self.links[entry.name] = os.readlink(entry.path)
+                elif entry.name.endswith(".pdf") and entry.is_file():
+                    self.pdf_files.add(entry.name)
 
-        print(f"DEBUG: PDF 다운로드 성공 - {product_number}.pdf")
-        time.sleep(0.1)  # 서버 부하 방지
-        return True
+    def link_targets(self) -> dict[str, list[str]]:
+        """링크 대상별 링크 이름 목록"""
+        targets: dict[str, list[str]] = {}
+        for name, target in self.links.items():
+            targets.setdefault(os.path.basename(target), []).append(name)
+        return targets
 
-    except requests.exceptions.RequestException as e:
-        print(f"DEBUG: PDF 다운로드 실패 - {product_number}.pdf, {e}")
-        return False
-    except Exception as e:
-        print(f"DEBUG: PDF 다운로드 오류 - {product_number}.pdf, {e}")
-        return False
 
+# 이 스크립트가 만드는 링크의 대상 (제품번호.pdf) - 이런 링크만 정리 대상
+MANAGED_LINK_TARGET_RE = re.compile(r'\d+\.pdf')
 
-def make_symbolic_link(link: Path, target: Path, pdf_dir_path: Path, product_number: int = None) -> str:
+
+def replace_symbolic_link(link: Path, target_name: str) -> None:
+    """링크를 target_name으로 생성하거나 원자적으로 교체 (같은 이름의 일반 파일/디렉터리가 있으면 덮어쓰지 않고 FileExistsError)"""
+    if os.path.lexists(link) and not link.is_symlink():
+        raise FileExistsError(f"심볼릭링크가 아닌 파일이 있음: {link}")
+    tmp_link = link.with_name(link.name + ".tmp-link")
+    tmp_link.unlink(missing_ok=True)
+    tmp_link.symlink_to(target_name)
+    os.replace(tmp_link, link)
+
+
+def reconcile_symbolic_links(pdf_dir_path: Path, snapshot: PdfDirectorySnapshot, desired_links: dict[str, int],
+                             st: "Stats", remove_stale: bool = True) -> None:
     """
-    심볼릭링크 생성을 시도하고 결과를 반환
-    반환값: "created", "downloaded_and_created", "already_exists", "target_missing", "failed"
+    원하는 링크 집합(링크 이름 → 제품번호)과 스냅샷의 차이만 적용
+    없는 링크는 생성, 다른 PDF를 가리키는 링크는 교체
+    이번 실행에서 다른 링크 이름으로 처리된 제품번호를 가리키는 관리 링크(제품번호.pdf 대상)만 삭제
+    (파싱/번역에 실패한 제품의 링크는 그대로 둠)
+    대상 PDF가 없으면 동시 다운로드 풀로 받은 뒤 생성
     """
-    if link.is_symlink():
-        return "already_exists"
+    pending_downloads: list[tuple[Path, Path, int]] = []
+    for name, product_number in desired_links.items():
+        target_name = f"{product_number}.pdf"
+        current = snapshot.links.get(name)
+        if current == target_name:
+            st.symlink_already_exists += 1
+            continue
 
-    # 원본 파일이 존재하는지 체크
-    if not target.exists():
-        print(f"DEBUG: target 파일 없음 - {target.name}")
+        link = pdf_dir_path / name
+        if target_name not in snapshot.pdf_files:
+            print(f"DEBUG: target 파일 없음 - {target_name}")
+            pending_downloads.append((link, pdf_dir_path / target_name, product_number))
+            continue
 
-        # 제품번호가 있으면 다운로드 시도
-        if product_number:
-            if download_pdf(product_number, pdf_dir_path):
-                # 다운로드 성공했으면 심볼릭링크 생성 시도
-                try:
-                    link.symlink_to(target.relative_to(pdf_dir_path))
-                    print(f"{link.name} -> {target.relative_to(pdf_dir_path)} (다운로드 후 생성)")
-                    return "downloaded_and_created"
-                except Exception as e:
-                    print(f"DEBUG: 다운로드 후 심볼릭링크 생성 실패 - {link.name}, {e}")
-                    return "failed"
-            else:
-                return "target_missing"
+        try:
+            replace_symbolic_link(link, target_name)
+        except OSError as e:
+            print(f"DEBUG: 심볼릭링크 생성 오류 - {name}, {e}")
+            st.symlink_creation_failed += 1
+            continue
+        snapshot.links[name] = target_name
+        if current is None:
+            print(f"{name} -> {target_name}")
+            st.symlink_created += 1
         else:
-            return "target_missing"
+            print(f"{name} -> {target_name} (교체: {current})")
+            st.symlink_retargeted += 1
+
+    # 번역이 바뀌어 더 이상 쓰지 않는 링크 정리
+    if remove_stale:
+        linked_targets = {f"{product_number}.pdf" for product_number in desired_links.values()}
+        for name, target in list(snapshot.links.items()):
+            if name not in desired_links and MANAGED_LINK_TARGET_RE.fullmatch(target) and target in linked_targets:
+                try:
+                    (pdf_dir_path / name).unlink()
+                except OSError as e:
+                    print(f"DEBUG: 오래된 심볼릭링크 삭제 오류 - {name}, {e}")
+                    continue
+                print(f"DEBUG: 오래된 심볼릭링크 삭제 - {name} -> {target}")
+                del snapshot.links[name]
+                st.symlink_removed += 1
 
-    try:
-        link.symlink_to(target.relative_to(pdf_dir_path))
-        print(f"{link.name} -> {target.relative_to(pdf_dir_path)}")
-        return "created"
-    except FileNotFoundError as e:
-        print(f"DEBUG: 심볼릭링크 생성 실패 - {link.name} -x-> {target.name}, {e}")
-        return "failed"
-    except Exception as e:
-        print(f"DEBUG: 심볼릭링크 생성 오류 - {link.name}, {e}")
-        return "failed"
+    download_pdfs(pending_downloads, pdf_dir_path, st, snapshot)
+
+
+def format_html(product_number: int, full_korean_name: str, korean_name: str, brand: str, scale: str) -> str:
+    return (f"<li data-name='{korean_name}' data-brand='{brand}' data-scale='{scale}'>"
+            f"<a href='{BASE_URL}/pdf/{product_number}.pdf' target='_blank'>{full_korean_name}</a></li>")
 
 
 def print_html(product_number: int, full_korean_name: str, korean_name: str, brand: str, scale: str) -> None:
-    print(f"<li data-name='{korean_name}' data-brand='{brand}' data-scale='{scale}'>"
-          f"<a href='{BASE_URL}/pdf/{product_number}.pdf' target='_blank'>{full_korean_name}</a></li>")
+    print(format_html(product_number, full_korean_name, korean_name, brand, scale))
 
 
 def process_duplicates(product_name_number_dict: dict[str, int], product_number: int, full_korean_name: str, year: str, pdf_dir_path: Path) -> Optional[Path]:
@@ -235,6 +752,9 @@ class Stats:
     product_name_extracted = 0
     translation_success = 0
     translation_empty = 0
+    translation_canonical = 0
+    translation_fuzzy = 0
+    translation_composed = 0
     translation_not_found = 0
     symlink_attempts = 0
     symlink_created = 0
@@ -242,14 +762,39 @@ class Stats:
     symlink_already_exists = 0
     symlink_target_missing = 0
     symlink_creation_failed = 0
-
-
-def process_product_page_files(detail_dir_path: Path, pdf_dir_path: Path, translation_data: dict[str, str], do_print_html: bool) -> Stats:
+    symlink_retargeted = 0
+    symlink_removed = 0
+    download_attempts = 0
+    downloaded_bytes = 0
+    download_seconds = 0.0
+    parse_cache_hits = 0
+    parsed_pages = 0
+    pdf_files = 0
+    symlinks = 0
+    multiple_symlinks: dict[str, list[str]] = {}
+
+
+def process_product_page_files(detail_dir_path: Path, pdf_dir_path: Path, translation_index: TranslationIndex, do_print_html: bool,
+                               cache: Optional[DetailPageCache] = None, html_items: Optional[list] = None,
+                               untranslated_items: Optional[list] = None, workers: int = PARSE_WORKERS,
+                               accept_confidence: float = AUTO_ACCEPT_CONFIDENCE) -> Stats:
+    """
+    상세 페이지를 번역해 심볼릭링크를 만들고 통계 반환
+    파싱은 병렬로 하고, 중복 이름 처리와 심볼릭링크 생성은 제품번호 순서로 해서 실행마다 같은 링크 이름을 만듦
+    html_items, untranslated_items 목록이 주어지면 HTML 목록 항목(이름순), 번역되지 않은 항목을 채움
+    매핑에 없는 상품은 번역 메모리의 조각 조합 제안을 신뢰도가 accept_confidence 이상이면 번역으로 사용하고,
+    아니면 번역되지 않은 항목에 제안으로 붙임
+    """
     st = Stats()
+    translation_memory: Optional[TranslationMemory] = None
 
     product_name_number_dict = {}
     list_to_print: list[tuple[int, str, str, str, str]] = []
-    for file_path in detail_dir_path.iterdir():
+    # 원하는 링크 집합 (링크 이름 → 제품번호), 처리 후 pdf 디렉터리 스냅샷과의 차이만 적용
+    desired_links: dict[str, int] = {}
+
+    detail_pages: list[tuple[int, Path]] = []
+    for file_path in sorted(detail_dir_path.iterdir()):
         if not file_path.is_file():
             print(f"DEBUG: 파일이 아님: {file_path.name}")
             continue
@@ -258,16 +803,38 @@ def process_product_page_files(detail_dir_path: Path, pdf_dir_path: Path, transl
         if not m:
             print(f"DEBUG: 이름 컨벤션이 맞지 않는 파일명: {file_path.name}")
             continue
-        product_number = int(m.group("product_number"))
+        detail_pages.append((int(m.group("product_number")), file_path))
         st.valid_product_number_files += 1
-        product_name, brand, scale, year = get_product_name_from_file(file_path)
 
+    # 파싱 (병렬) → 제품번호 순서로 중복 처리/심볼릭링크 생성
+    detail_pages.sort(key=lambda page: page[0])
+    parsed_pages = parse_detail_pages(detail_pages, cache, workers)
+    for (product_number, file_path), (product_name, brand, scale, year) in zip(detail_pages, parsed_pages):
         if product_name:
             st.product_name_extracted += 1
-            korean, status = convert_ja_to_ko(translation_data, product_name, brand, scale)
-
-            if status == "success":
+            korean, status = convert_ja_to_ko(translation_index, product_name, brand, scale)
+
+            proposal = None
+            if status == "not_found" and translation_index.translation_data:
+                # 번역 메모리는 매핑에 없는 상품이 처음 나올 때 만들거나 컴파일 결과에서 불러옴
+                if translation_memory is None:
+                    translation_memory = load_translation_memory(translation_index)
+                proposal = translation_memory.propose(clean_text(product_name))
+                if proposal and proposal[1] >= accept_confidence:
+                    korean, status = re.sub(r'[/"]', '', proposal[0]), "composed"
+
+            if status in ("success", "canonical", "fuzzy", "composed"):
                 st.translation_success += 1
+                if status == "canonical":
+                    st.translation_canonical += 1
+                elif status == "fuzzy":
+                    # 유사 일치는 번역으로 사용하되 확인할 수 있도록 출력
+                    st.translation_fuzzy += 1
+                    print(f"fuzzy translation: {product_name} / {brand} / {scale} / {product_number} → {korean}")
+                elif status == "composed":
+                    # 조각 조합 제안도 확인할 수 있도록 출력
+                    st.translation_composed += 1
+                    print(f"composed translation: {product_name} / {brand} / {scale} / {product_number} → {korean} (신뢰도 {proposal[1]:.2f})")
                 escaped_korean_name = re.sub(r'/', ' ', korean)
                 full_korean_name = escaped_korean_name + ((" " + brand) if brand else "") + ((" " + scale) if scale else "")
 
@@ -281,26 +848,44 @@ def process_product_page_files(detail_dir_path: Path, pdf_dir_path: Path, transl
                 list_to_print.append((product_number, full_korean_name, escaped_korean_name, brand, scale))
 
                 st.symlink_attempts += 1
-                result = make_symbolic_link(link, target, pdf_dir_path, product_number)
-                if result == "created":
-                    st.symlink_created += 1
-                elif result == "downloaded_and_created":
-                    st.symlink_downloaded_and_created += 1
-                elif result == "already_exists":
+                if link.name in desired_links:
+                    # 먼저 처리한 (제품번호가 작은) 제품이 같은 이름의 링크를 사용
                     st.symlink_already_exists += 1
-                elif result == "target_missing":
-                    st.symlink_target_missing += 1
-                else:  # "failed"
-                    st.symlink_creation_failed += 1
+                else:
+                    desired_links[link.name] = product_number
             elif status == "empty":
                 st.translation_empty += 1
                 print(f"translating error: {product_name} / {brand} / {scale} / {product_number}")
             else:  # status == "not_found"
                 st.translation_not_found += 1
                 print(f"translating error: {product_name} / {brand} / {scale} / {product_number}")
+            if status in ("empty", "not_found") and untranslated_items is not None:
+                item = {"product_name": product_name, "brand": brand, "scale": scale,
+                        "product_number": product_number, "status": status, "year": year}
+                if proposal:
+                    item["proposal"] = proposal[0]
+                    item["confidence"] = round(proposal[1], 2)
+                untranslated_items.append(item)
         else:
             print(f"can't get product name from web page, {file_path=}")
 
+    # 번역 데이터가 비어 있으면 모든 링크가 정리 대상이 되므로 삭제하지 않음
+    snapshot = PdfDirectorySnapshot(pdf_dir_path)
+    reconcile_symbolic_links(pdf_dir_path, snapshot, desired_links, st, remove_stale=bool(translation_index.translation_data))
+
+    # 통계는 스냅샷(처리 결과 반영)에서 계산
+    st.pdf_files = len(snapshot.pdf_files)
+    st.symlinks = len(snapshot.links)
+    st.multiple_symlinks = {target: links for target, links in snapshot.link_targets().items() if len(links) > 1}
+
+    if cache is not None:
+        st.parse_cache_hits = cache.hits
+        st.parsed_pages = cache.misses
+    else:
+        st.parsed_pages = len(detail_pages)
+
+    if html_items is not None:
+        html_items.extend(sorted(list_to_print, key=lambda x: x[1]))
 
     if do_print_html:
         for product_number, full_korean_name, korean_name, brand, scale in sorted(list_to_print, key=lambda x: x[1]):
@@ -309,24 +894,11 @@ def process_product_page_files(detail_dir_path: Path, pdf_dir_path: Path, transl
     return st
 
 
-def main() -> int:
-    detail_dir_path = MANUAL_DIR_PATH / "menus" / "detail"
-    pdf_dir_path = MANUAL_DIR_PATH / "pdf"
-    translation_file_path = Path("mapping") / "bandai_product_ja_ko_mapping.json"
+# HTML 목록 검색 인덱스/페이지 스크립트의 공백 제거 (JavaScript /\s+/g)
+SEARCH_SPACE_RE = re.compile(r'\s+')
 
-    do_print_html = False
-
-    opts, args = getopt.getopt(sys.argv[1:], "-h")
-    for o, _ in opts:
-        if o == "-h":
-            do_print_html = True
-
-    translation_data = read_translation(translation_file_path)
-    if not translation_data:
-        sys.stderr.write(f"can't find translation data from '{translation_file_path}'\n")
-
-    if do_print_html:
-        print("""<!DOCTYPE html>
+# 페이지 앞부분 (-h/-o 목록과 -d 분할 목록이 같이 사용)
+HTML_PAGE_START = """<!DOCTYPE html>
 <html lang="ko">
 <head>
 <meta charset="UTF-8">
@@ -349,6 +921,9 @@ def main() -> int:
   li a:hover { text-decoration: underline; }
   li.hidden { display: none; }
   mark { background: #fff176; padding: 0; }
+  #viewport { height: 75vh; overflow-y: auto; background: #fff; border-radius: 8px; box-shadow: 0 1px 3px rgba(0,0,0,0.12); }
+  #viewport ul { position: relative; margin: 0; }
+  #viewport li { position: absolute; left: 0; right: 0; height: 24px; line-height: 24px; padding: 0; white-space: nowrap; overflow: hidden; text-overflow: ellipsis; }
 </style>
 </head>
 <body>
@@ -368,62 +943,161 @@ def main() -> int:
     <label style="margin-left:16px;">허용 거리: <input type="number" id="fuzzyThreshold" value="1" min="0" max="5" style="width:50px;"></label>
   </div>
 </div>
-<div id="count"></div>
-<ul id="productList">""")
-
-    # 상품 페이지 파일 처리
-    st = process_product_page_files(detail_dir_path, pdf_dir_path, translation_data, do_print_html)
+<div id="count"></div>"""
+
+HTML_HEADER = HTML_PAGE_START + """
+<ul id="productList">"""
+
+SEARCH_WORKER_SCRIPT = r"""<script type="text/plain" id="searchWorker">
+// 검색 인덱스(이름 bigram 역색인)로 후보를 줄이고 Myers 비트 병렬 편집 거리로 부분 문자열 퍼지 매칭
+// (Web Worker에서 실행, Worker를 만들 수 없으면 페이지에서 같은 코드로 실행)
+function createSearcher(indexText) {
+  var index = JSON.parse(indexText);
+  var names = index.names, brands = index.brands, scales = index.scales;
+  var count = names.length;
+  // bigram → 항목 번호 (차이값으로 저장된 목록을 누적해 복원)
+  var postings = {};
+  for (var gram in index.postings) {
+    var deltas = index.postings[gram], ids = new Int32Array(deltas.length), id = 0;
+    for (var i = 0; i < deltas.length; i++) { id += deltas[i]; ids[i] = id; }
+    postings[gram] = ids;
+  }
+  var hits = new Int32Array(count);
+
+  // 인덱스와 같은 정규화: NFKC, 소문자, 공백 제거
+  function normalize(s) { return s.normalize('NFKC').toLowerCase().replace(/\s+/g, ''); }
+
+  // 질의(32자 이하)와 편집 거리 k 이하인 부분 문자열이 text에 있는지 (Myers 비트 병렬, 글자당 O(1))
+  function myersContains(text, peq, m, k) {
+    var pv = -1, mv = 0, score = m, last = 1 << (m - 1);
+    for (var i = 0; i < text.length; i++) {
+      var eq = peq[text.charCodeAt(i)] | 0;
+      var xv = eq | mv;
+      var xh = (((eq & pv) + pv) ^ pv) | eq;
+      var ph = mv | ~(xh | pv);
+      var mh = pv & xh;
+      if (ph & last) score++;
+      else if (mh & last) score--;
+      ph <<= 1;
+      mh <<= 1;
+      pv = mh | ~(xv | ph);
+      mv = ph & xv;
+      if (score <= k) return true;
+    }
+    return false;
+  }
 
-    if do_print_html:
-        print(r"""</ul>
-<script>
-(function() {
-  // Levenshtein distance 계산
-  function levenshtein(a, b) {
-    var m = a.length, n = b.length;
-    if (m === 0) return n;
-    if (n === 0) return m;
-    var dp = [];
-    for (var i = 0; i <= m; i++) dp[i] = [i];
-    for (var j = 0; j <= n; j++) dp[0][j] = j;
-    for (i = 1; i <= m; i++) {
-      for (j = 1; j <= n; j++) {
-        var cost = a[i-1] === b[j-1] ? 0 : 1;
-        dp[i][j] = Math.min(dp[i-1][j] + 1, dp[i][j-1] + 1, dp[i-1][j-1] + cost);
+  // 32자보다 긴 질의: 같은 판정을 열 하나짜리 DP로
+  function dpContains(text, pattern, k) {
+    var m = pattern.length, col = new Int32Array(m + 1);
+    for (var j = 0; j <= m; j++) col[j] = j;
+    for (var i = 0; i < text.length; i++) {
+      var c = text.charCodeAt(i), diag = 0;
+      for (j = 1; j <= m; j++) {
+        var up = col[j];
+        col[j] = Math.min(up + 1, col[j - 1] + 1, diag + (pattern.charCodeAt(j - 1) === c ? 0 : 1));
+        diag = up;
       }
+      if (col[m] <= k) return true;
     }
-    return dp[m][n];
+    return false;
   }
 
-  // 부분 문자열 퍼지 매칭: 공백 제거 후 슬라이딩 윈도우로 최소 편집 거리 계산
-  function fuzzyContains(target, query, threshold) {
-    target = target.toLowerCase();
-    query = query.toLowerCase();
-    if (query.length === 0) return true;
-    if (target.indexOf(query) !== -1 || removeSpaces(target).indexOf(removeSpaces(query)) !== -1) return true;
-    // 공백 제거 버전으로 퍼지 매칭
-    var t = removeSpaces(target);
-    var q = removeSpaces(query);
-    if (q.length > t.length) return levenshtein(t, q) <= threshold;
-    var minDist = Infinity;
-    for (var i = 0; i <= t.length - q.length; i++) {
-      var sub = t.substring(i, i + q.length);
-      var d = levenshtein(sub, q);
-      if (d < minDist) minDist = d;
-      if (minDist === 0) return true;
+  // request: {name, brand, scale, fuzzy, threshold} → {matches: 항목별 0/1, shown: 일치 수}
+  function search(request) {
+    var q = normalize(request.name), qBrand = normalize(request.brand), qScale = normalize(request.scale);
+    var k = request.fuzzy ? request.threshold : 0;
+    var m = q.length;
+    var matches = new Uint8Array(count);
+    var shown = 0;
+    // 등급별 샤드는 등급이 하나뿐이므로 등급이 맞지 않으면 샤드 전체를 건너뜀
+    if (qBrand && index.brand !== undefined && index.brand.indexOf(qBrand) === -1) {
+      return {matches: matches, shown: 0};
+    }
+
+    // 편집 한 번은 질의 bigram을 최대 2개 깨뜨리므로, 질의 bigram 중 (m - 1 - 2k)개 이상이 이름에 있는 항목만 후보
+    var candidates = null;
+    var need = m - 1 - 2 * k;
+    if (m >= 2 && need > 0) {
+      hits.fill(0);
+      candidates = [];
+      for (var i = 0; i + 1 < m; i++) {
+        var ids = postings[q.substr(i, 2)];
+        if (!ids) continue;
+        for (var j = 0; j < ids.length; j++) {
+          if (++hits[ids[j]] === need) candidates.push(ids[j]);
+        }
+      }
     }
-    return minDist <= threshold;
+
+    var peq = null;
+    if (k > 0 && k < m && m <= 32) {
+      peq = {};
+      for (i = 0; i < m; i++) peq[q.charCodeAt(i)] = (peq[q.charCodeAt(i)] | 0) | (1 << i);
+    }
+
+    function check(id) {
+      if (qBrand && brands[id].indexOf(qBrand) === -1) return;
+      if (qScale && scales[id].indexOf(qScale) === -1) return;
+      var name = names[id];
+      if (m === 0 || k >= m || name.indexOf(q) !== -1 ||
+          (k > 0 && (peq ? myersContains(name, peq, m, k) : dpContains(name, q, k)))) {
+        matches[id] = 1;
+        shown++;
+      }
+    }
+
+    if (candidates) {
+      for (i = 0; i < candidates.length; i++) check(candidates[i]);
+    } else {
+      for (i = 0; i < count; i++) check(i);
+    }
+    return {matches: matches, shown: shown};
   }
 
-  // 공백 제거 유틸
-  function removeSpaces(s) { return s.replace(/\s+/g, ''); }
+  return {count: count, search: search};
+}
+
+// 여러 인덱스(분할 목록은 등급별 샤드)를 전체 목록의 offset 위치에 모아 한 번에 검색
+function createCatalogSearcher() {
+  var shards = [], total = 0;
 
-  // 정확한 부분 문자열 매칭 (공백 무시)
-  function exactContains(target, query) {
-    var t = target.toLowerCase(), q = query.toLowerCase();
-    return t.indexOf(q) !== -1 || removeSpaces(t).indexOf(removeSpaces(q)) !== -1;
+  function add(indexText, offset, size) {
+    shards.push({offset: offset, searcher: createSearcher(indexText)});
+    total = size;
   }
 
+  function search(request) {
+    var matches = new Uint8Array(total), shown = 0;
+    for (var i = 0; i < shards.length; i++) {
+      var result = shards[i].searcher.search(request);
+      matches.set(result.matches, shards[i].offset);
+      shown += result.shown;
+    }
+    return {matches: matches, shown: shown};
+  }
+
+  return {add: add, search: search};
+}
+
+if (typeof WorkerGlobalScope !== 'undefined' && self instanceof WorkerGlobalScope) {
+  var searcher = createCatalogSearcher();
+  onmessage = function(e) {
+    if (e.data.indexText !== undefined) {
+      searcher.add(e.data.indexText, e.data.offset, e.data.total);
+      return;
+    }
+    var result = searcher.search(e.data);
+    postMessage({seq: e.data.seq, matches: result.matches, shown: result.shown}, [result.matches.buffer]);
+  };
+}
+</script>"""
+
+HTML_FOOTER = SEARCH_WORKER_SCRIPT + r"""
+<script>
+(function() {
+  var DEBOUNCE_MS = 150;
+
   var items = document.querySelectorAll('#productList li');
   var nameInput = document.getElementById('searchName');
   var brandInput = document.getElementById('searchBrand');
@@ -433,70 +1107,453 @@ def main() -> int:
   var searchBtn = document.getElementById('searchBtn');
   var countEl = document.getElementById('count');
 
-  function doFilter() {
-    var qName = nameInput.value.trim();
-    var qBrand = brandInput.value.trim();
-    var qScale = scaleInput.value.trim();
-    var useFuzzy = fuzzyToggle.checked;
-    var threshold = parseInt(fuzzyThreshold.value) || 2;
-    var matchFn = useFuzzy
-      ? function(t, q) { return fuzzyContains(t, q, threshold); }
-      : exactContains;
+  var indexText = document.getElementById('searchIndex').textContent;
+  var workerSource = document.getElementById('searchWorker').textContent;
+  var worker = null, searcher = null;
+  var seq = 0, debounceTimer = null;
+  // 현재 표시 상태 (결과가 바뀐 항목만 class 변경)
+  var visible = new Uint8Array(items.length).fill(1);
+
+  function useInPageSearcher() {
+    worker = null;
+    searcher = new Function(workerSource + '\nreturn createCatalogSearcher;')()();
+    searcher.add(indexText, 0, items.length);
+  }
 
-    var shown = 0;
+  try {
+    worker = new Worker(URL.createObjectURL(new Blob([workerSource], {type: 'text/javascript'})));
+    worker.onmessage = function(e) { applyResult(e.data); };
+    worker.onerror = function() { useInPageSearcher(); doFilter(); };
+    worker.postMessage({indexText: indexText, offset: 0, total: items.length});
+  } catch (e) {
+    useInPageSearcher();
+  }
+
+  function applyResult(result) {
+    if (result.seq !== seq) return;  // 더 최근 요청이 있으면 무시
+    var matches = result.matches;
     for (var i = 0; i < items.length; i++) {
-      var li = items[i];
-      var name = li.getAttribute('data-name') || '';
-      var brand = li.getAttribute('data-brand') || '';
-      var scale = li.getAttribute('data-scale') || '';
-
-      var match = true;
-      if (qName && !matchFn(name, qName)) match = false;
-      if (qBrand && !exactContains(brand, qBrand)) match = false;
-      if (qScale && !exactContains(scale, qScale)) match = false;
-
-      if (match) {
-        li.classList.remove('hidden');
-        shown++;
-      } else {
-        li.classList.add('hidden');
+      if (matches[i] !== visible[i]) {
+        items[i].classList.toggle('hidden', !matches[i]);
+        visible[i] = matches[i];
       }
     }
-    countEl.textContent = shown + '개 / 전체 ' + items.length + '개';
+    countEl.textContent = result.shown + '개 / 전체 ' + items.length + '개';
+  }
+
+  function doFilter() {
+    clearTimeout(debounceTimer);
+    var threshold = parseInt(fuzzyThreshold.value, 10);
+    var request = {seq: ++seq, name: nameInput.value, brand: brandInput.value, scale: scaleInput.value,
+                   fuzzy: fuzzyToggle.checked, threshold: isNaN(threshold) ? 1 : Math.max(0, threshold)};
+    if (worker) {
+      worker.postMessage(request);
+    } else {
+      var result = searcher.search(request);
+      result.seq = request.seq;
+      applyResult(result);
+    }
+  }
+
+  // 입력 중에는 마지막 입력 후 DEBOUNCE_MS가 지나면 검색
+  function scheduleFilter() {
+    clearTimeout(debounceTimer);
+    debounceTimer = setTimeout(doFilter, DEBOUNCE_MS);
   }
 
   searchBtn.addEventListener('click', doFilter);
-  nameInput.addEventListener('keydown', function(e) { if (e.key === 'Enter') doFilter(); });
-  brandInput.addEventListener('keydown', function(e) { if (e.key === 'Enter') doFilter(); });
-  scaleInput.addEventListener('keydown', function(e) { if (e.key === 'Enter') doFilter(); });
+  [nameInput, brandInput, scaleInput].forEach(function(input) {
+    input.addEventListener('input', scheduleFilter);
+    input.addEventListener('keydown', function(e) { if (e.key === 'Enter') doFilter(); });
+  });
+  fuzzyToggle.addEventListener('change', doFilter);
+  fuzzyThreshold.addEventListener('input', scheduleFilter);
 
   // 초기 카운트 표시
   countEl.textContent = items.length + '개 / 전체 ' + items.length + '개';
 })();
 </script>
 </body>
-</html>""")
+</html>"""
 
-    # 실제 PDF 파일 갯수 계산 (심볼릭링크 제외)
-    pdf_files_count = sum(1 for f in pdf_dir_path.iterdir() if f.is_file() and not f.is_symlink() and f.name.endswith('.pdf'))
+# -d 분할 목록: 항목 없는 작은 페이지 + catalog.json(샤드 목록) + 등급별 샤드(JSON)
+# 페이지는 샤드를 받는 대로 가상 스크롤 목록(보이는 줄만 DOM에 둠)에 보여 주고, 검색은 샤드별 인덱스로 Worker에서 실행
+CATALOG_MANIFEST_NAME = "catalog.json"
+CATALOG_SHELL_NAME = "index.html"
+CATALOG_SHARD_DIR = "shards"
 
-    # 현재 존재하는 심볼릭링크 갯수 계산
-    existing_symlinks_count = sum(1 for f in pdf_dir_path.iterdir() if f.is_symlink())
+CATALOG_SHELL = HTML_PAGE_START + """
+<div id="viewport"><ul id="productList"></ul></div>
+""" + SEARCH_WORKER_SCRIPT + r"""
+<script>
+(function() {
+  var DEBOUNCE_MS = 150;
+  var ROW_HEIGHT = 24;
+  var OVERSCAN = 20;   // 보이는 영역 위아래로 미리 그려 둘 줄 수
 
-    # 심볼릭링크가 가리키는 target 파일들을 분석
-    symlink_targets = {}
-    for f in pdf_dir_path.iterdir():
-        if f.is_symlink():
-            try:
-                target = f.resolve().name
-                if target not in symlink_targets:
-                    symlink_targets[target] = []
-                symlink_targets[target].append(f.name)
-            except Exception as e:
-                print(f"DEBUG: 심볼릭링크 타겟 파일 오류 - {f.name}, {e}")
+  var viewport = document.getElementById('viewport');
+  var listEl = document.getElementById('productList');
+  var nameInput = document.getElementById('searchName');
+  var brandInput = document.getElementById('searchBrand');
+  var scaleInput = document.getElementById('searchScale');
+  var fuzzyToggle = document.getElementById('fuzzyToggle');
+  var fuzzyThreshold = document.getElementById('fuzzyThreshold');
+  var searchBtn = document.getElementById('searchBtn');
+  var countEl = document.getElementById('count');
+
+  var workerSource = document.getElementById('searchWorker').textContent;
+  var worker = null, searcher = null;
+  var pdfBase = '', total = 0;
+  var items = [];         // 전체 목록 번호 → [제품번호, 한국어 이름] (받지 않은 샤드의 항목은 비어 있음)
+  var matches = null;     // 최근 검색 결과 (검색어가 없으면 null = 모두 표시)
+  var view = [];          // 표시할 전체 목록 번호
+  var loadedShards = [];  // 받은 샤드 (Worker가 없을 때 페이지에서 다시 검색하는 데 사용)
+  var seq = 0, debounceTimer = null, renderPending = false;
+
+  function useInPageSearcher() {
+    worker = null;
+    searcher = new Function(workerSource + '\nreturn createCatalogSearcher;')()();
+    loadedShards.forEach(function(shard) { searcher.add(shard.text, shard.offset, total); });
+  }
+
+  try {
+    worker = new Worker(URL.createObjectURL(new Blob([workerSource], {type: 'text/javascript'})));
+    worker.onmessage = function(e) { applyResult(e.data); };
+    worker.onerror = function() { useInPageSearcher(); refilter(); };
+  } catch (e) {
+    useInPageSearcher();
+  }
+
+  // 보이는 줄(+OVERSCAN)만 그림
+  function render() {
+    renderPending = false;
+    var first = Math.max(0, Math.floor(viewport.scrollTop / ROW_HEIGHT) - OVERSCAN);
+    var last = Math.min(view.length, Math.ceil((viewport.scrollTop + viewport.clientHeight) / ROW_HEIGHT) + OVERSCAN);
+    var fragment = document.createDocumentFragment();
+    for (var i = first; i < last; i++) {
+      var item = items[view[i]];
+      var li = document.createElement('li');
+      var a = document.createElement('a');
+      li.style.top = (i * ROW_HEIGHT) + 'px';
+      a.href = pdfBase + item[0] + '.pdf';
+      a.target = '_blank';
+      a.textContent = item[1];
+      li.appendChild(a);
+      fragment.appendChild(li);
+    }
+    listEl.textContent = '';
+    listEl.appendChild(fragment);
+  }
+
+  function scheduleRender() {
+    if (!renderPending) {
+      renderPending = true;
+      requestAnimationFrame(render);
+    }
+  }
+
+  function rebuildView() {
+    view = [];
+    for (var i = 0; i < total; i++) {
+      if (items[i] && (!matches || matches[i])) view.push(i);
+    }
+    listEl.style.height = (view.length * ROW_HEIGHT) + 'px';
+    countEl.textContent = view.length + '개 / 전체 ' + total + '개';
+    scheduleRender();
+  }
+
+  function applyResult(result) {
+    if (result.seq !== seq) return;  // 더 최근 요청이 있으면 무시
+    matches = result.matches;
+    rebuildView();
+  }
+
+  // 현재 검색 조건으로 다시 거름 (스크롤 위치 유지)
+  function refilter() {
+    clearTimeout(debounceTimer);
+    seq++;
+    if (!nameInput.value.trim() && !brandInput.value.trim() && !scaleInput.value.trim()) {
+      matches = null;
+      rebuildView();
+      return;
+    }
+    var threshold = parseInt(fuzzyThreshold.value, 10);
+    var request = {seq: seq, name: nameInput.value, brand: brandInput.value, scale: scaleInput.value,
+                   fuzzy: fuzzyToggle.checked, threshold: isNaN(threshold) ? 1 : Math.max(0, threshold)};
+    if (worker) {
+      worker.postMessage(request);
+    } else {
+      var result = searcher.search(request);
+      result.seq = request.seq;
+      applyResult(result);
+    }
+  }
+
+  // 새 검색은 목록 처음부터 보여 줌
+  function doFilter() {
+    viewport.scrollTop = 0;
+    refilter();
+  }
 
-    # 여러 심볼릭링크가 가리키는 PDF 찾기
-    multiple_symlinks = {target: links for target, links in symlink_targets.items() if len(links) > 1}
+  // 입력 중에는 마지막 입력 후 DEBOUNCE_MS가 지나면 검색
+  function scheduleFilter() {
+    clearTimeout(debounceTimer);
+    debounceTimer = setTimeout(doFilter, DEBOUNCE_MS);
+  }
+
+  function addShard(text, offset) {
+    var shard = JSON.parse(text);
+    for (var i = 0; i < shard.items.length; i++) items[offset + i] = shard.items[i];
+    loadedShards.push({text: text, offset: offset});
+    if (worker) {
+      worker.postMessage({indexText: text, offset: offset, total: total});
+    } else {
+      searcher.add(text, offset, total);
+    }
+    // 받은 샤드도 현재 검색 조건으로 다시 거름
+    refilter();
+  }
+
+  searchBtn.addEventListener('click', doFilter);
+  [nameInput, brandInput, scaleInput].forEach(function(input) {
+    input.addEventListener('input', scheduleFilter);
+    input.addEventListener('keydown', function(e) { if (e.key === 'Enter') doFilter(); });
+  });
+  fuzzyToggle.addEventListener('change', doFilter);
+  fuzzyThreshold.addEventListener('input', scheduleFilter);
+  viewport.addEventListener('scroll', scheduleRender);
+  window.addEventListener('resize', scheduleRender);
+
+  // 샤드 목록을 받은 뒤 샤드를 동시에 받음 (샤드 주소의 ?v=<해시>로 바뀐 샤드만 새로 받음)
+  countEl.textContent = '불러오는 중...';
+  fetch('""" + CATALOG_MANIFEST_NAME + r"""', {cache: 'no-cache'}).then(function(response) {
+    return response.json();
+  }).then(function(manifest) {
+    pdfBase = manifest.pdf_base;
+    total = manifest.total;
+    items = new Array(total);
+    var offset = 0;
+    manifest.shards.forEach(function(shard) {
+      var shardOffset = offset;
+      offset += shard.count;
+      fetch(shard.file + '?v=' + shard.hash).then(function(response) {
+        return response.text();
+      }).then(function(text) {
+        addShard(text, shardOffset);
+      });
+    });
+    rebuildView();
+  }).catch(function(e) {
+    countEl.textContent = '목록을 불러오지 못했습니다: ' + e;
+  });
+})();
+</script>
+</body>
+</html>
+"""
+
+
+def write_bytes_atomic(path: Path, data: bytes) -> None:
+    """임시 파일에 쓴 뒤 교체 (쓰는 도중에는 이전 내용이 유지됨)"""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(path.name + ".tmp")
+    tmp_path.write_bytes(data)
+    os.replace(tmp_path, path)
+
+
+def write_text_atomic(path: Path, text: str) -> None:
+    write_bytes_atomic(path, text.encode("utf-8"))
+
+
+def write_bytes_if_changed(path: Path, data: bytes) -> bool:
+    """내용이 같으면 쓰지 않음 (mtime이 그대로라 웹 서버 캐시도 유지됨), 바뀌었으면 교체하고 True"""
+    try:
+        if path.stat().st_size == len(data) and path.read_bytes() == data:
+            return False
+    except FileNotFoundError:
+        pass
+    write_bytes_atomic(path, data)
+    return True
+
+
+def write_precompressed(path: Path, data: bytes) -> bool:
+    """
+    파일과 미리 압축한 .gz(.br) 파일 저장 (웹 서버가 압축 없이 바로 보낼 수 있도록)
+    압축본을 먼저 쓰고 원본을 나중에 바꾸므로, 중간에 멈추면 다음 실행에서 원본이 달라 압축본도 다시 씀
+    """
+    changed = not path.exists() or path.stat().st_size != len(data) or path.read_bytes() != data
+    compressors = [(".gz", lambda: gzip.compress(data, compresslevel=9, mtime=0))]
+    if HAS_BROTLI:
+        compressors.append((".br", lambda: brotli.compress(data, quality=11)))
+    elif changed:
+        # brotli 없이 원본만 바뀌면 오래된 .br이 남지 않도록 삭제
+        path.with_name(path.name + ".br").unlink(missing_ok=True)
+    for suffix, compress in compressors:
+        compressed_path = path.with_name(path.name + suffix)
+        if changed or not compressed_path.exists():
+            write_bytes_atomic(compressed_path, compress())
+    if changed:
+        write_bytes_atomic(path, data)
+    return changed
+
+
+def search_text(text: str) -> str:
+    """HTML 목록 검색용 정규화 (페이지 스크립트의 normalize와 같음: NFKC, 소문자, 공백 제거)"""
+    return SEARCH_SPACE_RE.sub('', unicodedata.normalize('NFKC', text).lower())
+
+
+def build_search_index(html_items: list[tuple[int, str, str, str, str]]) -> dict:
+    """
+    HTML 목록 검색 인덱스: 항목 순서대로 정규화한 이름/등급/스케일과 이름 bigram → 항목 번호 목록
+    (번호 목록은 오름차순이므로 앞 번호와의 차이로 저장해 크기를 줄임)
+    """
+    names = [search_text(item[2]) for item in html_items]
+    postings: dict[str, list[int]] = {}
+    previous: dict[str, int] = {}
+    for item_id, name in enumerate(names):
+        for gram in dict.fromkeys(name[i:i + 2] for i in range(len(name) - 1)):
+            postings.setdefault(gram, []).append(item_id - previous.get(gram, 0))
+            previous[gram] = item_id
+    return {"names": names, "brands": [search_text(item[3]) for item in html_items],
+            "scales": [search_text(item[4]) for item in html_items], "postings": postings}
+
+
+def format_html_list_end(html_items: list[tuple[int, str, str, str, str]]) -> str:
+    """목록 끝 + 검색 인덱스 (JSON, </script>나 <!--로 스크립트가 끊기지 않도록 '<'는 \\u003c로 씀)"""
+    index_json = json.dumps(build_search_index(html_items), ensure_ascii=False, separators=(',', ':')).replace("<", "\\u003c")
+    return f'</ul>\n<script type="application/json" id="searchIndex">{index_json}</script>'
+
+
+def write_html_catalog(html_file_path: Path, html_items: list[tuple[int, str, str, str, str]]) -> bool:
+    """HTML 목록을 파일로 저장 (-h 출력과 같은 형식, translating error 줄은 포함하지 않음, 바뀌지 않았으면 쓰지 않고 False)"""
+    lines = [HTML_HEADER]
+    lines.extend(format_html(*item) for item in html_items)
+    lines.append(format_html_list_end(html_items))
+    lines.append(HTML_FOOTER)
+    return write_bytes_if_changed(html_file_path, ("\n".join(lines) + "\n").encode("utf-8"))
+
+
+CATALOG_SHARD_NAME_RE = re.compile(r'[^a-z0-9]+')
+
+
+def catalog_shard_name(brand: str, used: set[str]) -> str:
+    """등급 → 샤드 파일 이름 (영숫자만 남기고, 등급이 없으면 etc, 겹치면 번호를 붙임)"""
+    base = CATALOG_SHARD_NAME_RE.sub('-', search_text(brand)).strip('-') or "etc"
+    name, suffix = base, 2
+    while name in used:
+        name, suffix = f"{base}-{suffix}", suffix + 1
+    used.add(name)
+    return name
+
+
+def format_catalog_shard(brand: str, items: list[tuple[int, str, str, str, str]]) -> bytes:
+    """샤드 JSON: 검색 인덱스(build_search_index) + 샤드 등급 + 표시용 [제품번호, 한국어 이름] 목록"""
+    shard = build_search_index(items)
+    shard["brand"] = search_text(brand)
+    shard["items"] = [[item[0], item[1]] for item in items]
+    return json.dumps(shard, ensure_ascii=False, separators=(',', ':')).encode("utf-8")
+
+
+def write_catalog_directory(catalog_dir_path: Path, html_items: list[tuple[int, str, str, str, str]]) -> tuple[int, int]:
+    """
+    분할 HTML 목록 저장: index.html(항목 없는 페이지), catalog.json(샤드 목록), shards/<등급>.json
+    샤드는 등급 이름순(등급 없는 항목은 마지막), 샤드 안은 html_items 순서
+    바뀐 파일만 .gz/.br과 함께 다시 쓰고, 더 이상 없는 등급의 샤드는 삭제 → (다시 쓴 파일 수, 전체 파일 수)
+    """
+    groups: dict[str, list] = {}
+    for item in html_items:
+        groups.setdefault(item[3], []).append(item)
+
+    files = {}
+    shards = []
+    used_names: set[str] = set()
+    for brand in sorted(groups, key=lambda brand: (not brand, brand)):
+        data = format_catalog_shard(brand, groups[brand])
+        shard_file = f"{CATALOG_SHARD_DIR}/{catalog_shard_name(brand, used_names)}.json"
+        files[shard_file] = data
+        # 해시는 페이지가 샤드 주소에 붙여, 바뀐 샤드만 브라우저 캐시를 거치지 않고 받게 함
+        shards.append({"brand": brand, "file": shard_file, "count": len(groups[brand]),
+                       "hash": hashlib.sha256(data).hexdigest()[:16]})
+    manifest = {"total": len(html_items), "pdf_base": f"{BASE_URL}/pdf/", "shards": shards}
+    files[CATALOG_MANIFEST_NAME] = json.dumps(manifest, ensure_ascii=False, separators=(',', ':')).encode("utf-8")
+    files[CATALOG_SHELL_NAME] = CATALOG_SHELL.encode("utf-8")
+
+    written = sum(write_precompressed(catalog_dir_path / name, data) for name, data in files.items())
+
+    shard_dir_path = catalog_dir_path / CATALOG_SHARD_DIR
+    current = {Path(name).name for name in files if name.startswith(CATALOG_SHARD_DIR + "/")}
+    for path in shard_dir_path.iterdir() if shard_dir_path.exists() else ():
+        if path.name.removesuffix(".gz").removesuffix(".br") not in current:
+            path.unlink()
+    return written, len(files)
+
+
+def write_untranslated_items(untranslated_file_path: Path, untranslated_items: list[dict]) -> None:
+    """번역되지 않은 항목을 JSON Lines로 저장 (항목이 없으면 빈 파일)"""
+    write_text_atomic(untranslated_file_path, "".join(json.dumps(item, ensure_ascii=False) + "\n" for item in untranslated_items))
+
+
+def main() -> int:
+    detail_dir_path = MANUAL_DIR_PATH / "menus" / "detail"
+    pdf_dir_path = MANUAL_DIR_PATH / "pdf"
+    translation_file_path = Path("mapping") / "bandai_product_ja_ko_mapping.json"
+
+    do_print_html = False
+    html_file_path = None
+    catalog_dir_path = None
+    untranslated_file_path = None
+    workers = PARSE_WORKERS
+    fuzzy_threshold = FUZZY_MATCH_THRESHOLD
+    accept_confidence = AUTO_ACCEPT_CONFIDENCE
+
+    # -h: HTML 목록을 표준 출력으로 출력 (통계 생략)
+    # -o <파일>: HTML 목록을 파일로 저장, -u <파일>: 번역되지 않은 항목을 JSON Lines로 저장
+    # -d <디렉토리>: HTML 목록을 작은 페이지 + 등급별 샤드(JSON)로 나눠 .gz/.br 압축본과 함께 저장
+    # (-o/-d/-u는 통계 출력과 함께 한 번의 실행으로 생성, 내용이 바뀌지 않은 파일은 다시 쓰지 않음)
+    # -j <개수>: 상세 페이지 파싱 프로세스 수
+    # -f <0~1>: 유사 일치 임계값 (0 이하이거나 1보다 크면 유사 일치 사용 안 함)
+    # -a <0~1>: 번역 메모리 제안을 자동으로 사용할 신뢰도 (1보다 크면 자동 사용 안 함, 제안은 -u 항목에만 붙임)
+    opts, args = getopt.getopt(sys.argv[1:], "ho:d:u:j:f:a:")
+    for o, a in opts:
+        if o == "-h":
+            do_print_html = True
+        elif o == "-o":
+            html_file_path = Path(a)
+        elif o == "-d":
+            catalog_dir_path = Path(a)
+        elif o == "-u":
+            untranslated_file_path = Path(a)
+        elif o == "-j":
+            workers = max(1, int(a))
+        elif o == "-f":
+            fuzzy_threshold = float(a)
+        elif o == "-a":
+            accept_confidence = float(a)
+
+    # 매핑 JSON이 바뀌지 않았으면 컴파일 결과(bandai_mapping_cache.marshal)에서 바로 불러옴
+    translation_index = load_translation_index(translation_file_path, fuzzy_threshold)
+    if not translation_index.translation_data:
+        sys.stderr.write(f"can't find translation data from '{translation_file_path}'\n")
+
+    if do_print_html:
+        print(HTML_HEADER)
+
+    # 상품 페이지 파일 처리 (바뀌지 않은 상세 페이지는 캐시된 파싱 결과 사용)
+    # -h에서도 목록 끝의 검색 인덱스를 만들 수 있도록 항목을 모음
+    html_items = [] if html_file_path or catalog_dir_path or do_print_html else None
+    untranslated_items = [] if untranslated_file_path else None
+    with DetailPageCache() as cache:
+        st = process_product_page_files(detail_dir_path, pdf_dir_path, translation_index, do_print_html, cache,
+                                        html_items, untranslated_items, workers, accept_confidence)
+
+    html_written = write_html_catalog(html_file_path, html_items) if html_file_path else False
+    catalog_written = write_catalog_directory(catalog_dir_path, html_items) if catalog_dir_path else (0, 0)
+    if untranslated_file_path:
+        write_untranslated_items(untranslated_file_path, untranslated_items)
+
+    if do_print_html:
+        print(format_html_list_end(html_items))
+        print(HTML_FOOTER)
 
     if not do_print_html:
         # 처리 단계별 통계 출력
@@ -504,24 +1561,38 @@ def main() -> int:
         print(f"전체 HTML 파일: {st.total_html_files}개")
         print(f"유효한 제품번호 파일: {st.valid_product_number_files}개 (감소: {st.total_html_files - st.valid_product_number_files}개)")
         print(f"제품명 추출 성공: {st.product_name_extracted}개 (감소: {st.valid_product_number_files - st.product_name_extracted}개)")
-        print(f"번역 성공: {st.translation_success}개")
+        print(f"상세 페이지 파싱: {st.parsed_pages}개 (캐시 사용: {st.parse_cache_hits}개)")
+        print(f"번역 성공: {st.translation_success}개 (정규화 키 일치: {st.translation_canonical}개, 유사 일치: {st.translation_fuzzy}개, "
+              f"조각 조합: {st.translation_composed}개)")
         print(f"번역 실패 (빈 번역값): {st.translation_empty}개")
         print(f"번역 실패 (번역 데이터 없음): {st.translation_not_found}개")
         
         print("\n=== 심볼릭링크 처리 통계 ===")
-        print(f"실제 PDF 파일: {pdf_files_count}개")
+        print(f"실제 PDF 파일: {st.pdf_files}개")
         print(f"심볼릭링크 시도: {st.symlink_attempts}개 (번역 성공과 일치해야 함)")
         print(f"심볼릭링크 생성 성공: {st.symlink_created}개")
         print(f"PDF 다운로드 후 생성: {st.symlink_downloaded_and_created}개")
+        if st.download_attempts:
+            print(f"PDF 다운로드: {st.download_attempts}개 시도, {st.downloaded_bytes / 1024 / 1024:.1f}MB, "
+                  f"{st.download_seconds:.1f}초 (동시 {DOWNLOAD_WORKERS}개, 호스트별 {DOWNLOAD_PER_HOST}개)")
         print(f"이미 존재하는 심볼릭링크: {st.symlink_already_exists}개")
+        print(f"다른 PDF를 가리켜 교체한 심볼릭링크: {st.symlink_retargeted}개")
         print(f"target PDF 파일 없음 (다운로드 실패): {st.symlink_target_missing}개")
         print(f"생성 실패 (기타 오류): {st.symlink_creation_failed}개")
-        print(f"심볼릭링크 처리 총합: {st.symlink_created + st.symlink_downloaded_and_created + st.symlink_already_exists + st.symlink_target_missing + st.symlink_creation_failed}개 (시도와 일치해야 함)")
+        print(f"심볼릭링크 처리 총합: {st.symlink_created + st.symlink_downloaded_and_created + st.symlink_retargeted + st.symlink_already_exists + st.symlink_target_missing + st.symlink_creation_failed}개 (시도와 일치해야 함)")
         print(f"실제 생성된 심볼릭링크: {st.symlink_created + st.symlink_downloaded_and_created}개")
-        print(f"현재 존재하는 총 심볼릭링크: {existing_symlinks_count}개")
-        print(f"여러 심볼릭링크가 가리키는 PDF: {len(multiple_symlinks)}개")
-        print(f"중복 심볼릭링크 총 개수: {sum(len(links) - 1 for links in multiple_symlinks.values())}개")
+        print(f"삭제한 오래된 심볼릭링크: {st.symlink_removed}개")
+        print(f"현재 존재하는 총 심볼릭링크: {st.symlinks}개")
+        print(f"여러 심볼릭링크가 가리키는 PDF: {len(st.multiple_symlinks)}개")
+        print(f"중복 심볼릭링크 총 개수: {sum(len(links) - 1 for links in st.multiple_symlinks.values())}개")
         print(f"translating error 출력 예상: {st.translation_empty + st.translation_not_found}개")
+        if html_file_path:
+            print(f"HTML 목록 저장: {html_file_path} ({len(html_items)}개{'' if html_written else ', 변경 없음'})")
+        if catalog_dir_path:
+            print(f"분할 HTML 목록 저장: {catalog_dir_path} ({len(html_items)}개, "
+                  f"파일 {catalog_written[0]}/{catalog_written[1]}개 갱신{', .br 포함' if HAS_BROTLI else ''})")
+        if untranslated_file_path:
+            print(f"번역되지 않은 항목 저장: {untranslated_file_path} ({len(untranslated_items)}개)")
 
     return 0
 
@@ -4,10 +4,22 @@
 import os
 import sys
 import re
+import heapq
+import itertools
+import functools
+import enum
+import codecs
+import mmap
+import sqlite3
+import math
+import hashlib
 from pathlib import Path
 from html.parser import HTMLParser
 import unicodedata
 import json
+import getopt
+
+from reference_index import update_reference_index
 
 # chardet가 없을 경우를 대비한 fallback
 try:
@@ -16,9 +28,878 @@ try:
 except ImportError:
     HAS_CHARDET = False
 
-class ProductExtractor(HTMLParser):
+# lxml가 있으면 HTML 토크나이저 백엔드로 선택 가능
+try:
+    from lxml import etree as lxml_etree
+    HAS_LXML = True
+except ImportError:
+    HAS_LXML = False
+
+# 범용 HTML 파일 확장자
+HTML_SUFFIXES = ('.html', '.htm')
+
+
+
+class Source(enum.IntEnum):
+    """후보가 추출된 위치 (이름의 소문자가 기존 source 문자열)"""
+    GENERAL = 0
+    TITLE = 1
+    LINK_TITLE = 2
+    HEADING_TITLE = 3
+    EMPHASIZED_TITLE = 4
+    META_TITLE = 5
+    FILENAME_TITLE = 6
+    PRODUCT_NAME = 7
+    # 클래스 기반 특수 필드
+    CODENAME = 8
+    FULLNAME = 9
+    ITEM_NAME = 10
+    GOODS_NAME = 11
+    MODEL_NAME = 12
+    KIT_NAME = 13
+    TITLE_CLASS = 14
+    NAME_CLASS = 15
+    HEADING_CLASS = 16
+    CAPTION_CLASS = 17
+    LABEL_CLASS = 18
+    TEXT_CLASS = 19
+    HEADER_CLASS = 20
+    SUBTITLE_CLASS = 21
+    BRAND_CLASS = 22
+    SERIES_CLASS = 23
+    VERSION_CLASS = 24
+    TYPE_CLASS = 25
+    CATEGORY_CLASS = 26
+
+
+class Confidence(enum.IntEnum):
+    LOW = 0
+    MEDIUM = 1
+    HIGH = 2
+
+
+# title 관련 태그에서 추출된 후보의 source 값
+TITLE_SOURCES = frozenset([
+    Source.TITLE, Source.LINK_TITLE, Source.HEADING_TITLE,
+    Source.EMPHASIZED_TITLE, Source.META_TITLE, Source.FILENAME_TITLE,
+])
+
+# 중복 후보 교체 시 사용하는 source 우선순위
+SOURCE_PRIORITY = {
+    Source.CODENAME: 10, Source.FULLNAME: 9, Source.PRODUCT_NAME: 8, Source.ITEM_NAME: 7,
+    Source.GOODS_NAME: 6, Source.MODEL_NAME: 5, Source.KIT_NAME: 4,
+    Source.TITLE: 8, Source.GENERAL: 1  # title 우선순위 높임
+}
+
+# class 속성 부분 문자열 → 특수 필드 source (먼저 일치한 항목 사용)
+SPECIAL_CLASSES = (
+    ('codename', Source.CODENAME),
+    ('fullname', Source.FULLNAME),
+    ('productname', Source.PRODUCT_NAME),
+    ('product-name', Source.PRODUCT_NAME),
+    ('item-name', Source.ITEM_NAME),
+    ('goods-name', Source.GOODS_NAME),
+    ('model-name', Source.MODEL_NAME),
+    ('kit-name', Source.KIT_NAME),
+    ('title', Source.TITLE_CLASS),
+    ('name', Source.NAME_CLASS),
+    ('heading', Source.HEADING_CLASS),
+    ('caption', Source.CAPTION_CLASS),
+    ('label', Source.LABEL_CLASS),
+    ('text', Source.TEXT_CLASS),
+    ('header', Source.HEADER_CLASS),
+    ('subtitle', Source.SUBTITLE_CLASS),
+    ('brand', Source.BRAND_CLASS),
+    ('series', Source.SERIES_CLASS),
+    ('version', Source.VERSION_CLASS),
+    ('type', Source.TYPE_CLASS),
+    ('category', Source.CATEGORY_CLASS),
+)
+
+# 참고 자료 최대 개수 (토큰 절약)
+MAX_REFERENCES = 2000
+
+# HTML 파일 읽기 설정
+MAX_HTML_FILE_SIZE = 10 * 1024 * 1024   # 이보다 큰 파일은 제외
+BINARY_SNIFF_SIZE = 1024                # 바이너리 판정에 사용하는 앞부분 크기
+META_SNIFF_SIZE = 10240                 # 메타 태그 charset 검색 범위
+CHARDET_SAMPLE_SIZE = 64 * 1024         # chardet에 넘기는 최대 크기
+
+# 사이트 공통 텍스트(boilerplate) 학습 설정
+BOILERPLATE_PAGE_RATIO = 0.5     # 이 비율 이상의 페이지에 나오는 텍스트 노드를 boilerplate로 간주
+BOILERPLATE_MIN_PAGES = 20       # 모델을 갱신하는 데 필요한 최소 페이지 수
+BOILERPLATE_MAX_TEXT_LEN = 200   # 이보다 긴 텍스트 노드는 집계하지 않음
+BOILERPLATE_COUNT_ERROR = 0.01   # lossy counting 허용 오차 (집계 메모리 제한)
+
+# 유사 중복 페이지(광고/카운터/날짜만 다른 페이지) 감지 설정
+NEAR_DUPLICATE_MAX_DISTANCE = 3     # SimHash 해밍 거리가 이 값 이하면 유사 중복 (음수면 사용 안 함)
+NEAR_DUPLICATE_SHINGLE_WORDS = 3    # 지문에 사용하는 단어 shingle 길이
+NEAR_DUPLICATE_MIN_SHINGLES = 16    # shingle이 이보다 적은 짧은 페이지는 비교하지 않음
+
+_WHITESPACE_RE = re.compile(r'\s+')
+
+
+def normalize_line(text: str) -> str:
+    """중복 판정용 정규화 (공백 정규화 + 소문자)"""
+    return _WHITESPACE_RE.sub(' ', text.strip().lower())
+
+
+# clean_text용 사전 계산 테이블
+_HTML_ENTITY_REPLACEMENTS = (
+    ('&nbsp;', ' '), ('&amp;', '&'),
+    ('&lt;', '<'), ('&gt;', '>'),
+    ('&quot;', '"'), ('&apos;', "'"),
+)
+_CLEAN_STRIP_CHARS = ' \t\n\r\f\v｜|[]()<>{}"\''
+# null 문자나 제어 문자 제거 (공백류 제어 문자는 이미 공백으로 치환된 상태)
+_CONTROL_CHAR_TABLE = dict.fromkeys([*range(0x00, 0x09), 0x0B, 0x0C, *range(0x0E, 0x20), 0x7F])
+_MEANINGFUL_CHAR_RE = re.compile(r'[\w가-힣\u3040-\u309f\u30a0-\u30ff\u4e00-\u9faf]')
+_SPACE_CHAR_RE = re.compile(r'\s')
+_ALLOWED_PUNCTUATION = frozenset('-()[].,:;\'"/')
+# 문자 분류 문자열에서 연속된 특수문자(5개 이상) 검색
+_SPECIAL_RUN_RE = re.compile(r'[pb]{5,}')
+# 이 길이 이하의 텍스트만 캐시 (네비게이션 등 반복되는 템플릿 문자열)
+CLEAN_TEXT_CACHE_MAX_LEN = 200
+
+
+class _CharClassTable(dict):
+    """str.translate용 문자 분류 테이블 (처음 보는 문자는 정규식으로 분류 후 기록)
+
+    m: 의미있는 문자 (단어 문자, 한글, 가나, 한자)
+    s: 공백
+    p: 허용된 구두점 (깨진 문자는 아니지만 특수문자)
+    b: 깨진 문자
+    """
+
+    def __missing__(self, code_point):
+        ch = chr(code_point)
+        if _MEANINGFUL_CHAR_RE.match(ch):
+            char_class = 'm'
+        elif _SPACE_CHAR_RE.match(ch):
+            char_class = 's'
+        elif ch in _ALLOWED_PUNCTUATION:
+            char_class = 'p'
+        else:
+            char_class = 'b'
+        self[code_point] = char_class
+        return char_class
+
+
+_CHAR_CLASS_TABLE = _CharClassTable()
+
+
+def _clean_text(text: str) -> str:
+    """ProductExtractor.clean_text 본체 (문자 분류는 한 번의 translate로 계산)"""
+    # HTML 엔티티 정리
+    if '&' in text:
+        for entity, replacement in _HTML_ENTITY_REPLACEMENTS:
+            text = text.replace(entity, replacement)
+
+    # 유니코드 정규화 (ASCII는 NFKC 결과가 동일)
+    if not text.isascii():
+        text = unicodedata.normalize('NFKC', text)
+
+    # 개행/연속 공백을 하나로, 앞뒤 공백 및 특수문자 제거
+    text = ' '.join(text.split()).strip(_CLEAN_STRIP_CHARS)
+    if not text:
+        return text
+
+    # 1. null 문자나 제어 문자 제거
+    text = text.translate(_CONTROL_CHAR_TABLE)
+    total_chars = len(text)
+    if total_chars == 0:
+        return ""
+
+    char_classes = text.translate(_CHAR_CLASS_TABLE)
+
+    # 2. 깨진 문자가 25% 이상이면 제거
+    if char_classes.count('b') / total_chars > 0.25:
+        return ""
+
+    # 3. 연속된 특수문자 체크
+    if _SPECIAL_RUN_RE.search(char_classes):
+        return ""
+
+    # 4. 의미있는 텍스트가 너무 짧으면 제거
+    if char_classes.count('m') < 3:
+        return ""
+
+    return text
+
+
+_clean_text_cached = functools.lru_cache(maxsize=65536)(_clean_text)
+
+
+def clean_text(text: str) -> str:
+    """추출 텍스트 정제 (반복되는 짧은 템플릿 문자열은 캐시된 결과 사용)"""
+    if len(text) <= CLEAN_TEXT_CACHE_MAX_LEN:
+        return _clean_text_cached(text)
+    return _clean_text(text)
+
+
+# 사이트별 키워드 설정: (기본 키워드, 브랜드 키워드, 모델명 키워드)
+SITE_KEYWORDS = {
+    # Dalong.net은 일본어 키워드 위주 (더 많은 키워드 추가)
+    "dalong.net": (
+        ['ガンダム', 'ガンプラ', 'プラモデル', 'モビルスーツ', 'MS'],
+        ['HG', 'RG', 'MG', 'PG', 'RE/100', 'RE', 'HGUC', 'HGBF', 'HGAW'],
+        [
+            'フリーダム', 'ストライク', 'バルバトス', 'ユニコーン', 'エクシア',
+            'ウイングガンダム', 'デスティニー', 'インパルス', 'ジャスティス',
+            'ザク', 'ジム', 'シャア', 'キュベレイ', 'ノイエジール',
+            'アストレイ', 'ブリッツ', 'イージス', 'プロビデンス',
+            'ターンエー', 'ターンX', 'ガンダムX', 'ガンダムDX'
+        ],
+    ),
+    # Bandai Manual은 일본어 키워드 위주 (공식 사이트)
+    "manual.bandai-hobby.net": (
+        ['ガンダム', 'ガンプラ', 'プラモデル'],
+        ['HG', 'RG', 'MG', 'PG', 'RE/100'],
+        [
+            'フリーダム', 'ストライク', 'バルバトス', 'ユニコーン', 'エクシア',
+            'ウイングガンダム', 'デスティニー', 'インパルス', 'ジャスティス',
+            'ストライクルージュ', 'スカイグラスパー', 'ルージュ', 'グラスパー'
+        ],
+    ),
+    # Gundam Wiki: 영어/일본어/한국어 모두 포함
+    "gundam-wiki": (
+        [
+            'ガンダム', 'Gundam', '건담',
+            'Mobile Suit', 'モビルスーツ', '모빌슈트',
+            'ガンプラ', 'Gunpla', '건프라'
+        ],
+        ['HG', 'RG', 'MG', 'PG', 'RE/100', 'RE'],
+        [
+            # 일본어
+            'フリーダム', 'ストライク', 'バルバトス', 'ユニコーン', 'エクシア',
+            'ザク', 'ジム', 'シャア', 'キュベレイ', 'ノイエジール',
+            # 영어
+            'Freedom', 'Strike', 'Barbatos', 'Unicorn', 'Exia',
+            'Zaku', 'GM', 'Char', 'Qubeley', 'Neue Ziel',
+            # 한국어
+            '프리덤', '스트라이크', '바르바토스', '유니콘', '엑시아',
+            '자쿠', '짐', '샤아', '큐베레이', '노이에질'
+        ],
+    ),
+    # Gundam Info 한국 사이트: 한국어 중심, 공식 사이트
+    "kr.gundam.info": (
+        [
+            '건담', '건프라', '프라모델', '모빌슈트',
+            'ガンダム', 'ガンプラ', 'プラモデル', 'モビルスーツ',
+            'Gundam', 'Gunpla', 'Mobile Suit'
+        ],
+        ['HG', 'RG', 'MG', 'PG', 'RE', 'RE/100'],
+        [
+            # 한국어
+            '프리덤', '스트라이크', '바르바토스', '유니콘', '엑시아',
+            '윙건담', '데스티니', '임펄스', '저스티스', '세라비',
+            '자쿠', '짐', '샤아', '큐베레이', '노이에질', '지온',
+            # 일본어
+            'フリーダム', 'ストライク', 'バルバトス', 'ユニコーン', 'エクシア',
+            'ウイングガンダム', 'デスティニー', 'インパルス', 'ジャスティス',
+            'ザク', 'ジム', 'シャア', 'キュベレイ', 'ノイエジール',
+            # 영어
+            'Freedom', 'Strike', 'Barbatos', 'Unicorn', 'Exia',
+            'Wing Gundam', 'Destiny', 'Impulse', 'Justice',
+            'Zaku', 'GM', 'Char', 'Qubeley', 'Neue Ziel'
+        ],
+    ),
+}
+
+# 기본값: 정의되지 않은 사이트에 대한 기본 키워드
+DEFAULT_SITE_KEYWORDS = (
+    ['ガンダム', 'Gundam', '건담', 'ガンプラ', 'Gunpla', '건프라'],
+    ['HG', 'RG', 'MG', 'PG', 'RE'],
+    [
+        'Freedom', 'Strike', 'Barbatos', 'Unicorn', 'Exia',
+        'Wing Gundam', 'Destiny', 'Impulse', 'Justice',
+        'Zaku', 'GM', 'Char', 'Qubeley', 'Neue Ziel'
+    ],
+)
+
+# 불필요한 텍스트 필터링 (대소문자 무시 리터럴)
+EXCLUDE_KEYWORDS = [
+    'cookie', 'copyright', 'privacy', 'terms',
+    'navigation', 'menu', 'search', 'login',
+    '카트', '장바구니', '회원', '로그인',
+    '주문', '결제', '배송', '문의',
+    '다운로드', '업로드', '페이지', '사이트',
+    '링크', '클릭', '버튼', '메뉴'
+]
+# 전체 문자열 기준 제외 패턴
+_EXCLUDE_WHOLE_TEXT_RES = [
+    re.compile(r'^[\d\s\-\.]+$'),  # 숫자와 구두점만
+    re.compile(r'^[가-힣]{1,2}$'),    # 한글 1-2글자만
+]
+
+# 품질 점수용 한국어 키워드
+GUNPLA_TERMS = ['건담', '건프라', '프라모델', '모빌슈트']
+MODEL_TERMS = ['스트라이크', '유니콘', '엑시아', '프리덤', '발바토스', '자쿠', '짐', '샤아', '큐베레이', '노이에질', '지온', '아무로', '데스티니', '임펄스', '저스티스', '세라비']
+
+# 분류 특징 비트
+F_EXCLUDE = 1 << 0              # 제외 키워드/날짜
+F_PRIMARY = 1 << 1              # 사이트 기본 키워드
+F_SECONDARY = 1 << 2            # 사이트 브랜드 키워드
+F_MODEL = 1 << 3                # 사이트 모델명 키워드
+F_GUNPLA_TERM = 1 << 4          # 한국어 건프라 용어
+F_MODEL_TERM = 1 << 5           # 한국어 모델명
+F_SCALE = 1 << 6                # 1/숫자
+F_SCALE_STD = 1 << 7            # 1/144, 1/100, 1/60, 1/48
+F_BRAND = 1 << 8                # HG|RG|MG|PG|RE (대소문자 구분)
+F_BRAND_WORD = 1 << 9           # 단어 경계의 브랜드 (대소문자 무시)
+F_BRAND_SCALE = 1 << 10         # 브랜드 + 공백 + 스케일
+F_BRAND_SCALE_MODEL = 1 << 11   # 브랜드 + 공백 + 스케일 + 공백 + 모델명
+F_KOREAN_WORD = 1 << 12         # 한글 2글자 이상 단어
+F_JAPANESE = 1 << 13            # 가나/한자
+
+_CASE_SENSITIVE_BRANDS = frozenset(['HG', 'RG', 'MG', 'PG', 'RE'])
+_STANDARD_SCALES = ('144', '100', '60', '48')
+
+# 브랜드/스케일/날짜/문자 종류 규칙을 한 번에 스캔하는 패턴
+# - 브랜드는 2글자만 소비하고 뒤따르는 스케일/모델명은 전방 탐색으로 확인
+# - 스케일은 "1/"만 소비해 뒤의 숫자도 날짜 패턴 검사 대상으로 남김
+_RULE_SCAN_RE = re.compile(
+    r'(?P<brand>(?i:HG|RG|MG|PG|RE))(?=(?P<brand_scale>\s+1/\d+(?P<brand_scale_model>\s+\S)?)?)'
+    r'|1/(?=(?P<scale>\d+))'
+    r'|(?P<date>\d{4}-\d{2}-\d{2})'
+    r'|(?P<korean>[가-힣]{2,})'
+    r'|(?P<japanese>[\u3040-\u309f\u30a0-\u30ff\u4e00-\u9faf]+)'
+)
+
+
+def _is_word_char(ch: str) -> bool:
+    return ch.isalnum() or ch == '_'
+
+
+class SiteClassifier:
+    """사이트별 건프라 판정/품질 점수 엔진
+
+    모든 리터럴 키워드를 하나의 정규식 교대 패턴(길이 내림차순 전방 탐색)으로 묶고, 같은 위치에서
+    함께 매칭되는 짧은 키워드(접두어)의 특징은 미리 합쳐 두어 한 번의 스캔으로 모든 키워드 특징을
+    얻는다. 브랜드/스케일 등 정규식 규칙도 하나의 스캔으로 처리하고, 결과는 문자열별로 캐시해
+    is_potential_gunpla와 품질 점수 계산이 같은 결과를 공유한다.
+    """
+
     def __init__(self, site_name: str):
+        self.site_name = site_name
+        primary_keywords, secondary_keywords, model_keywords = SITE_KEYWORDS.get(site_name, DEFAULT_SITE_KEYWORDS)
+
+        keyword_features: dict[str, int] = {}
+        for keywords, feature in [(primary_keywords, F_PRIMARY), (secondary_keywords, F_SECONDARY),
+                                  (model_keywords, F_MODEL), (EXCLUDE_KEYWORDS, F_EXCLUDE),
+                                  (GUNPLA_TERMS, F_GUNPLA_TERM), (MODEL_TERMS, F_MODEL_TERM)]:
+            for keyword in keywords:
+                keyword = keyword.lower()
+                keyword_features[keyword] = keyword_features.get(keyword, 0) | feature
+
+        # 같은 위치에서는 가장 긴 키워드만 보고되므로 접두어 키워드의 특징을 합침
+        self.keyword_features = {}
+        for keyword in keyword_features:
+            features = 0
+            for other, other_features in keyword_features.items():
+                if keyword.startswith(other):
+                    features |= other_features
+            self.keyword_features[keyword] = features
+        alternation = '|'.join(re.escape(k) for k in sorted(self.keyword_features, key=len, reverse=True))
+        self.keyword_re = re.compile(f'(?=({alternation}))')
+
+        self.features = functools.lru_cache(maxsize=65536)(self._scan_features)
+
+    def _scan_features(self, text: str) -> int:
+        """문자열에서 매칭되는 모든 특징 비트 계산"""
+        features = 0
+        keyword_features = self.keyword_features
+        for m in self.keyword_re.finditer(text.lower()):
+            features |= keyword_features[m.group(1)]
+
+        for m in _RULE_SCAN_RE.finditer(text):
+            kind = m.lastgroup
+            brand = m.group('brand')
+            if brand is not None:
+                if brand in _CASE_SENSITIVE_BRANDS:
+                    features |= F_BRAND
+                start, end = m.span('brand')
+                if (start == 0 or not _is_word_char(text[start - 1])) and \
+                        (end == len(text) or not _is_word_char(text[end])):
+                    features |= F_BRAND_WORD
+                if m.group('brand_scale') is not None:
+                    features |= F_BRAND_SCALE
+                    if m.group('brand_scale_model') is not None:
+                        features |= F_BRAND_SCALE_MODEL
+            elif kind == 'scale':
+                features |= F_SCALE
+                if m.group('scale').startswith(_STANDARD_SCALES):
+                    features |= F_SCALE_STD
+            elif kind == 'date':
+                features |= F_EXCLUDE
+            elif kind == 'korean':
+                features |= F_KOREAN_WORD
+            elif kind == 'japanese':
+                features |= F_JAPANESE
+
+        if not features & F_EXCLUDE:
+            for pattern in _EXCLUDE_WHOLE_TEXT_RES:
+                if pattern.search(text):
+                    features |= F_EXCLUDE
+                    break
+        return features
+
+    def is_potential_gunpla(self, text: str) -> bool:
+        # 기본 필터링: 길이 체크
+        if len(text) < 3 or len(text) > 150:
+            return False
+
+        features = self.features(text)
+        if features & F_EXCLUDE:
+            return False
+
+        # 점수 기반 판정
+        score = 0
+        if features & F_PRIMARY: score += 3
+        has_scale = features & F_SCALE_STD
+        has_brand = features & F_SECONDARY
+        if has_scale and has_brand: score += 2
+        elif has_scale or has_brand: score += 1
+        if features & F_MODEL: score += 1
+
+        # 추가 보너스: 정확한 건프라 패턴
+        if features & F_BRAND_SCALE:
+            score += 2
+
+        return score >= 1  # 더 낮은 점수 기준으로 더 많은 텍스트 포함
+
+    def quality_score(self, text: str) -> int:
+        features = self.features(text)
+        quality_score = 0
+        # 1. 브랜드 + 스케일 + 모델명 패턴 (최고 점수)
+        if features & F_BRAND_SCALE_MODEL:
+            quality_score += 5
+        # 2. 스케일 정보 있음
+        if features & F_SCALE_STD:
+            quality_score += 2
+        # 3. 브랜드 정보 있음
+        if features & F_BRAND_WORD:
+            quality_score += 2
+        # 4. 건프라 관련 키워드
+        if features & F_GUNPLA_TERM:
+            quality_score += 1
+        # 5. 구체적인 모델명 키워드
+        if features & F_MODEL_TERM:
+            quality_score += 1
+        return quality_score
+
+    def should_include_as_reference(self, text: str) -> bool:
+        # 너무 긴 텍스트는 제외 (토큰 절약)
+        if len(text) > 80:
+            return False
+        # 브랜드와 의미있는 한국어 단어가 함께 있는 텍스트만 참고 자료로 포함
+        # (브랜드+스케일+한국어, 일본어+한국어+브랜드 조합도 이 조건에 포함됨)
+        features = self.features(text)
+        return bool(features & F_BRAND and features & F_KOREAN_WORD)
+
+
+@functools.lru_cache(maxsize=None)
+def get_site_classifier(site_name: str) -> SiteClassifier:
+    """사이트별 분류 엔진 (사이트당 한 번만 컴파일)"""
+    return SiteClassifier(site_name)
+
+
+class ProductCandidate:
+    """추출된 상품명 후보 1건
+
+    대형 미러에서는 후보가 수십만 개가 되므로 dict 대신 __slots__ 레코드를 사용한다.
+    source/confidence는 작은 정수 enum, tag는 intern된 문자열, 파일은 경로 테이블의 인덱스로 보관한다.
+    """
+    __slots__ = ('text', 'source', 'tag', 'confidence', 'file_index', 'quality_score')
+
+    def __init__(self, text, source, tag, confidence):
+        self.text = text
+        self.source = source
+        self.tag = sys.intern(tag)
+        self.confidence = confidence
+        self.file_index = -1
+        self.quality_score = 0
+
+    @property
+    def is_high_quality(self):
+        return self.quality_score >= 3
+
+    def __repr__(self):
+        return (f"ProductCandidate({self.text!r}, {self.source.name}, {self.tag!r}, "
+                f"{self.confidence.name}, file_index={self.file_index}, quality_score={self.quality_score})")
+
+
+class ExtractionStats:
+    html_files = 0
+    processed_files = 0
+    skipped_files = 0
+    raw_products = 0
+    validated_products = 0
+    high_quality_products = 0
+
+
+class BoilerplateModel:
+    """사이트 공통 텍스트 노드(네비게이션, 헤더/푸터 등) 모델
+
+    texts: 이전 실행에서 학습된 boilerplate 텍스트 (추출기가 같은 문맥에서 한 번만 정제/판정하고 결과를 재사용)
+    이번 실행의 페이지별 텍스트 노드 출현 수는 lossy counting으로 집계해 다음 실행용 모델을 만든다.
+    모델은 처리량에만 영향을 주고 추출 결과는 바꾸지 않는다 (상품명이 든 공통 사이드바도 그대로 후보가 됨).
+    """
+
+    def __init__(self, texts=(), page_ratio=BOILERPLATE_PAGE_RATIO, count_error=BOILERPLATE_COUNT_ERROR):
+        self.texts = frozenset(texts)
+        self.page_ratio = page_ratio
+        self.bucket_width = math.ceil(1 / count_error)
+        self.pages = 0
+        self.skipped = 0
+        self.counts = {}  # 텍스트 -> [출현 페이지 수, 최대 누락 수]
+        self.results = {}  # (텍스트, 추출 문맥) -> 후보 인자 (text, source, tag, confidence) 또는 None
+
+    def add_page(self, page_texts):
+        """한 페이지의 (중복 없는) 짧은 텍스트 노드 집합을 집계"""
+        self.pages += 1
+        bucket = math.ceil(self.pages / self.bucket_width)
+        counts = self.counts
+        for text in page_texts:
+            entry = counts.get(text)
+            if entry is None:
+                counts[text] = [1, bucket - 1]
+            else:
+                entry[0] += 1
+        # 버킷 경계마다 드문 텍스트를 정리
+        if self.pages % self.bucket_width == 0:
+            self.counts = {text: entry for text, entry in counts.items() if entry[0] + entry[1] > bucket}
+
+    def learned_texts(self):
+        """이번 실행에서 page_ratio 이상의 페이지에 나온 텍스트 (페이지가 부족하면 None)"""
+        if self.pages < BOILERPLATE_MIN_PAGES:
+            return None
+        threshold = self.page_ratio * self.pages
+        return sorted(text for text, (count, _) in self.counts.items() if count >= threshold)
+
+
+_FINGERPRINT_DROP_RE = re.compile(r'<(script|style)\b.*?</\1\s*>|<!--.*?-->', re.IGNORECASE | re.DOTALL)
+_FINGERPRINT_TITLE_RE = re.compile(r'<title[^>]*>(.*?)</title\s*>', re.IGNORECASE | re.DOTALL)
+_FINGERPRINT_TAG_RE = re.compile(r'<[^>]*>')
+_FINGERPRINT_WORD_RE = re.compile(r'[^\W\d_]+')  # 숫자(카운터/날짜)는 지문에서 제외
+# 본문 동일 판정용 토큰 (RX-78-2, 1/144처럼 글자나 '/'와 붙은 숫자는 유지)
+_FINGERPRINT_TOKEN_RE = re.compile(r'[^\W_]+(?:[./-][^\W_]+)*')
+_FINGERPRINT_NUMBER_RE = re.compile(r'\d+(?:[.-]\d+)*')  # 단독 숫자/날짜 토큰 (카운터, 날짜, 페이지 번호)
+# 비트별 1/0 변환 테이블 (digest 바이트 열에서 비트별 1의 개수를 C 수준에서 셈)
+_BIT_TABLES = [bytes((value >> bit) & 1 for value in range(256)) for bit in range(8)]
+
+
+def _hash64(text: str) -> int:
+    return int.from_bytes(hashlib.blake2b(text.encode('utf-8'), digest_size=8).digest(), 'big')
+
+
+def page_fingerprint(content: str) -> tuple[int, int, int] | None:
+    """HTML 본문 텍스트의 유사 중복 지문 (title 해시, 64비트 SimHash, 본문 해시) - 텍스트가 너무 짧으면 None
+
+    태그/스크립트/주석과 숫자를 뺀 단어의 shingle을 blake2b 64비트로 해시해 비트별 다수결로 SimHash를 만든다.
+    본문 해시는 단독 숫자/날짜 토큰만 뺀 본문 토큰 열의 해시로, 상품명이 하나라도 다르면 달라진다.
+    """
+    content = _FINGERPRINT_DROP_RE.sub(' ', content)
+    title_match = _FINGERPRINT_TITLE_RE.search(content)
+    title = normalize_line(title_match.group(1)) if title_match else ''
+
+    text = _FINGERPRINT_TAG_RE.sub(' ', content)
+    words = _FINGERPRINT_WORD_RE.findall(text)
+    size = NEAR_DUPLICATE_SHINGLE_WORDS
+    shingles = {' '.join(words[i:i + size]) for i in range(len(words) - size + 1)}
+    if len(shingles) < NEAR_DUPLICATE_MIN_SHINGLES:
+        return None
+
+    digests = b''.join(hashlib.blake2b(shingle.encode('utf-8'), digest_size=8).digest() for shingle in shingles)
+    half = len(shingles) / 2
+    simhash = 0
+    for byte_index in range(8):
+        column = digests[byte_index::8]
+        for bit in range(8):
+            if column.translate(_BIT_TABLES[bit]).count(1) > half:
+                simhash |= 1 << ((7 - byte_index) * 8 + bit)
+    tokens = [token for token in _FINGERPRINT_TOKEN_RE.findall(text) if not _FINGERPRINT_NUMBER_RE.fullmatch(token)]
+    return _hash64(title), simhash, _hash64(' '.join(tokens))
+
+
+class NearDuplicateIndex:
+    """이번 실행에서 파싱한 페이지 지문 색인
+
+    title과 본문 해시가 같고 SimHash 해밍 거리가 max_distance 이하인 페이지를 찾는다. 64비트를 max_distance + 1개
+    밴드로 나누면 거리가 max_distance 이하인 두 값은 적어도 한 밴드가 같으므로(비둘기집 원리) 밴드 값으로 후보만 비교한다.
+    SimHash가 가까워도 본문 해시가 다르면(같은 title의 목록 페이지에서 상품 몇 개만 다른 경우 등) 중복으로 보지 않는다.
+    """
+
+    def __init__(self, max_distance=NEAR_DUPLICATE_MAX_DISTANCE):
+        self.max_distance = max_distance
+        band_count = max_distance + 1
+        band_bits = 64 // band_count
+        # (시프트, 마스크) - 마지막 밴드가 남는 비트를 포함
+        self.bands = [(i * band_bits, (1 << (band_bits if i < band_count - 1 else 64 - i * band_bits)) - 1)
+                      for i in range(band_count)]
+        self.buckets = {}  # (title_hash, 밴드 번호, 밴드 값) -> [(simhash, 본문 해시, 대표 파일 경로)]
+        self.collapsed = 0
+
+    def find(self, fingerprint):
+        """유사 중복인 대표 페이지 경로 (없으면 None)"""
+        title_hash, simhash, text_hash = fingerprint
+        for band_index, (shift, mask) in enumerate(self.bands):
+            for other, other_text_hash, file_path in self.buckets.get((title_hash, band_index, (simhash >> shift) & mask), ()):
+                if other_text_hash == text_hash and (simhash ^ other).bit_count() <= self.max_distance:
+                    return file_path
+        return None
+
+    def add(self, fingerprint, file_path):
+        """파싱한 페이지를 대표 페이지로 등록"""
+        title_hash, simhash, text_hash = fingerprint
+        for band_index, (shift, mask) in enumerate(self.bands):
+            self.buckets.setdefault((title_hash, band_index, (simhash >> shift) & mask), []).append(
+                (simhash, text_hash, file_path))
+
+
+class ExtractionCache:
+    """추출 단계 캐시 (사이트별 SQLite, 파일 경로 + mtime/크기가 같을 때만 유효)"""
+
+    # 바이너리로 판정된 파일의 인코딩 값
+    BINARY = 'binary'
+
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+        self.conn = sqlite3.connect(db_path)
+        self.init_database()
+
+    def init_database(self):
+        """데이터베이스 초기화"""
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS file_encodings (
+                file_path TEXT PRIMARY KEY,
+                mtime_ns INTEGER,
+                size INTEGER,
+                encoding TEXT
+            )
+        """)
+
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS boilerplate_texts (
+                text TEXT PRIMARY KEY
+            )
+        """)
+
+        # JSON API 미러(gcd) 증분 적재: 페이지 파일 상태 + 기사 단위 테이블
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS json_pages (
+                file_path TEXT PRIMARY KEY,
+                mtime_ns INTEGER,
+                size INTEGER
+            )
+        """)
+
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS gcd_articles (
+                article_id INTEGER PRIMARY KEY,
+                subject TEXT,
+                cleaned_subject TEXT,
+                normalized_subject TEXT,
+                write_timestamp INTEGER
+            )
+        """)
+
+        # 페이지별 유사 중복 지문 (title 해시, SimHash, 본문 해시) - 본문 해시가 없는 이전 형식 테이블은 삭제
+        self.conn.execute("DROP TABLE IF EXISTS page_fingerprints")
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS page_fingerprints_v2 (
+                file_path TEXT PRIMARY KEY,
+                mtime_ns INTEGER,
+                size INTEGER,
+                title_hash INTEGER,
+                simhash INTEGER,
+                text_hash INTEGER
+            )
+        """)
+
+        # 정규화 텍스트별 첫 기사 조회용 인덱스
+        self.conn.execute("CREATE INDEX IF NOT EXISTS idx_gcd_normalized ON gcd_articles(normalized_subject, article_id)")
+        self.conn.commit()
+
+    def get_encoding(self, file_path: str, file_stat) -> str | None:
+        """캐시된 인코딩 조회 (없거나 파일이 바뀌었으면 None, 바이너리 파일은 BINARY)"""
+        row = self.conn.execute(
+            "SELECT mtime_ns, size, encoding FROM file_encodings WHERE file_path = ?", (file_path,)
+        ).fetchone()
+        if row and row[0] == file_stat.st_mtime_ns and row[1] == file_stat.st_size:
+            return row[2]
+        return None
+
+    def save_encoding(self, file_path: str, file_stat, encoding: str):
+        """파일 인코딩 저장 (커밋은 close 시 한 번에)"""
+        self.conn.execute(
+            "INSERT OR REPLACE INTO file_encodings (file_path, mtime_ns, size, encoding) VALUES (?, ?, ?, ?)",
+            (file_path, file_stat.st_mtime_ns, file_stat.st_size, encoding))
+
+    def load_boilerplate(self) -> list[str]:
+        """저장된 boilerplate 텍스트 목록"""
+        return [row[0] for row in self.conn.execute("SELECT text FROM boilerplate_texts")]
+
+    def save_boilerplate(self, texts):
+        """boilerplate 텍스트 목록을 새로 학습한 값으로 교체"""
+        self.conn.execute("DELETE FROM boilerplate_texts")
+        self.conn.executemany("INSERT INTO boilerplate_texts (text) VALUES (?)", ((text,) for text in texts))
+
+    def get_fingerprint(self, file_path: str, file_stat) -> tuple[int, int, int] | None:
+        """캐시된 페이지 지문 (title_hash, simhash, text_hash) 조회 (없거나 파일이 바뀌었으면 None)"""
+        row = self.conn.execute(
+            "SELECT mtime_ns, size, title_hash, simhash, text_hash FROM page_fingerprints_v2 WHERE file_path = ?",
+            (file_path,)
+        ).fetchone()
+        if row and row[0] == file_stat.st_mtime_ns and row[1] == file_stat.st_size:
+            # SQLite INTEGER는 부호 있는 64비트이므로 부호 없는 값으로 복원
+            return tuple(value & 0xFFFFFFFFFFFFFFFF for value in row[2:])
+        return None
+
+    def save_fingerprint(self, file_path: str, file_stat, fingerprint: tuple[int, int, int]):
+        """페이지 지문 저장 (커밋은 close 시 한 번에)"""
+        values = [value - (1 << 64) if value >= 1 << 63 else value for value in fingerprint]
+        self.conn.execute(
+            "INSERT OR REPLACE INTO page_fingerprints_v2 (file_path, mtime_ns, size, title_hash, simhash, text_hash) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            (file_path, file_stat.st_mtime_ns, file_stat.st_size, *values))
+
+    def is_json_page_changed(self, file_path: str, file_stat) -> bool:
+        """마지막 적재 이후 JSON 페이지 파일이 새로 생기거나 바뀌었는지 확인"""
+        row = self.conn.execute(
+            "SELECT mtime_ns, size FROM json_pages WHERE file_path = ?", (file_path,)
+        ).fetchone()
+        return not row or row[0] != file_stat.st_mtime_ns or row[1] != file_stat.st_size
+
+    def save_json_page(self, file_path: str, file_stat):
+        """JSON 페이지 파일 적재 상태 저장"""
+        self.conn.execute(
+            "INSERT OR REPLACE INTO json_pages (file_path, mtime_ns, size) VALUES (?, ?, ?)",
+            (file_path, file_stat.st_mtime_ns, file_stat.st_size))
+
+    def save_gcd_articles(self, articles):
+        """(article_id, subject, cleaned_subject, normalized_subject, write_timestamp) 목록 저장 (같은 기사는 최신 값으로 교체)"""
+        self.conn.executemany("""
+            INSERT OR REPLACE INTO gcd_articles
+            (article_id, subject, cleaned_subject, normalized_subject, write_timestamp)
+            VALUES (?, ?, ?, ?, ?)
+        """, articles)
+
+    def count_gcd_articles(self) -> int:
+        return self.conn.execute("SELECT COUNT(*) FROM gcd_articles").fetchone()[0]
+
+    def gcd_unique_subjects(self) -> list[str]:
+        """정규화 텍스트(공백 정규화 + 소문자)별로 가장 먼저 작성된 기사의 정제된 제목 (정렬됨)"""
+        rows = self.conn.execute("""
+            SELECT cleaned_subject FROM gcd_articles
+            WHERE article_id IN (
+                SELECT MIN(article_id) FROM gcd_articles
+                WHERE normalized_subject IS NOT NULL
+                GROUP BY normalized_subject
+            )
+            ORDER BY cleaned_subject
+        """)
+        return [row[0] for row in rows]
+
+    def close(self):
+        self.conn.commit()
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+class _HTMLParserDriver(HTMLParser):
+    """html.parser 백엔드 (표준 라이브러리, 기본값)"""
+
+    def __init__(self, handler):
         super().__init__()
+        # 이벤트를 추출기 메서드로 직접 연결 (<br/> 등은 기본 handle_startendtag가 두 메서드를 호출)
+        self.handle_starttag = handler.handle_starttag
+        self.handle_endtag = handler.handle_endtag
+        self.handle_data = handler.handle_data
+
+
+# html.parser는 <br>처럼 닫지 않은 빈 요소에 종료 이벤트를 보내지 않음
+_VOID_ELEMENTS = frozenset([
+    'area', 'base', 'br', 'col', 'embed', 'hr', 'img', 'input',
+    'link', 'meta', 'param', 'source', 'track', 'wbr',
+])
+
+
+class _LxmlTarget:
+    """lxml parser target 이벤트를 html.parser와 같은 형태로 추출기에 전달"""
+
+    def __init__(self, handler):
+        self.handler = handler
+        self.parts = []
+
+    def flush(self):
+        # libxml2는 한 텍스트 노드를 여러 번에 나눠 보내므로 태그 경계까지 모아서 전달
+        if self.parts:
+            data = ''.join(self.parts)
+            self.parts = []
+            self.handler.handle_data(data)
+
+    def start(self, tag, attrib):
+        self.flush()
+        self.handler.handle_starttag(tag, list(attrib.items()))
+
+    def end(self, tag):
+        self.flush()
+        if tag not in _VOID_ELEMENTS:
+            self.handler.handle_endtag(tag)
+
+    def data(self, data):
+        self.parts.append(data)
+
+    def comment(self, text):
+        self.flush()
+
+    def close(self):
+        self.flush()
+
+
+def _lxml_parser(handler):
+    """lxml(libxml2) 백엔드"""
+    return lxml_etree.HTMLParser(target=_LxmlTarget(handler), recover=True, no_network=True)
+
+
+# 사용 가능한 HTML 토크나이저 백엔드
+HTML_BACKENDS = {'html.parser': _HTMLParserDriver}
+if HAS_LXML:
+    HTML_BACKENDS['lxml'] = _lxml_parser
+DEFAULT_HTML_BACKEND = 'html.parser'
+
+
+class MarkupHandler:
+    """태그/텍스트 이벤트를 처리하는 추출기 기본 클래스 (토큰화는 선택한 HTML 백엔드가 담당)"""
+
+    def __init__(self, backend=DEFAULT_HTML_BACKEND):
+        self.parser = HTML_BACKENDS[backend](self)
+
+    def feed(self, data):
+        self.parser.feed(data)
+
+    def close(self):
+        self.parser.close()
+
+    def handle_starttag(self, tag, attrs):
+        pass
+
+    def handle_endtag(self, tag):
+        pass
+
+    def handle_data(self, data):
+        pass
+
+
+class ProductExtractor(MarkupHandler):
+    def __init__(self, site_name: str, boilerplate=None, backend=DEFAULT_HTML_BACKEND):
+        super().__init__(backend)
         self.products = []
         self.current_text = ""
         self.in_title = False
@@ -29,10 +910,16 @@ class ProductExtractor(HTMLParser):
         self.in_em = False  # em, i 태그 추적
         self.current_tag = ""
         self.site_name = site_name
+        self.classifier = get_site_classifier(site_name)
+
+        # 사이트 공통 텍스트 모델 (페이지의 짧은 텍스트 노드를 모아 다음 실행용으로 집계)
+        self.boilerplate = boilerplate
+        self.boilerplate_texts = boilerplate.texts if boilerplate is not None else frozenset()
+        self.page_texts = set()
         
         # 범용 특수 파싱 변수들
         self.in_special_field = False
-        self.special_field_type = ""
+        self.special_field_type = None
         self.current_class = ""
 
         
@@ -68,43 +955,14 @@ class ProductExtractor(HTMLParser):
             
             if meta_name and meta_content and 'title' in meta_name.lower():
                 if len(meta_content) > 3 and len(meta_content) < 200:
-                    self.products.append({
-                        'text': meta_content,
-                        'source': 'meta_title',
-                        'tag': 'meta',
-                        'confidence': 'high'
-                    })
+                    self.products.append(ProductCandidate(meta_content, Source.META_TITLE, 'meta', Confidence.HIGH))
         
         # 범용적인 클래스/ID 기반 파싱
         for attr_name, attr_value in attrs:
             if attr_name == 'class' and attr_value:
                 self.current_class = attr_value.lower()
                 # 다양한 사이트의 구조화된 정보 클래스들을 체크
-                special_classes = {
-                    'codename': 'codename',
-                    'fullname': 'fullname', 
-                    'productname': 'product_name',
-                    'product-name': 'product_name',
-                    'item-name': 'item_name',
-                    'goods-name': 'goods_name',
-                    'model-name': 'model_name',
-                    'kit-name': 'kit_name',
-                    'title': 'title_class',
-                    'name': 'name_class',
-                    'heading': 'heading_class',
-                    'caption': 'caption_class',
-                    'label': 'label_class',
-                    'text': 'text_class',
-                    'header': 'header_class',
-                    'subtitle': 'subtitle_class',
-                    'brand': 'brand_class',
-                    'series': 'series_class',
-                    'version': 'version_class',
-                    'type': 'type_class',
-                    'category': 'category_class'
-                }
-                
-                for class_pattern, field_type in special_classes.items():
+                for class_pattern, field_type in SPECIAL_CLASSES:
                     if class_pattern in attr_value.lower():
                         self.in_special_field = True
                         self.special_field_type = field_type
@@ -132,115 +990,65 @@ class ProductExtractor(HTMLParser):
             self.in_product_name = False
         if self.in_special_field:
             self.in_special_field = False
-            self.special_field_type = ""
+            self.special_field_type = None
         self.current_tag = ""
         self.current_class = ""
 
     
     def handle_data(self, data):
+        if self.boilerplate is not None and len(data) <= BOILERPLATE_MAX_TEXT_LEN:
+            self.page_texts.add(data)
+            # 사이트 공통 텍스트는 같은 문맥에서 한 번만 정제/판정하고 이후 페이지는 결과를 재사용
+            # (후보는 페이지마다 그대로 추가하므로 모델 유무와 관계없이 출력이 같음)
+            if data in self.boilerplate_texts:
+                key = (data, self.in_title, self.in_link, self.in_heading, self.in_strong or self.in_em,
+                       self.in_special_field, self.special_field_type, self.in_product_name, self.current_tag)
+                results = self.boilerplate.results
+                if key in results:
+                    self.boilerplate.skipped += 1
+                    candidate = results[key]
+                else:
+                    candidate = results[key] = self.classify_data(data)
+                if candidate is not None:
+                    self.products.append(ProductCandidate(*candidate))
+                return
+        candidate = self.classify_data(data)
+        if candidate is not None:
+            self.products.append(ProductCandidate(*candidate))
+
+    def classify_data(self, data):
+        """텍스트 노드 → 현재 태그 문맥에서의 후보 인자 (text, source, tag, confidence), 후보가 아니면 None"""
         cleaned_data = self.clean_text(data)
         if cleaned_data and len(cleaned_data) > 5:
             # title 태그에서 모든 텍스트를 빠짐없이 추출 (건프라 키워드 체크 완화)
             if self.in_title and cleaned_data.strip():
-                self.products.append({
-                    'text': cleaned_data,
-                    'source': 'title',
-                    'tag': self.current_tag,
-                    'confidence': 'high'
-                })
+                return cleaned_data, Source.TITLE, self.current_tag, Confidence.HIGH
             # a 태그 텍스트도 title로 인식 (네비게이션 링크나 상품 링크)
             elif self.in_link and cleaned_data.strip():
                 # a 태그는 건프라 키워드 체크를 완화 (더 많은 링크 텍스트 수집)
                 if len(cleaned_data) > 3 and len(cleaned_data) < 200:  # 길이 제한만 적용
-                    self.products.append({
-                        'text': cleaned_data,
-                        'source': 'link_title',  # a 태그에서 추출된 title
-                        'tag': self.current_tag,
-                        'confidence': 'high'
-                    })
+                    return cleaned_data, Source.LINK_TITLE, self.current_tag, Confidence.HIGH
             # 제목 태그들 (h1-h6)에서 추출
             elif self.in_heading and cleaned_data.strip():
                 if len(cleaned_data) > 3 and len(cleaned_data) < 150:
-                    self.products.append({
-                        'text': cleaned_data,
-                        'source': 'heading_title',
-                        'tag': self.current_tag,
-                        'confidence': 'high'
-                    })
+                    return cleaned_data, Source.HEADING_TITLE, self.current_tag, Confidence.HIGH
             # 강조 태그들 (strong, b, em, i)에서 추출
             elif (self.in_strong or self.in_em) and cleaned_data.strip():
                 if len(cleaned_data) > 3 and len(cleaned_data) < 100:
-                    self.products.append({
-                        'text': cleaned_data,
-                        'source': 'emphasized_title',
-                        'tag': self.current_tag,
-                        'confidence': 'medium'
-                    })
+                    return cleaned_data, Source.EMPHASIZED_TITLE, self.current_tag, Confidence.MEDIUM
             # 우선순위: 1) 특수 필드, 2) 상품명 클래스, 3) 일반
             elif self.in_special_field and cleaned_data.strip():
                 # 구조화된 필드는 키워드 체크 없이 수집 (더 신뢰도 높음)
-                self.products.append({
-                    'text': cleaned_data,
-                    'source': self.special_field_type,
-                    'tag': self.current_tag,
-                    'confidence': 'high'
-                })
+                return cleaned_data, self.special_field_type, self.current_tag, Confidence.HIGH
             elif self.in_product_name and self.is_potential_gunpla(cleaned_data):
-                self.products.append({
-                    'text': cleaned_data,
-                    'source': 'product_name',
-                    'tag': self.current_tag,
-                    'confidence': 'medium'
-                })
+                return cleaned_data, Source.PRODUCT_NAME, self.current_tag, Confidence.MEDIUM
             elif self.is_potential_gunpla(cleaned_data):
-                self.products.append({
-                    'text': cleaned_data,
-                    'source': 'general',
-                    'tag': self.current_tag,
-                    'confidence': 'low'
-                })
+                return cleaned_data, Source.GENERAL, self.current_tag, Confidence.LOW
+        return None
  
    
     def clean_text(self, text):
-        # HTML 엔티티 정리
-        text = text.replace('&nbsp;', ' ').replace('&amp;', '&')
-        text = text.replace('&lt;', '<').replace('&gt;', '>')
-        text = text.replace('&quot;', '"').replace('&apos;', "'")
-        
-        # 유니코드 정규화
-        text = unicodedata.normalize('NFKC', text)
-        
-        # 불필요한 문자 제거
-        text = re.sub(r'[\r\n\t]+', ' ', text)  # 개행문자를 공백으로
-        text = re.sub(r'\s+', ' ', text)       # 연속 공백을 하나로
-        
-        # 앞뒤 공백 및 특수문자 제거
-        text = text.strip(' \t\n\r\f\v｜|[]()<>{}"\'')
-        
-        # 인코딩이 깨진 텍스트 필터링 강화
-        if len(text) > 0:
-            # 1. null 문자나 제어 문자 제거
-            text = re.sub(r'[\x00-\x08\x0B\x0C\x0E-\x1F\x7F]', '', text)
-            
-            # 2. 깨진 문자 비율 계산 (의미있는 문자 외의 특수문자)
-            broken_chars = len(re.findall(r'[^\w\s가-힣\u3040-\u309f\u30a0-\u30ff\u4e00-\u9faf\-\(\)\[\]\.\,\:\;\'\"\/]', text))
-            total_chars = len(text)
-            broken_ratio = broken_chars / total_chars if total_chars > 0 else 0
-            
-            # 3. 깨진 문자가 25% 이상이면 제거 (더 엄격하게)
-            if broken_ratio > 0.25:
-                return ""
-            
-            # 4. 연속된 특수문자 체크
-            if re.search(r'[^\w\s가-힣\u3040-\u309f\u30a0-\u30ff\u4e00-\u9faf]{5,}', text):
-                return ""
-            
-            # 5. 의미있는 텍스트가 너무 짧으면 제거
-            meaningful_chars = len(re.findall(r'[\w가-힣\u3040-\u309f\u30a0-\u30ff\u4e00-\u9faf]', text))
-            if meaningful_chars < 3:
-                return ""
-        
-        return text
+        return clean_text(text)
     
     def extract_product_name(self, text):
         """설명문에서 상품명만 추출"""
@@ -272,157 +1080,144 @@ class ProductExtractor(HTMLParser):
     
     def should_include_as_reference(self, text):
         """번역 참고 자료로 포함할 가치가 있는 텍스트인지 판단"""
-        # 너무 긴 텍스트는 제외 (토큰 절약)
-        if len(text) > 80:
+        return self.classifier.should_include_as_reference(text)
+
+    def is_potential_gunpla(self, text):
+        return self.classifier.is_potential_gunpla(text)
+
+
+class TargetSelector:
+    """사이트 플러그인이 추출할 구조 위치 (태그 + class 토큰)"""
+    __slots__ = ('tag', 'class_name', 'source', 'confidence')
+
+    def __init__(self, tag, class_name, source, confidence=Confidence.HIGH):
+        self.tag = tag
+        self.class_name = class_name
+        self.source = source
+        self.confidence = confidence
+
+    def matches(self, tag, attrs):
+        if tag != self.tag:
             return False
-        
-        # 완전한 한국어 상품명이 있는 텍스트를 우선 선택 (참고 자료용)
-        # 인코딩 문제를 방지하기 위해 더 엄격한 검증
-        if re.search(r'(HG|RG|MG|PG|RE)', text):
-            # 한국어 문자가 실제로 의미있는 단어를 구성하는지 확인
-            korean_words = re.findall(r'[가-힣]{2,}', text)
-            if korean_words and len(korean_words) >= 1:
-                # 의미있는 한국어 단어가 있는 경우만 포함
-                return True
-        
-        # 브랜드 + 스케일 + 한국어 모델명 조합 (좋은 참고 자료)
-        has_brand = bool(re.search(r'(HG|RG|MG|PG|RE)', text))
-        has_scale = bool(re.search(r'1/\d+', text))
-        
-        # 한국어 모델명 검증 강화
-        korean_words = re.findall(r'[가-힣]{2,}', text)
-        has_korean_model = len(korean_words) >= 1
-        
-        if has_brand and has_scale and has_korean_model:
-            return True
-        
-        # 일본어가 포함되어도 한국어가 같이 있으면 참고 자료로 유용
-        has_japanese = bool(re.search(r'[\u3040-\u309f\u30a0-\u30ff\u4e00-\u9faf]', text))
-        if has_japanese and has_korean_model and has_brand:
+        if self.class_name is None:
             return True
-        
+        for attr_name, attr_value in attrs:
+            if attr_name == 'class' and attr_value and self.class_name in attr_value.split():
+                return True
         return False
 
-    def is_potential_gunpla(self, text):
-        # 기본 필터링: 길이 체크 (사이트별 조정)
-        # 다른 사이트는 완화
-        if len(text) < 3 or len(text) > 150:
-            return False
-            
-        # 불필요한 텍스트 필터링 (더 완화)
-        exclude_patterns = [
-            r'cookie', r'copyright', r'privacy', r'terms',
-            r'navigation', r'menu', r'search', r'login',
-            r'카트', r'장바구니', r'회원', r'로그인',
-            r'주문', r'결제', r'배송', r'문의',
-            r'\d{4}-\d{2}-\d{2}',  # 날짜 형식
-            r'^[\d\s\-\.]+$',     # 숫자와 구두점만
-            r'^[가-힣]{1,2}$',     # 한글 1-2글자만
-            r'다운로드', r'업로드', r'페이지', r'사이트',
-            r'링크', r'클릭', r'버튼', r'메뉴'
-            # '상품 설명', '제품 설명', '상세 정보' 제거 (더 많은 텍스트 포함)
-        ]
-        
-        for pattern in exclude_patterns:
-            if re.search(pattern, text, re.IGNORECASE):
-                return False
-        
-        # 사이트별 키워드 설정 (더 엄격하게)
-        if self.site_name == "dalong.net":
-            # Dalong.net은 일본어 키워드 위주 (더 많은 키워드 추가)
-            primary_keywords = ['ガンダム', 'ガンプラ', 'プラモデル', 'モビルスーツ', 'MS']
-            secondary_keywords = ['HG', 'RG', 'MG', 'PG', 'RE/100', 'RE', 'HGUC', 'HGBF', 'HGAW']
-            model_keywords = [
-                'フリーダム', 'ストライク', 'バルバトス', 'ユニコーン', 'エクシア',
-                'ウイングガンダム', 'デスティニー', 'インパルス', 'ジャスティス',
-                'ザク', 'ジム', 'シャア', 'キュベレイ', 'ノイエジール',
-                'アストレイ', 'ブリッツ', 'イージス', 'プロビデンス',
-                'ターンエー', 'ターンX', 'ガンダムX', 'ガンダムDX'
-            ]
-        elif self.site_name == "manual.bandai-hobby.net":
-            # Bandai Manual은 일본어 키워드 위주 (공식 사이트)
-            primary_keywords = ['ガンダム', 'ガンプラ', 'プラモデル']
-            secondary_keywords = ['HG', 'RG', 'MG', 'PG', 'RE/100']
-            model_keywords = [
-                'フリーダム', 'ストライク', 'バルバトス', 'ユニコーン', 'エクシア',
-                'ウイングガンダム', 'デスティニー', 'インパルス', 'ジャスティス',
-                'ストライクルージュ', 'スカイグラスパー', 'ルージュ', 'グラスパー'
-            ]
-        elif self.site_name == "gundam-wiki":
-            # Gundam Wiki: 영어/일본어/한국어 모두 포함
-            primary_keywords = [
-                'ガンダム', 'Gundam', '건담',
-                'Mobile Suit', 'モビルスーツ', '모빌슈트',
-                'ガンプラ', 'Gunpla', '건프라'
-            ]
-            secondary_keywords = ['HG', 'RG', 'MG', 'PG', 'RE/100', 'RE']
-            model_keywords = [
-                # 일본어
-                'フリーダム', 'ストライク', 'バルバトス', 'ユニコーン', 'エクシア',
-                'ザク', 'ジム', 'シャア', 'キュベレイ', 'ノイエジール',
-                # 영어
-                'Freedom', 'Strike', 'Barbatos', 'Unicorn', 'Exia',
-                'Zaku', 'GM', 'Char', 'Qubeley', 'Neue Ziel',
-                # 한국어
-                '프리덤', '스트라이크', '바르바토스', '유니콘', '엑시아',
-                '자쿠', '짐', '샤아', '큐베레이', '노이에질'
-            ]
-        elif self.site_name == "kr.gundam.info":
-            # Gundam Info 한국 사이트: 한국어 중심, 공식 사이트
-            primary_keywords = [
-                '건담', '건프라', '프라모델', '모빌슈트',
-                'ガンダム', 'ガンプラ', 'プラモデル', 'モビルスーツ',
-                'Gundam', 'Gunpla', 'Mobile Suit'
-            ]
-            secondary_keywords = ['HG', 'RG', 'MG', 'PG', 'RE', 'RE/100']
-            model_keywords = [
-                # 한국어
-                '프리덤', '스트라이크', '바르바토스', '유니콘', '엑시아',
-                '윙건담', '데스티니', '임펄스', '저스티스', '세라비',
-                '자쿠', '짐', '샤아', '큐베레이', '노이에질', '지온',
-                # 일본어
-                'フリーダム', 'ストライク', 'バルバトス', 'ユニコーン', 'エクシア',
-                'ウイングガンダム', 'デスティニー', 'インパルス', 'ジャスティス',
-                'ザク', 'ジム', 'シャア', 'キュベレイ', 'ノイエジール',
-                # 영어
-                'Freedom', 'Strike', 'Barbatos', 'Unicorn', 'Exia',
-                'Wing Gundam', 'Destiny', 'Impulse', 'Justice',
-                'Zaku', 'GM', 'Char', 'Qubeley', 'Neue Ziel'
-            ]
+
+class SitePlugin:
+    """사이트별 추출 규칙
+
+    targets: HTML에서 추출할 TargetSelector 목록 (없으면 범용 ProductExtractor 사용)
+    json_path: JSON API 미러에서 텍스트를 꺼낼 경로 (예: .result.articleList[].item.subject)
+    stop_when_found: 모든 target을 찾으면 나머지 HTML은 파싱하지 않음
+    """
+
+    def __init__(self, name, aliases=(), targets=(), json_path=None, stop_when_found=True):
+        self.name = name
+        self.aliases = tuple(aliases)
+        self.targets = tuple(targets)
+        self.json_path = json_path
+        self.stop_when_found = stop_when_found
+
+
+# 등록된 사이트 플러그인 (등록되지 않은 사이트는 범용 추출기 사용)
+SITE_PLUGINS = [
+    # Bandai Manual 상세 페이지: 상품명은 <h2 class="el_title"><span>...</span></h2>
+    SitePlugin('manual.bandai-hobby.net', aliases=['bandai-hobby'],
+               targets=[TargetSelector('h2', 'el_title', Source.HEADING_TITLE)]),
+    # gcd: 네이버 카페 게시판 JSON API
+    SitePlugin('gcd', json_path='.result.articleList[].item'),
+]
+
+_SITE_PLUGIN_MAP = {name: plugin for plugin in SITE_PLUGINS for name in (plugin.name, *plugin.aliases)}
+
+
+def get_site_plugin(site_name):
+    """사이트 이름/별칭으로 플러그인 조회 (없으면 None)"""
+    return _SITE_PLUGIN_MAP.get(site_name)
+
+
+class TargetedExtractor(MarkupHandler):
+    """플러그인이 지정한 위치의 텍스트만 모으는 파서 (나머지 텍스트는 정제 없이 건너뜀)"""
+
+    # 모든 target을 찾았는지 확인하는 간격 (문자 수)
+    FEED_CHUNK_SIZE = 16 * 1024
+
+    def __init__(self, plugin, backend=DEFAULT_HTML_BACKEND):
+        super().__init__(backend)
+        self.plugin = plugin
+        self.products = []
+        self.pending = list(plugin.targets)
+        self.current_target = None
+        self.depth = 0
+        self.parts = []
+
+    def handle_starttag(self, tag, attrs):
+        if self.current_target is not None:
+            if tag == self.current_target.tag:
+                self.depth += 1
+            return
+        for target in self.pending:
+            if target.matches(tag, attrs):
+                self.current_target = target
+                self.depth = 1
+                self.parts = []
+                break
+
+    def handle_endtag(self, tag):
+        if self.current_target is None or tag != self.current_target.tag:
+            return
+        self.depth -= 1
+        if self.depth > 0:
+            return
+        target = self.current_target
+        self.current_target = None
+        self.pending.remove(target)
+        text = clean_text(''.join(self.parts))
+        if text:
+            self.products.append(ProductCandidate(text, target.source, target.tag, target.confidence))
+
+    def handle_data(self, data):
+        if self.current_target is not None:
+            self.parts.append(data)
+
+    @property
+    def done(self):
+        return self.plugin.stop_when_found and not self.pending
+
+    def extract(self, content):
+        """모든 target을 찾을 때까지 content를 나눠 파싱"""
+        for start in range(0, len(content), self.FEED_CHUNK_SIZE):
+            self.feed(content[start:start + self.FEED_CHUNK_SIZE])
+            if self.done:
+                break
         else:
-            # 기본값: 정의되지 않은 사이트에 대한 기본 키워드
-            primary_keywords = ['ガンダム', 'Gundam', '건담', 'ガンプラ', 'Gunpla', '건프라']
-            secondary_keywords = ['HG', 'RG', 'MG', 'PG', 'RE']
-            model_keywords = [
-                'Freedom', 'Strike', 'Barbatos', 'Unicorn', 'Exia',
-                'Wing Gundam', 'Destiny', 'Impulse', 'Justice',
-                'Zaku', 'GM', 'Char', 'Qubeley', 'Neue Ziel'
-            ]
-        
-        text_lower = text.lower()
-        
-        # 1순위: 기본 키워드 체크
-        has_primary = any(keyword.lower() in text_lower for keyword in primary_keywords)
-        
-        # 2순위: 스케일 + 브랜드 조합
-        has_scale = re.search(r'1/(?:144|100|60|48)', text)
-        has_brand = any(keyword.lower() in text_lower for keyword in secondary_keywords)
-        
-        # 3순위: 모델명 키워드
-        has_model = any(keyword.lower() in text_lower for keyword in model_keywords)
-        
-        # 점수 기반 판정
-        score = 0
-        if has_primary: score += 3
-        if has_scale and has_brand: score += 2
-        elif has_scale or has_brand: score += 1  
-        if has_model: score += 1
-        
-        # 추가 보너스: 정확한 건프라 패턴
-        if re.search(r'(HG|RG|MG|PG|RE)\s+1/\d+', text, re.IGNORECASE):
-            score += 2
-            
-        return score >= 1  # 더 낮은 점수 기준으로 더 많은 텍스트 포함
+            self.close()
+        return self.products
+
+
+def iter_json_path(data, json_path):
+    """'.a.b[].c' 형식 경로의 값 목록 ([]는 리스트 항목 순회, 없는 경로는 건너뜀)"""
+    values = [data]
+    for key in json_path.strip('.').split('.'):
+        iterate = key.endswith('[]')
+        if iterate:
+            key = key[:-2]
+        next_values = []
+        for value in values:
+            value = value.get(key) if isinstance(value, dict) else None
+            if not value:
+                continue
+            if iterate:
+                if isinstance(value, list):
+                    next_values.extend(value)
+            else:
+                next_values.append(value)
+        values = next_values
+    return values
 
 
 def extract_title_from_filename(file_path):
@@ -469,267 +1264,372 @@ def detect_encoding_from_meta(content):
     
     return None
 
-def is_binary_file(file_path, sample_size=1024):
-    """파일이 바이너리인지 확인"""
-    try:
-        with open(file_path, 'rb') as f:
-            sample = f.read(sample_size)
-        
-        # null 바이트가 있으면 바이너리
-        if b'\x00' in sample:
-            return True
-        
-        # 텍스트로 디코딩 시도
+def is_binary_data(sample, declared_encoding=None):
+    """버퍼 앞부분이 바이너리인지 확인 (샘플 끝에서 잘린 멀티바이트 문자는 허용)"""
+    # null 바이트가 있으면 바이너리
+    if b'\x00' in sample:
+        return True
+
+    # 텍스트로 디코딩 시도 (UTF-8 → CP949 → 메타 태그에 선언된 인코딩)
+    for encoding in ('utf-8', 'cp949', declared_encoding):
+        if not encoding:
+            continue
         try:
-            sample.decode('utf-8')
+            codecs.getincrementaldecoder(encoding)().decode(sample, final=False)
             return False
-        except UnicodeDecodeError:
-            # UTF-8로 디코딩 실패 시 다른 인코딩 시도
-            try:
-                sample.decode('cp949')
-                return False
-            except UnicodeDecodeError:
-                return True
-    except Exception:
-        return True
+        except (UnicodeDecodeError, LookupError):
+            continue
+    return True
+
+
+def detect_encoding(buffer):
+    """메타 태그 → chardet(앞부분 샘플) 순으로 인코딩 추정 (바이너리면 ExtractionCache.BINARY)"""
+    # 처음 10KB만 디코딩해서 메타 태그 확인 (성능 최적화)
+    head_content = buffer[:META_SNIFF_SIZE].decode('utf-8', errors='ignore')
+    detected_encoding = detect_encoding_from_meta(head_content)
 
-def extract_products_from_html(html_file, site_name):
-    """HTML 파일에서 건프라 상품 정보 추출"""
+    # 바이너리 파일 체크
+    if is_binary_data(buffer[:BINARY_SNIFF_SIZE], detected_encoding):
+        return ExtractionCache.BINARY
+
+    # 인코딩이 감지되지 않으면 chardet로 추정 (가능한 경우, 파일 전체 대신 앞부분만 사용)
+    if not detected_encoding and HAS_CHARDET:
+        try:
+            result = chardet.detect(buffer[:CHARDET_SAMPLE_SIZE])
+            detected_encoding = result['encoding']
+            # chardet 신뢰도 체크
+            if result.get('confidence', 0) < 0.7:
+                detected_encoding = None
+        except:
+            pass
+
+    # 기본값으로 utf-8 사용
+    return detected_encoding or 'utf-8'
+
+
+def decode_html_buffer(buffer, encoding):
+    """감지된 인코딩으로 디코딩 (실패 시 대체 인코딩 순서대로 시도)"""
     try:
-        # 바이너리 파일 체크
-        if is_binary_file(html_file):
-            print(f"Skipping binary file: {html_file}")
-            return []
-        
-        # 파일 크기 체크 (너무 큰 파일 제외)
-        file_size = Path(html_file).stat().st_size
-        if file_size > 10 * 1024 * 1024:  # 10MB 이상
-            print(f"Skipping large file ({file_size/1024/1024:.1f}MB): {html_file}")
-            return []
-        
-        # 먼저 바이너리로 읽어서 메타 태그 확인
-        with open(html_file, 'rb') as f:
-            raw_content = f.read()
-        
-        # 파일이 비어있는지 체크
-        if len(raw_content) == 0:
-            return []
-        
-        # 처음 10KB만 읽어서 메타 태그 확인 (성능 최적화)
-        head_content = raw_content[:10240].decode('utf-8', errors='ignore')
-        detected_encoding = detect_encoding_from_meta(head_content)
-        
-        # 인코딩이 감지되지 않으면 chardet로 추정 (가능한 경우)
-        if not detected_encoding and HAS_CHARDET:
-            try:
-                result = chardet.detect(raw_content)
-                detected_encoding = result['encoding']
-                # chardet 신뢰도 체크
-                if result.get('confidence', 0) < 0.7:
-                    detected_encoding = None
-            except:
-                pass
-        
-        # 기본값으로 utf-8 사용
-        if not detected_encoding:
-            detected_encoding = 'utf-8'
-        
-        # 감지된 인코딩으로 디코딩
+        return str(buffer, encoding)
+    except (UnicodeDecodeError, LookupError):
+        pass
+    for fallback_encoding in ['utf-8', 'cp949', 'euc-kr', 'iso-8859-1']:
         try:
-            content = raw_content.decode(detected_encoding)
+            return str(buffer, fallback_encoding, 'ignore')
         except (UnicodeDecodeError, LookupError):
-            # 실패하면 다른 인코딩들 시도
-            for fallback_encoding in ['utf-8', 'cp949', 'euc-kr', 'iso-8859-1']:
-                try:
-                    content = raw_content.decode(fallback_encoding, errors='ignore')
-                    break
-                except (UnicodeDecodeError, LookupError):
-                    continue
-            else:
-                # 모든 인코딩 실패 시 UTF-8로 강제
-                content = raw_content.decode('utf-8', errors='ignore')
-        
-        # 디코딩된 내용이 너무 짧으면 제외
-        if len(content.strip()) < 100:
+            continue
+    # 모든 인코딩 실패 시 UTF-8로 강제
+    return str(buffer, 'utf-8', 'ignore')
+
+
+def read_html_content(html_file, cache=None):
+    """HTML 파일을 한 번만 읽어(mmap) 인코딩을 감지해 디코딩 (바이너리/대용량/빈 파일은 None)
+
+    cache(ExtractionCache)가 있으면 파일별 감지 인코딩을 재사용/저장한다.
+    """
+    file_path = str(html_file)
+    file_stat = os.stat(file_path)
+    encoding = cache.get_encoding(file_path, file_stat) if cache is not None else None
+
+    if encoding == ExtractionCache.BINARY:
+        print(f"Skipping binary file: {html_file}")
+        return None
+
+    # 파일이 비어있는지 체크 (빈 파일은 mmap 불가)
+    if file_stat.st_size == 0:
+        return None
+
+    with open(file_path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+        if encoding is None:
+            encoding = detect_encoding(buffer)
+            if cache is not None:
+                cache.save_encoding(file_path, file_stat, encoding)
+            if encoding == ExtractionCache.BINARY:
+                print(f"Skipping binary file: {html_file}")
+                return None
+
+        # 파일 크기 체크 (너무 큰 파일 제외)
+        if file_stat.st_size > MAX_HTML_FILE_SIZE:
+            print(f"Skipping large file ({file_stat.st_size/1024/1024:.1f}MB): {html_file}")
+            return None
+
+        content = decode_html_buffer(buffer, encoding)
+
+    # 디코딩된 내용이 너무 짧으면 제외
+    if len(content.strip()) < 100:
+        return None
+
+    return content
+
+
+def filename_products(html_file):
+    """파일명에서 추출한 제목 후보"""
+    filename_title = extract_title_from_filename(html_file)
+    if filename_title:
+        return [ProductCandidate(filename_title, Source.FILENAME_TITLE, 'filename', Confidence.MEDIUM)]
+    return []
+
+
+def extract_products_from_html(html_file, site_name, cache=None, boilerplate=None, html_backend=DEFAULT_HTML_BACKEND,
+                               near_duplicates=None):
+    """HTML 파일에서 건프라 상품 정보 추출
+
+    near_duplicates(NearDuplicateIndex)가 있으면 이번 실행에서 이미 파싱한 페이지의 유사 중복은 파싱하지 않는다.
+    유사 중복은 단독 숫자(카운터/날짜)를 뺀 본문이 대표 페이지와 같은 페이지뿐이라 본문 후보가 대표 페이지 후보와
+    같고 중복 제거 단계에서 합쳐지므로 파일명 후보만 반환한다.
+    """
+    try:
+        # 구조가 알려진 사이트는 지정된 위치만 추출 (조기 종료하므로 유사 중복 감지 불필요)
+        plugin = get_site_plugin(site_name)
+        targeted = plugin is not None and plugin.targets
+
+        fingerprint = None
+        if near_duplicates is not None and not targeted and cache is not None:
+            # 바뀌지 않은 파일은 저장된 지문으로 읽기 전에 판정
+            file_stat = os.stat(html_file)
+            fingerprint = cache.get_fingerprint(str(html_file), file_stat)
+            if fingerprint is not None and near_duplicates.find(fingerprint) is not None:
+                near_duplicates.collapsed += 1
+                return filename_products(html_file)
+
+        content = read_html_content(html_file, cache)
+        if content is None:
             return []
-        
-        extractor = ProductExtractor(site_name)
+
+        if targeted:
+            return TargetedExtractor(plugin, html_backend).extract(content)
+
+        if near_duplicates is not None and fingerprint is None:
+            fingerprint = page_fingerprint(content)
+            if fingerprint is not None:
+                if cache is not None:
+                    cache.save_fingerprint(str(html_file), file_stat, fingerprint)
+                if near_duplicates.find(fingerprint) is not None:
+                    near_duplicates.collapsed += 1
+                    return filename_products(html_file)
+
+        extractor = ProductExtractor(site_name, boilerplate, html_backend)
         extractor.feed(content)
-        
+        if boilerplate is not None:
+            boilerplate.add_page(extractor.page_texts)
+        if fingerprint is not None:
+            near_duplicates.add(fingerprint, str(html_file))
+
         # 파일명에서도 제목 추출
-        filename_title = extract_title_from_filename(html_file)
-        if filename_title:
-            extractor.products.append({
-                'text': filename_title,
-                'source': 'filename_title',
-                'tag': 'filename',
-                'confidence': 'medium'
-            })
-        
+        extractor.products.extend(filename_products(html_file))
         return extractor.products
     except Exception as e:
         print(f"Error processing {html_file}: {e}")
         return []
 
 
-def process_mirror_directory(mirror_dir, site_name):
-    """미러링된 디렉토리에서 모든 HTML 파일 처리"""
-    all_products = []
-    
-    # 범용적으로 .html과 .htm 파일들을 모두 포함
-    html_files = list(Path(mirror_dir).rglob("*.html")) + list(Path(mirror_dir).rglob("*.htm"))
-    
-    print(f"Found {len(html_files)} HTML files...")
-    
-    processed_count = 0
-    skipped_count = 0
-    
-    for html_file in html_files:
+def iter_html_files(mirror_dir):
+    """os.scandir 한 번의 순회로 .html/.htm 파일 경로를 생성 (디렉터리별 이름순)"""
+    return iter_mirror_files(mirror_dir, HTML_SUFFIXES)
+
+
+def iter_mirror_files(mirror_dir, suffixes):
+    """os.scandir 한 번의 순회로 suffixes로 끝나는 파일 경로를 생성 (디렉터리별 이름순)"""
+    stack = [str(mirror_dir)]
+    while stack:
+        current_dir = stack.pop()
         try:
-            products = extract_products_from_html(html_file, site_name)
-            if products:
-                for product in products:
-                    product['file'] = str(html_file)
-                all_products.extend(products)
-                processed_count += 1
-            else:
-                skipped_count += 1
+            with os.scandir(current_dir) as it:
+                entries = sorted(it, key=lambda entry: entry.name)
+        except OSError as e:
+            print(f"Error scanning {current_dir}: {e}")
+            continue
+
+        sub_dirs = []
+        for entry in entries:
+            try:
+                if entry.is_dir(follow_symlinks=False):
+                    sub_dirs.append(entry.path)
+                elif entry.name.endswith(suffixes) and entry.is_file():
+                    yield Path(entry.path)
+            except OSError:
+                continue
+        # 이름순으로 방문하도록 역순으로 스택에 쌓음
+        stack.extend(reversed(sub_dirs))
+
+
+def process_mirror_directory(mirror_dir, site_name, stats=None, file_paths=None, cache=None, boilerplate=None,
+                             html_backend=DEFAULT_HTML_BACKEND, near_duplicates=None):
+    """미러링된 디렉토리의 HTML 파일을 순회하며 후보를 하나씩 생성 (전체 목록을 메모리에 두지 않음)
+
+    후보의 file_index는 file_paths(경로 테이블)에 추가된 파일 경로의 인덱스다.
+    """
+    if stats is None:
+        stats = ExtractionStats()
+    if file_paths is None:
+        file_paths = []
+
+    for html_file in iter_html_files(mirror_dir):
+        stats.html_files += 1
+        try:
+            products = extract_products_from_html(html_file, site_name, cache, boilerplate, html_backend, near_duplicates)
         except Exception as e:
             print(f"Error processing {html_file}: {e}")
-            skipped_count += 1
-    
-    print(f"Processed: {processed_count}, Skipped: {skipped_count}")
-    return all_products
+            products = []
+
+        if not products:
+            stats.skipped_files += 1
+            continue
+
+        stats.processed_files += 1
+        file_index = len(file_paths)
+        file_paths.append(str(html_file))
+        for product in products:
+            product.file_index = file_index
+            stats.raw_products += 1
+            yield product
 
+    print(f"Found {stats.html_files} HTML files...")
+    print(f"Processed: {stats.processed_files}, Skipped: {stats.skipped_files}")
 
-def process_gcd_directory(mirror_dir: str) -> list[str]:
-    """gcd(JSON API) 미러 디렉터리에서 subject 목록 추출 (.result.articleList[].item.subject)"""
-    subjects: list[str] = []
-    json_files = list(Path(mirror_dir).rglob("*.json"))
-    print(f"Found {len(json_files)} JSON files...")
-    for json_file in json_files:
+
+def ingest_gcd_directory(mirror_dir: str, cache: ExtractionCache, json_path: str = '.result.articleList[].item') -> int:
+    """gcd(JSON API) 미러에서 마지막 적재 이후 바뀐 페이지만 읽어 기사 테이블에 적재 (바뀐 페이지 수 반환)
+
+    json_path는 기사 항목(item) 경로이며 articleId, subject, writeDateTimestamp 필드를 사용한다.
+    """
+    json_files = 0
+    changed_pages = 0
+    skipped_articles = 0
+    for json_file in iter_mirror_files(mirror_dir, ('.json',)):
+        json_files += 1
+        file_path = str(json_file)
         try:
-            with open(json_file, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-            result = data.get('result') if isinstance(data, dict) else None
-            if not result:
+            file_stat = os.stat(file_path)
+            if not cache.is_json_page_changed(file_path, file_stat):
                 continue
-            article_list = result.get('articleList', [])
-            for entry in article_list:
-                if not isinstance(entry, dict):
-                    continue
-                item = entry.get('item', {})
-                subject = item.get('subject')
-                if isinstance(subject, str):
-                    cleaned = ProductExtractor('gcd').clean_text(subject)
-                    if cleaned and 3 <= len(cleaned) <= 200:
-                        subjects.append(cleaned)
+            with open(file_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
         except Exception as e:
             print(f"Error processing JSON {json_file}: {e}")
             continue
-    return subjects
 
+        articles = []
+        for item in iter_json_path(data, json_path):
+            if not isinstance(item, dict):
+                continue
+            article_id = item.get('articleId')
+            subject = item.get('subject')
+            if not isinstance(subject, str):
+                continue
+            if not isinstance(article_id, int):
+                skipped_articles += 1
+                continue
+            # 정제는 기사 적재 시 한 번만 수행 (길이 조건을 벗어나면 내보내기에서 제외)
+            cleaned = clean_text(subject)
+            if cleaned and 3 <= len(cleaned) <= 200:
+                # 제어 문자 제거 후 남은 앞뒤 공백 정리
+                cleaned = cleaned.strip()
+            else:
+                cleaned = None
+            normalized = normalize_line(cleaned) if cleaned else None
+            articles.append((article_id, subject, cleaned, normalized, item.get('writeDateTimestamp')))
+
+        cache.save_gcd_articles(articles)
+        cache.save_json_page(file_path, file_stat)
+        changed_pages += 1
+
+    print(f"Found {json_files} JSON files...")
+    print(f"Changed pages ingested: {changed_pages}")
+    if skipped_articles:
+        print(f"Articles without articleId skipped: {skipped_articles}")
+    return changed_pages
 
-def save_gcd_subjects(subjects: list[str], output_file: str) -> None:
-    """gcd 추출 결과를 텍스트 파일로 저장"""
-    # 중복 제거 (공백 정규화 + 소문자 기준)
-    normalized_map: dict[str, str] = {}
-    for s in subjects:
-        normalized = re.sub(r'\s+', ' ', s.strip().lower())
-        if normalized not in normalized_map:
-            normalized_map[normalized] = s.strip()
-    unique_subjects = list(normalized_map.values())
-    unique_subjects.sort()
+
+def save_gcd_subjects(cache: ExtractionCache, output_file: str) -> int:
+    """적재된 gcd 기사 제목을 텍스트 파일로 저장 (저장한 제목 수 반환, 없으면 파일을 만들지 않음)"""
+    # 중복 제거 (공백 정규화 + 소문자 기준)와 정렬은 인덱스를 사용하는 한 번의 쿼리로 처리
+    unique_subjects = cache.gcd_unique_subjects()
+    if not unique_subjects:
+        return 0
 
     current_date = os.popen('date +"%Y-%m-%d"').read().strip()
     with open(output_file, 'w', encoding='utf-8') as f:
         f.write(f"# gcd 기사 제목 추출 결과\n")
         f.write(f"# 날짜: {current_date}\n")
         f.write(f"# 총 {len(unique_subjects)}개 추출 (JSON path: .result.articleList[].item.subject)\n\n")
-        seen_lines = set()
         for subj in unique_subjects:
-            key = re.sub(r'\s+', ' ', subj.strip().lower())
-            if key in seen_lines:
-                continue
-            seen_lines.add(key)
             f.write(f"{subj}\n")
+    return len(unique_subjects)
 
 
-def save_semi_structured_data(products, output_file, site_name):
-    """추출된 상품 정보를 title 태그 중심으로 저장 (토큰 절약)"""
-    # title 관련 태그들에서 추출된 것들을 우선 수집
-    title_products = [p for p in products if p['source'] in ['title', 'link_title', 'heading_title', 'emphasized_title', 'meta_title', 'filename_title']]
-    other_products = [p for p in products if p['source'] not in ['title', 'link_title', 'heading_title', 'emphasized_title', 'meta_title', 'filename_title']]
-    
+def dedup_reference_products(products, site_name):
+    """후보 스트림을 온라인으로 중복 제거
+
+    title 후보는 정규화 텍스트 기준 첫 항목을 유지하고, 기타 후보는 정제된 텍스트 기준으로
+    source 우선순위가 가장 높은 첫 항목을 유지한다. 같은 키의 title 후보보다 우선순위가
+    높은 기타 후보만 title 자리를 대체한다.
+    """
     # title만 추출할 것인지 확인하기 위한 옵션
     # 사이트별 최적화
     if site_name == "dalong.net":
-        TITLE_ONLY = False  # dalong.net은 title이 부족하므로 다른 필드도 포함
+        title_only = False  # dalong.net은 title이 부족하므로 다른 필드도 포함
     else:
-        TITLE_ONLY = True   # 기본값
-    
-    unique_products = {}
+        title_only = True   # 기본값
+
     extractor = ProductExtractor(site_name)
-    
-    # title 태그 데이터는 모두 포함 (중복 제거 강화)
-    for product in title_products:
-        text = product['text'].strip()
-        # 더 엄격한 중복 제거 (대소문자 무시, 공백 정규화)
-        normalized_text = re.sub(r'\s+', ' ', text.lower()).strip()
-        if len(text) > 5 and normalized_text not in unique_products:
-            unique_products[normalized_text] = product
-    
-    # TITLE_ONLY가 False일 때만 나머지 제품들 처리
-    if not TITLE_ONLY:
-        for product in other_products:
-            original_text = product['text']
-            
-            # 상품명 추출 및 정제
-            refined_text = extractor.extract_product_name(original_text)
-            
-            # 참고 자료 가치 판단
-            if not extractor.should_include_as_reference(refined_text):
-                continue
-            
-            # 최종 길이 제한 (토큰 절약)
-            if len(refined_text) > 80:
-                continue
-                
-            if refined_text not in unique_products:
-                product['text'] = refined_text  # 정제된 텍스트로 교체
-                unique_products[refined_text] = product
-            else:
-                # 더 좋은 소스로 업데이트
-                source_priority = {
-                    'codename': 10, 'fullname': 9, 'product_name': 8, 'item_name': 7, 
-                    'goods_name': 6, 'model_name': 5, 'kit_name': 4,
-                    'title': 8, 'general': 1  # title 우선순위 높임
-                }
-                current_priority = source_priority.get(product['source'], 0)
-                existing_priority = source_priority.get(unique_products[refined_text]['source'], 0)
-                
-                if current_priority > existing_priority:
-                    product['text'] = refined_text
-                    unique_products[refined_text] = product
-    
-    # 품질 점수로 정렬 (높은 점수부터)
-    sorted_products = sorted(unique_products.values(), 
-                           key=lambda x: x.get('quality_score', 0), reverse=True)
-    
-    # 최대 개수 제한 (사이트별 조정)
-    max_references = 2000  # 다른 사이트는 2000개
-    
-    if len(sorted_products) > max_references:
-        sorted_products = sorted_products[:max_references]
-        print(f"토큰 절약을 위해 상위 {max_references}개 참고 자료만 포함")
-    
-    # 품질별 분류
-    high_quality_products = [p for p in sorted_products if p.get('is_high_quality', False)]
-    medium_quality_products = [p for p in sorted_products if p.get('quality_score', 0) >= 2 and not p.get('is_high_quality', False)]
-    
+    title_products = {}
+    other_products = {}
+
+    for product in products:
+        if product.source in TITLE_SOURCES:
+            # title 태그 데이터는 모두 포함 (대소문자 무시, 공백 정규화)
+            text = product.text.strip()
+            normalized_text = normalize_line(text)
+            if len(text) > 5 and normalized_text not in title_products:
+                title_products[normalized_text] = product
+            continue
+
+        if title_only:
+            continue
+
+        # 상품명 추출 및 정제
+        refined_text = extractor.extract_product_name(product.text)
+
+        # 참고 자료 가치 판단 및 최종 길이 제한 (토큰 절약)
+        if len(refined_text) > 80 or not extractor.should_include_as_reference(refined_text):
+            continue
+
+        existing = other_products.get(refined_text)
+        if existing is None or SOURCE_PRIORITY.get(product.source, 0) > SOURCE_PRIORITY.get(existing.source, 0):
+            product.text = refined_text  # 정제된 텍스트로 교체
+            other_products[refined_text] = product
+
+    unique_products = title_products
+    for refined_text, product in other_products.items():
+        existing = unique_products.get(refined_text)
+        if existing is None or SOURCE_PRIORITY.get(product.source, 0) > SOURCE_PRIORITY.get(existing.source, 0):
+            unique_products[refined_text] = product
+
+    return unique_products
+
+
+def select_top_references(products, max_references=MAX_REFERENCES):
+    """품질 점수 상위 max_references개를 크기가 제한된 힙으로 선택 (동점은 먼저 나온 순서 유지)"""
+    return heapq.nlargest(max_references, products, key=lambda x: x.quality_score)
+
+
+def save_semi_structured_data(products, output_file, site_name):
+    """추출된 상품 정보를 title 태그 중심으로 저장 (토큰 절약)"""
+    unique_products = dedup_reference_products(products, site_name)
+
+    # 품질 점수로 정렬 (높은 점수부터), 최대 개수 제한
+    sorted_products = select_top_references(unique_products.values(), MAX_REFERENCES)
+    if len(unique_products) > MAX_REFERENCES:
+        print(f"토큰 절약을 위해 상위 {MAX_REFERENCES}개 참고 자료만 포함")
+    del unique_products
+
     # 메타 정보
     current_date = os.popen('date +"%Y-%m-%d"').read().strip()
-    
+
+    title_products_filtered = [p for p in sorted_products if p.source in TITLE_SOURCES]
+    other_products_filtered = [p for p in sorted_products if p.source not in TITLE_SOURCES]
+
     # 텍스트 형태로 저장
     with open(output_file, 'w', encoding='utf-8') as f:
         f.write(f"# {site_name} 상품명 추출 결과\n")
@@ -737,112 +1637,98 @@ def save_semi_structured_data(products, output_file, site_name):
         f.write(f"# 총 {len(sorted_products)}개 추출 (title 태그 우선)\n")
         f.write(f"# 용도: 모든 title 필드 텍스트 수집\n\n")
 
-        title_products_filtered = [p for p in sorted_products if p['source'] in ['title', 'link_title', 'heading_title', 'emphasized_title', 'meta_title', 'filename_title']]
-        other_products_filtered = [p for p in sorted_products if p['source'] not in ['title', 'link_title', 'heading_title', 'emphasized_title', 'meta_title', 'filename_title']]
-
-        def normalize_line(text: str) -> str:
-            return re.sub(r'\s+', ' ', text.strip().lower())
-
         seen_lines = set()
 
-        if TITLE_ONLY:
-            f.write(f"## Title 관련 태그에서 추출 ({len(title_products_filtered)}개)\n")
-            for product in title_products_filtered:
-                line = product['text']
-                key = normalize_line(line)
-                if key in seen_lines:
-                    continue
-                seen_lines.add(key)
-                f.write(f"{line}\n")
-        else:
-            f.write(f"## Title 관련 태그에서 추출 ({len(title_products_filtered)}개)\n")
-            for product in title_products_filtered:
-                line = product['text']
+        f.write(f"## Title 관련 태그에서 추출 ({len(title_products_filtered)}개)\n")
+        for product in title_products_filtered:
+            line = product.text
+            key = normalize_line(line)
+            if key in seen_lines:
+                continue
+            seen_lines.add(key)
+            f.write(f"{line}\n")
+
+        # title 전용 사이트는 기타 후보가 중복 제거 단계에서 이미 제외됨
+        if other_products_filtered:
+            f.write(f"\n## 기타 필드에서 추출 ({len(other_products_filtered)}개)\n")
+            for product in other_products_filtered[:200]:
+                line = product.text
                 key = normalize_line(line)
                 if key in seen_lines:
                     continue
                 seen_lines.add(key)
                 f.write(f"{line}\n")
 
-            if other_products_filtered:
-                f.write(f"\n## 기타 필드에서 추출 ({len(other_products_filtered)}개)\n")
-                for product in other_products_filtered[:200]:
-                    line = product['text']
-                    key = normalize_line(line)
-                    if key in seen_lines:
-                        continue
-                    seen_lines.add(key)
-                    f.write(f"{line}\n")
-    
     # 토큰 사용량 추정
-    total_chars = sum(len(p['text']) for p in sorted_products)
+    total_chars = sum(len(p.text) for p in sorted_products)
     estimated_tokens = total_chars // 3  # 대략적인 토큰 추정
-    
-    # title 추출 통계 계산
-    title_count = len(title_products_filtered)
-    other_count = len(other_products_filtered)
-    
+
     print(f"Extraction results saved to:")
     print(f"  - {output_file} (text format only)")
     print(f"  - Total references: {len(sorted_products)}")
-    print(f"  - From title tags: {title_count}")
-    print(f"  - From other sources: {other_count}")
+    print(f"  - From title tags: {len(title_products_filtered)}")
+    print(f"  - From other sources: {len(other_products_filtered)}")
     print(f"  - Estimated tokens: ~{estimated_tokens:,}")
     if sorted_products:
         print(f"  - Average length: {total_chars/len(sorted_products):.1f} chars")
     
 
-def validate_and_filter_products(products):
-    """추출된 제품 데이터의 품질 검증 및 필터링"""
-    validated_products = []
-    
+def validate_and_filter_products(products, site_name=None, stats=None):
+    """추출된 제품 데이터의 품질 검증 및 필터링 (스트림 단위로 처리)"""
+    # 추출 단계와 같은 분류 엔진을 사용해 문자열별 스캔 결과를 공유
+    classifier = get_site_classifier(site_name)
     for product in products:
-        text = product['text']
-        
-        # 품질 점수 계산
-        quality_score = 0
-        
-        # 1. 브랜드 + 스케일 + 모델명 패턴 (최고 점수)
-        if re.search(r'(HG|RG|MG|PG|RE)\s+1/\d+\s+\S+', text, re.IGNORECASE):
-            quality_score += 5
-        
-        # 2. 스케일 정보 있음
-        if re.search(r'1/(?:144|100|60|48)', text):
-            quality_score += 2
-            
-        # 3. 브랜드 정보 있음
-        if re.search(r'\b(HG|RG|MG|PG|RE)\b', text, re.IGNORECASE):
-            quality_score += 2
-            
-        # 4. 건프라 관련 키워드
-        gunpla_terms = ['건담', '건프라', '프라모델', '모빌슈트']
-        if any(term in text for term in gunpla_terms):
-            quality_score += 1
-            
-        # 5. 구체적인 모델명 키워드
-        model_terms = ['스트라이크', '유니콘', '엑시아', '프리덤', '발바토스', '자쿠', '짐', '샤아', '큐베레이', '노이에질', '지온', '아무로', '데스티니', '임펄스', '저스티스', '세라비']
-        if any(term in text for term in model_terms):
-            quality_score += 1
-            
         # 품질 점수 추가
-        product['quality_score'] = quality_score
-        product['is_high_quality'] = quality_score >= 3
+        quality_score = classifier.quality_score(product.text)
+        product.quality_score = quality_score
         
         # 최소 품질 기준 통과 시 추가
         if quality_score >= 1:
-            validated_products.append(product)
-    
-    return validated_products
+            if stats is not None:
+                stats.validated_products += 1
+                if product.is_high_quality:
+                    stats.high_quality_products += 1
+            yield product
+
+
+def index_references(site_name, output_file):
+    """추출 결과를 번역 참고 자료 검색 인덱스에 반영 (실패해도 추출 결과는 유지)"""
+    try:
+        count = update_reference_index(site_name, output_file)
+        print(f"Reference index updated: {count} lines ({site_name})")
+    except sqlite3.Error as e:
+        print(f"Error updating reference index: {e}")
 
 
 def main():
-    if len(sys.argv) != 4:
-        print("Usage: python3 extract_site_products.py <mirror_directory> <output_file> <site_name>")
+    usage = ("Usage: python3 extract_site_products.py [-b html_backend] [-d max_distance] <mirror_directory> <output_file> <site_name>\n"
+             f"  -b: HTML 토크나이저 백엔드 (사용 가능: {', '.join(HTML_BACKENDS)}, 기본값: {DEFAULT_HTML_BACKEND})\n"
+             f"  -d: 유사 중복 페이지로 보고 파싱을 건너뛸 SimHash 해밍 거리 (기본값: {NEAR_DUPLICATE_MAX_DISTANCE}, 음수면 사용 안 함)")
+    try:
+        opts, args = getopt.getopt(sys.argv[1:], "b:d:")
+    except getopt.GetoptError:
+        print(usage)
         sys.exit(1)
-    
-    mirror_dir = sys.argv[1]
-    output_file = sys.argv[2]
-    site_name = sys.argv[3]
+    if len(args) != 3:
+        print(usage)
+        sys.exit(1)
+
+    html_backend = DEFAULT_HTML_BACKEND
+    max_distance = NEAR_DUPLICATE_MAX_DISTANCE
+    for o, a in opts:
+        if o == "-b":
+            html_backend = a
+        elif o == "-d":
+            try:
+                max_distance = int(a)
+            except ValueError:
+                print(usage)
+                sys.exit(1)
+    if html_backend not in HTML_BACKENDS:
+        print(f"Error: HTML backend '{html_backend}' is not available (available: {', '.join(HTML_BACKENDS)})")
+        sys.exit(1)
+
+    mirror_dir, output_file, site_name = args
     
     if not os.path.exists(mirror_dir):
         print(f"Error: Mirror directory '{mirror_dir}' does not exist")
@@ -850,34 +1736,56 @@ def main():
     
     print(f"Extracting products from {site_name}: {mirror_dir}")
     
-    # gcd(JSON API) 전용 처리
-    if site_name == "gcd":
-        subjects = process_gcd_directory(mirror_dir)
-        if not subjects:
+    # JSON API 사이트(gcd) 전용 처리
+    plugin = get_site_plugin(site_name)
+    if plugin is not None and plugin.json_path:
+        # 기사 단위로 증분 적재한 뒤 추출 캐시에서 내보냄
+        with ExtractionCache(f"extract_cache_{site_name}.db") as cache:
+            ingest_gcd_directory(mirror_dir, cache, plugin.json_path)
+            subject_count = save_gcd_subjects(cache, output_file)
+            article_count = cache.count_gcd_articles()
+        if not subject_count:
             print("No subjects found from JSON")
             sys.exit(1)
-        save_gcd_subjects(subjects, output_file)
-        print(f"Extraction completed successfully! Total subjects: {len(subjects)}")
+        index_references(site_name, output_file)
+        print(f"Extraction completed successfully! Total subjects: {subject_count} (articles: {article_count})")
         return
     
     # HTML 파일에서 상품 정보 추출 (기존 사이트)
-    products = process_mirror_directory(mirror_dir, site_name)
-    
-    if not products:
-        print("No Gunpla products found")
-        sys.exit(1)
-    
-    print(f"Raw products extracted: {len(products)}")
-    
-    # 품질 검증 및 필터링
-    validated_products = validate_and_filter_products(products)
-    
-    print(f"Products after validation: {len(validated_products)}")
-    high_quality_count = sum(1 for p in validated_products if p.get('is_high_quality', False))
-    print(f"High quality products: {high_quality_count}")
-    
-    # Semi-structured 데이터로 저장
-    save_semi_structured_data(validated_products, output_file, site_name)
+    # 파일 순회 → 후보 생성 → 품질 검증 → 중복 제거/상위 선택을 하나의 스트림으로 처리
+    # 파일별 감지 인코딩/유사 중복 지문, 사이트 공통 텍스트 모델은 사이트별 추출 캐시에 보관해 다음 실행에서 재사용
+    stats = ExtractionStats()
+    near_duplicates = NearDuplicateIndex(max_distance) if max_distance >= 0 else None
+    with ExtractionCache(f"extract_cache_{site_name}.db") as cache:
+        boilerplate = BoilerplateModel(cache.load_boilerplate())
+        products = process_mirror_directory(mirror_dir, site_name, stats, cache=cache, boilerplate=boilerplate,
+                                            html_backend=html_backend, near_duplicates=near_duplicates)
+
+        first_product = next(products, None)
+        if first_product is None:
+            print("No Gunpla products found")
+            sys.exit(1)
+
+        # 품질 검증 및 필터링
+        validated_products = validate_and_filter_products(itertools.chain([first_product], products), site_name, stats)
+
+        # Semi-structured 데이터로 저장
+        save_semi_structured_data(validated_products, output_file, site_name)
+
+        # 이번 실행의 집계로 사이트 공통 텍스트 모델 갱신
+        learned_texts = boilerplate.learned_texts()
+        if learned_texts is not None:
+            cache.save_boilerplate(learned_texts)
+            print(f"Boilerplate texts learned: {len(learned_texts)} (from {boilerplate.pages} pages)")
+
+    print(f"Raw products extracted: {stats.raw_products}")
+    print(f"Products after validation: {stats.validated_products}")
+    print(f"High quality products: {stats.high_quality_products}")
+    print(f"Boilerplate text nodes reused: {boilerplate.skipped}")
+    if near_duplicates is not None:
+        print(f"Near-duplicate pages collapsed: {near_duplicates.collapsed} (of {stats.html_files} HTML files)")
+
+    index_references(site_name, output_file)
     
     print("Extraction completed successfully!")
 
@@ -0,0 +1,234 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import os
+import re
+import sys
+import json
+import gzip
+import fcntl
+import shutil
+import argparse
+from datetime import datetime
+from pathlib import Path
+from typing import Optional
+
+from convert_bandai_product_ja2ko import clean_text, write_translation
+from translation_memory import DEFAULT_MAPPING_PATH
+
+
+# 새 번역 쌍 묶음을 검사해 번역 매핑에 한 번에 병합 (매핑은 한 번 읽고 한 번 씀)
+MAPPING_BACKUPS = 10          # 남길 압축 백업 수 (오래된 것부터 삭제)
+MAX_TRANSLATION_LENGTH = 200
+
+# 충돌 처리: 기존 번역 유지 / 새 번역으로 교체 / 충돌이 있으면 병합하지 않음
+KEEP = 'keep'
+REPLACE = 'replace'
+FAIL = 'fail'
+
+# 번역 결과에 남으면 안 되는 가나 (번역 규칙: 히라가나/카타카나 완전 제거)
+KANA_RE = re.compile(r'[ぁ-ゟァ-ヺー]')
+
+
+class MergeResult:
+    """병합 결과 (추가/빈 번역 채움/교체/변화 없음 수, 충돌과 잘못된 항목 목록)"""
+
+    def __init__(self):
+        self.added = 0
+        self.filled = 0
+        self.replaced = 0
+        self.unchanged = 0
+        self.conflicts = []   # (키, 기존 번역, 새 번역)
+        self.invalid = []     # (위치, 사유)
+        self.written = False
+        self.backup_path = None
+
+    @property
+    def changed(self) -> int:
+        return self.added + self.filled + self.replaced
+
+
+def validate_translation(translation) -> Optional[str]:
+    """번역 결과 검사 (문제가 있으면 사유, 없으면 None)"""
+    if not isinstance(translation, str) or not translation.strip():
+        return "빈 번역"
+    if KANA_RE.search(translation):
+        return f"가나가 남은 번역: {translation}"
+    if '\n' in translation or len(translation) > MAX_TRANSLATION_LENGTH:
+        return "형식이 맞지 않는 번역"
+    return None
+
+
+def validate_pairs(pairs, result: MergeResult) -> list[tuple[str, str]]:
+    """
+    (위치, 일본어, 한국어) 목록을 검사해 (clean_text 키, 번역) 목록 반환
+    잘못된 쌍은 result.invalid에 기록, 묶음 안에서 같은 키가 다른 번역으로 나오면 충돌로 기록하고 앞의 것 사용
+    """
+    valid = {}
+    for location, ja, ko in pairs:
+        if not isinstance(ja, str) or not ja.strip():
+            result.invalid.append((location, "빈 키"))
+            continue
+        error = validate_translation(ko)
+        if error:
+            result.invalid.append((location, error))
+            continue
+        key = clean_text(ja)
+        ko = ko.strip()
+        if key in valid and valid[key] != ko:
+            result.conflicts.append((key, valid[key], ko))
+            continue
+        valid[key] = ko
+    return list(valid.items())
+
+
+def parse_pairs(text: str, result: MergeResult, source: str = "") -> list[tuple[str, object, object]]:
+    """
+    새 번역 쌍 파일 내용 → (위치, 일본어, 한국어) 목록 (형식이 맞지 않는 줄은 result.invalid에 기록)
+    JSON 객체 {"일본어": "한국어", ...} 또는 줄마다 {"ja": ..., "ko": ...} / {"일본어": "한국어"}인 JSON Lines
+    """
+    prefix = f"{source}:" if source else ""
+    if text.lstrip().startswith('{'):
+        try:
+            data = json.loads(text)
+        except ValueError:
+            data = None
+        if isinstance(data, dict) and not ('ja' in data and 'ko' in data):
+            return [(f"{prefix}{ja}", ja, ko) for ja, ko in data.items()]
+
+    pairs = []
+    for line_number, line in enumerate(text.splitlines(), 1):
+        line = line.strip()
+        if not line:
+            continue
+        location = f"{prefix}{line_number}"
+        try:
+            item = json.loads(line)
+        except ValueError as e:
+            result.invalid.append((location, f"JSON 오류: {e}"))
+            continue
+        if isinstance(item, dict) and 'ja' in item and 'ko' in item:
+            pairs.append((location, item['ja'], item['ko']))
+        elif isinstance(item, dict) and len(item) == 1:
+            ja, ko = next(iter(item.items()))
+            pairs.append((location, ja, ko))
+        else:
+            result.invalid.append((location, '{"ja": ..., "ko": ...} 형식이 아님'))
+    return pairs
+
+
+def rotate_backups(mapping_path: Path, keep: int = MAPPING_BACKUPS) -> Optional[Path]:
+    """현재 매핑을 <이름>.<시각>.gz로 압축 백업하고 오래된 백업 정리 (백업 경로 반환)"""
+    if keep <= 0 or not mapping_path.exists():
+        return None
+    backup_path = mapping_path.with_name(f"{mapping_path.name}.{datetime.now().strftime('%Y%m%d-%H%M%S-%f')}.gz")
+    with mapping_path.open('rb') as infile, gzip.open(backup_path, 'wb') as outfile:
+        shutil.copyfileobj(infile, outfile)
+    # 시각이 이름에 들어 있으므로 이름순 = 시간순
+    backups = sorted(mapping_path.parent.glob(f"{mapping_path.name}.*.gz"))
+    for old_backup in backups[:-keep]:
+        old_backup.unlink()
+    return backup_path
+
+
+def merge_mapping(mapping_path: Path, pairs: list[tuple[str, str]], on_conflict: str = KEEP,
+                  backups: int = MAPPING_BACKUPS, dry_run: bool = False, result: Optional[MergeResult] = None) -> MergeResult:
+    """
+    검사를 마친 (clean_text 키, 번역) 목록을 매핑에 병합
+    매핑을 한 번 읽어 clean_text 키 색인을 만들고, 바뀐 것이 있으면 압축 백업 후 임시 파일에 써서 교체
+    (잠금 파일로 다른 병합과 겹치지 않게 함, 기존 키 표기는 그대로 유지)
+    """
+    result = result or MergeResult()
+    lock_path = mapping_path.with_name(mapping_path.name + ".lock")
+    with open(lock_path, 'w') as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+
+        if mapping_path.exists():
+            with mapping_path.open("r", encoding="utf-8") as infile:
+                translation_data = json.load(infile)
+        else:
+            translation_data = {}
+        existing = {clean_text(key): key for key in translation_data}
+
+        conflicts = []
+        for key, translation in pairs:
+            original_key = existing.get(key)
+            if original_key is None:
+                translation_data[key] = translation
+                existing[key] = key
+                result.added += 1
+            elif translation_data[original_key] == translation:
+                result.unchanged += 1
+            elif not translation_data[original_key]:
+                translation_data[original_key] = translation
+                result.filled += 1
+            else:
+                conflicts.append((key, translation_data[original_key], translation))
+                if on_conflict == REPLACE:
+                    translation_data[original_key] = translation
+                    result.replaced += 1
+        result.conflicts.extend(conflicts)
+
+        if dry_run or not result.changed or (on_conflict == FAIL and result.conflicts):
+            return result
+        result.backup_path = rotate_backups(mapping_path, backups)
+        write_translation(mapping_path, translation_data)
+        result.written = True
+    return result
+
+
+def merge_file(mapping_path: Path, pairs_path: str, on_conflict: str = KEEP, backups: int = MAPPING_BACKUPS,
+               dry_run: bool = False) -> MergeResult:
+    """새 번역 쌍 파일('-'이면 표준 입력)을 검사해 병합 (잘못된 항목이 있어도 나머지는 병합)"""
+    text = sys.stdin.read() if pairs_path == '-' else Path(pairs_path).read_text(encoding='utf-8')
+    result = MergeResult()
+    pairs = validate_pairs(parse_pairs(text, result, "" if pairs_path == '-' else Path(pairs_path).name), result)
+    return merge_mapping(mapping_path, pairs, on_conflict, backups, dry_run, result)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='새 번역 쌍(JSON/JSON Lines)을 검사해 번역 매핑에 병합',
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog='''
+사용 예시:
+  python3 mapping_merge.py new_translations.json
+  python3 mapping_merge.py --dry-run new_translations.jsonl
+  echo '{"ja": "ガンダムエアリアル改修型", "ko": "건담 에어리얼 개수형"}' | python3 mapping_merge.py -
+  python3 mapping_merge.py --on-conflict replace fixes.json
+        '''
+    )
+    parser.add_argument('pairs_files', nargs='+', help="새 번역 쌍 파일 ('-'이면 표준 입력)")
+    parser.add_argument('-m', '--mapping', default=DEFAULT_MAPPING_PATH, help=f'번역 매핑 파일 (기본값: {DEFAULT_MAPPING_PATH})')
+    parser.add_argument('--on-conflict', choices=(KEEP, REPLACE, FAIL), default=KEEP,
+                        help='이미 다른 번역이 있는 키 처리: keep(기존 유지), replace(교체), fail(하나라도 있으면 병합 안 함) (기본값: keep)')
+    parser.add_argument('--backups', type=int, default=MAPPING_BACKUPS, help=f'남길 압축 백업 수 (0이면 백업 안 함, 기본값: {MAPPING_BACKUPS})')
+    parser.add_argument('--dry-run', action='store_true', help='검사와 충돌 확인만 하고 쓰지 않음')
+
+    args = parser.parse_args()
+    mapping_path = Path(args.mapping)
+
+    exit_code = 0
+    for pairs_file in args.pairs_files:
+        if pairs_file != '-' and not os.path.exists(pairs_file):
+            print(f"Skipping missing file: {pairs_file}")
+            exit_code = 1
+            continue
+        result = merge_file(mapping_path, pairs_file, args.on_conflict, args.backups, args.dry_run)
+        for location, reason in result.invalid:
+            print(f"invalid: {location}: {reason}")
+        for key, old, new in result.conflicts:
+            print(f"conflict: {key}: {old} → {new}")
+        print(f"{pairs_file}: 추가 {result.added}개, 빈 번역 채움 {result.filled}개, 교체 {result.replaced}개, "
+              f"변화 없음 {result.unchanged}개, 충돌 {len(result.conflicts)}개, 잘못된 항목 {len(result.invalid)}개")
+        if result.written:
+            print(f"매핑 저장: {mapping_path} (백업: {result.backup_path})")
+        elif result.changed and not args.dry_run:
+            print("충돌이 있어 병합하지 않았습니다")
+        if result.invalid or (args.on_conflict == FAIL and result.conflicts):
+            exit_code = 1
+    return exit_code
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,335 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import sys
+import re
+import json
+import sqlite3
+import argparse
+import unicodedata
+from pathlib import Path
+
+
+# 사이트별 참고 자료 파일 (extract_site_products.py 출력)을 모은 검색 인덱스
+DEFAULT_INDEX_PATH = "reference_index.db"
+
+# 브랜드/스케일 (검색 시 텍스트 대신 별도 컬럼으로 비교)
+BRAND_RE = re.compile(r'(?<![A-Za-z])(HGUC|HGCE|HGBF|HGBD|HGAC|HGFC|HGAW|HGCC|MGEX|MGSD|RE/?100|ENTRY GRADE|EG|HG|RG|MG|PG|SD)(?![A-Za-z])', re.IGNORECASE)
+SCALE_RE = re.compile(r'1/\d{1,4}')
+HANGUL_RE = re.compile(r'[가-힣]')
+
+# 후보 선택 단계에서 공유 n-gram 수로 먼저 고르는 줄 수
+CANDIDATE_LIMIT = 200
+
+# 자음 골격 클래스: 가나/한글/로마자를 같은 자음 기호로 옮겨 표기 체계가 달라도 비교
+# (K: ㄱㅋㄲ, S: ㅅㅆ, J: ㅈㅊㅉ, T: ㄷㅌㄸ, N: ㄴ, H: ㅎ, P: ㅂㅍㅃ, M: ㅁ, R: ㄹ, 모음/반모음은 생략)
+_KANA_ROWS = {
+    'K': 'かきくけこがぎぐげご',
+    'S': 'さしすせそ',
+    'J': 'ざじずぜぞちつぢづ',
+    'T': 'たてとだでど',
+    'N': 'なにぬねのん',
+    'H': 'はひへほ',
+    'P': 'ばびぶべぼぱぴぷぺぽふゔ',
+    'M': 'まみむめも',
+    'R': 'らりるれろ',
+}
+KANA_CLASSES = {}
+for _consonant, _row in _KANA_ROWS.items():
+    for _kana in _row:
+        KANA_CLASSES[_kana] = _consonant
+        KANA_CLASSES[chr(ord(_kana) + 0x60)] = _consonant  # 가타카나
+KANA_CLASSES.update({'ヷ': 'P', 'ヸ': 'P', 'ヹ': 'P', 'ヺ': 'P'})
+
+# 한글 초성 19자 / 종성 28자(없음 포함)의 자음 클래스 (초성 ㅇ은 무음, 종성 ㅇ은 ン에 대응)
+HANGUL_INITIAL_CLASSES = ['K', 'K', 'N', 'T', 'T', 'R', 'M', 'P', 'P', 'S', 'S', '', 'J', 'J', 'J', 'K', 'T', 'P', 'H']
+HANGUL_FINAL_CLASSES = ['', 'K', 'K', 'K', 'N', 'N', 'N', 'T', 'R', 'R', 'R', 'R', 'R', 'R', 'R', 'R',
+                        'M', 'P', 'P', 'S', 'S', 'N', 'J', 'J', 'K', 'T', 'P', 'H']
+
+LATIN_DIGRAPHS = {'ch': 'J', 'sh': 'S', 'ph': 'P', 'th': 'S', 'ck': 'K', 'ng': 'N', 'qu': 'K'}
+LATIN_CLASSES = {
+    'b': 'P', 'p': 'P', 'f': 'P', 'v': 'P',
+    'c': 'K', 'k': 'K', 'g': 'K', 'q': 'K', 'x': 'KS',
+    'd': 'T', 't': 'T',
+    'j': 'J', 'z': 'J',
+    'l': 'R', 'r': 'R',
+    'm': 'M', 'n': 'N', 's': 'S', 'h': 'H',
+}
+
+
+def normalize_text(text: str) -> str:
+    """검색용 정규화 (NFKC + 소문자)"""
+    return unicodedata.normalize('NFKC', text).lower()
+
+
+def split_brand_scale(text: str) -> tuple[str, str, str]:
+    """텍스트에서 브랜드/스케일을 분리 → (나머지 텍스트, 브랜드, 스케일)"""
+    text = unicodedata.normalize('NFKC', text)
+    brand = ""
+    m = BRAND_RE.search(text)
+    if m:
+        brand = m.group(1).upper().replace('/', '')
+        text = text[:m.start()] + ' ' + text[m.end():]
+    scale = ""
+    m = SCALE_RE.search(text)
+    if m:
+        scale = m.group(0)
+        text = text[:m.start()] + ' ' + text[m.end():]
+    return text, brand, scale
+
+
+def consonant_skeleton(text: str) -> str:
+    """가나/한글/로마자 표기를 자음 클래스 문자열로 변환 (예: ストライク, 스트라이크, Strike → STRK)"""
+    skeleton = []
+    text = text.lower()
+    i = 0
+    while i < len(text):
+        ch = text[i]
+        if 'a' <= ch <= 'z':
+            consonants = LATIN_DIGRAPHS.get(text[i:i + 2])
+            if consonants:
+                i += 2
+            else:
+                consonants = LATIN_CLASSES.get(ch, '')
+                i += 1
+        elif '가' <= ch <= '힣':
+            code = ord(ch) - 0xAC00
+            consonants = HANGUL_INITIAL_CLASSES[code // 588] + HANGUL_FINAL_CLASSES[code % 28]
+            i += 1
+        elif ch.isdigit():
+            skeleton.append(ch)
+            i += 1
+            continue
+        else:
+            consonants = KANA_CLASSES.get(ch, '')
+            i += 1
+        # 겹자음/촉음 등으로 같은 자음이 이어지면 하나로
+        for consonant in consonants:
+            if not skeleton or skeleton[-1] != consonant:
+                skeleton.append(consonant)
+    return ''.join(skeleton)
+
+
+def text_grams(text: str) -> set[str]:
+    """줄/질의의 검색 n-gram 집합 (s: 표면 문자 bigram, k: 자음 골격 trigram)"""
+    surface = re.sub(r'[\s\-_/・·.,:;()\[\]\'"]+', '', normalize_text(text))
+    grams = {'s:' + surface[i:i + 2] for i in range(len(surface) - 1)}
+    skeleton = consonant_skeleton(surface)
+    if len(skeleton) < 3:
+        if skeleton:
+            grams.add('k:' + skeleton)
+    else:
+        grams.update('k:' + skeleton[i:i + 3] for i in range(len(skeleton) - 2))
+    return grams
+
+
+def dice(a: set, b: set) -> float:
+    if not a or not b:
+        return 0.0
+    return 2 * len(a & b) / (len(a) + len(b))
+
+
+def score_match(query_grams, query_brand, query_scale, line_grams, line_brand, line_scale) -> float:
+    """자음 골격 유사도 + 표면 문자 유사도 + 브랜드/스케일 일치 보정"""
+    query_skeleton = {g for g in query_grams if g.startswith('k:')}
+    line_skeleton = {g for g in line_grams if g.startswith('k:')}
+    score = dice(query_skeleton, line_skeleton) + 0.5 * dice(query_grams - query_skeleton, line_grams - line_skeleton)
+    for query_value, line_value in ((query_brand, line_brand), (query_scale, line_scale)):
+        if query_value and line_value:
+            score += 0.3 if query_value == line_value else -0.3
+    return score
+
+
+def iter_reference_lines(reference_file):
+    """참고 자료 파일의 본문 줄 (주석/섹션 헤더/빈 줄 제외)"""
+    with open(reference_file, 'r', encoding='utf-8') as f:
+        for line in f:
+            line = line.strip()
+            if line and not line.startswith('#'):
+                yield line
+
+
+class ReferenceIndex:
+    """번역 참고 자료 검색 인덱스 (SQLite, 자음 골격/표면 문자 n-gram 역색인)"""
+
+    def __init__(self, db_path: str = DEFAULT_INDEX_PATH):
+        self.db_path = db_path
+        self.conn = sqlite3.connect(db_path)
+        self.init_database()
+
+    def init_database(self):
+        """데이터베이스 초기화"""
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS reference_lines (
+                line_id INTEGER PRIMARY KEY,
+                site TEXT,
+                text TEXT,
+                brand TEXT,
+                scale TEXT,
+                has_korean INTEGER
+            )
+        """)
+
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS reference_grams (
+                gram TEXT,
+                line_id INTEGER,
+                PRIMARY KEY (gram, line_id)
+            ) WITHOUT ROWID
+        """)
+
+        # 인덱스 생성
+        self.conn.execute("CREATE INDEX IF NOT EXISTS idx_reference_site ON reference_lines(site)")
+        self.conn.commit()
+
+    def update_site(self, site: str, lines) -> int:
+        """사이트의 참고 자료 줄을 새 목록으로 교체 (저장한 줄 수 반환)"""
+        with self.conn:
+            self.conn.execute("DELETE FROM reference_grams WHERE line_id IN (SELECT line_id FROM reference_lines WHERE site = ?)", (site,))
+            self.conn.execute("DELETE FROM reference_lines WHERE site = ?", (site,))
+            count = 0
+            for line in dict.fromkeys(lines):
+                rest, brand, scale = split_brand_scale(line)
+                cursor = self.conn.execute(
+                    "INSERT INTO reference_lines (site, text, brand, scale, has_korean) VALUES (?, ?, ?, ?, ?)",
+                    (site, line, brand, scale, 1 if HANGUL_RE.search(line) else 0))
+                self.conn.executemany("INSERT OR IGNORE INTO reference_grams (gram, line_id) VALUES (?, ?)",
+                                      ((gram, cursor.lastrowid) for gram in text_grams(rest)))
+                count += 1
+        return count
+
+    def search(self, query: str, k: int = 5, korean_only: bool = True) -> list[tuple[float, str, str]]:
+        """질의(일본어/로마자 상품명, 브랜드/스케일 포함 가능)와 비슷한 참고 자료 상위 k개 → (점수, 사이트, 텍스트)"""
+        rest, brand, scale = split_brand_scale(query)
+        grams = text_grams(rest)
+        if not grams:
+            return []
+
+        placeholders = ','.join('?' * len(grams))
+        rows = self.conn.execute(f"""
+            SELECT l.line_id, l.site, l.text, l.brand, l.scale, COUNT(*) AS hits
+            FROM reference_grams g JOIN reference_lines l ON l.line_id = g.line_id
+            WHERE g.gram IN ({placeholders}) {'AND l.has_korean = 1' if korean_only else ''}
+            GROUP BY g.line_id
+            ORDER BY hits DESC, g.line_id
+            LIMIT ?
+        """, (*grams, CANDIDATE_LIMIT)).fetchall()
+
+        results = []
+        for line_id, site, text, line_brand, line_scale, _ in rows:
+            line_grams = text_grams(split_brand_scale(text)[0])
+            score = score_match(grams, brand, scale, line_grams, line_brand, line_scale)
+            results.append((score, line_id, site, text))
+        results.sort(key=lambda x: (-x[0], x[1]))
+        return [(round(score, 3), site, text) for score, _, site, text in results[:k]]
+
+    def close(self):
+        self.conn.commit()
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+def update_reference_index(site: str, reference_file: str, db_path: str = DEFAULT_INDEX_PATH) -> int:
+    """사이트 참고 자료 파일로 인덱스 갱신 (extract_site_products.py에서 추출 후 호출)"""
+    with ReferenceIndex(db_path) as index:
+        return index.update_site(site, iter_reference_lines(reference_file))
+
+
+def parse_translating_error(line: str):
+    """'translating error: 상품명 / 브랜드 / 스케일 / 상품번호' 줄을 질의 문자열로 변환 (형식이 다르면 None)"""
+    if not line.startswith("translating error:"):
+        return None
+    fields = [field.strip() for field in line[len("translating error:"):].split(" / ")]
+    if len(fields) < 3:
+        return None
+    product_name, brand, scale = fields[0], fields[1], fields[2].replace('_', '/')
+    return ' '.join(value for value in (brand, scale, product_name) if value)
+
+
+def format_untranslated_item(line: str) -> str:
+    """convert_bandai_product_ja2ko.py -u의 JSON Lines 항목을 translating error 줄로 변환 (다른 줄은 그대로)"""
+    if not line.startswith('{'):
+        return line
+    try:
+        item = json.loads(line)
+        return f"translating error: {item['product_name']} / {item['brand']} / {item['scale']} / {item['product_number']}"
+    except (ValueError, KeyError, TypeError):
+        return line
+
+
+def untranslated_item_proposal(line: str):
+    """번역되지 않은 항목 JSON Lines에 붙은 번역 메모리 제안 → (제안, 신뢰도) (없으면 None)"""
+    if not line.startswith('{'):
+        return None
+    try:
+        item = json.loads(line)
+        return item['proposal'], item['confidence']
+    except (ValueError, KeyError, TypeError):
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='번역 참고 자료 검색 인덱스',
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog='''
+사용 예시:
+  python3 reference_index.py build dalong_products.txt gundaminfo_products.txt gcd_products.txt
+  python3 reference_index.py search "HG 1/144 ストライクフリーダム"
+  ./convert_bandai_product_ja2ko.py | grep "translating error:" | python3 reference_index.py search -
+  python3 reference_index.py search - < untranslated.jsonl
+        '''
+    )
+    parser.add_argument('-d', '--db', default=DEFAULT_INDEX_PATH, help=f'인덱스 파일 (기본값: {DEFAULT_INDEX_PATH})')
+    sub_parsers = parser.add_subparsers(dest='command', required=True)
+
+    build_parser = sub_parsers.add_parser('build', help='참고 자료 파일로 인덱스 갱신 (사이트 이름은 파일명에서 추출)')
+    build_parser.add_argument('reference_files', nargs='+', help='extract_site_products.py 출력 파일')
+
+    search_parser = sub_parsers.add_parser('search', help='상품명으로 한국어 참고 자료 검색')
+    search_parser.add_argument('query', nargs='+', help="검색어 ('-'이면 표준 입력의 translating error 줄 또는 번역되지 않은 항목 JSON Lines마다 검색)")
+    search_parser.add_argument('-k', type=int, default=5, help='결과 개수 (기본값: 5)')
+    search_parser.add_argument('--all-scripts', action='store_true', help='한국어가 없는 줄도 결과에 포함')
+
+    args = parser.parse_args()
+
+    if args.command == 'build':
+        with ReferenceIndex(args.db) as index:
+            for reference_file in args.reference_files:
+                if not Path(reference_file).exists():
+                    print(f"Skipping missing file: {reference_file}")
+                    continue
+                site = Path(reference_file).stem.removesuffix('_products')
+                count = index.update_site(site, iter_reference_lines(reference_file))
+                print(f"{reference_file}: {count} lines indexed ({site})")
+        return 0
+
+    korean_only = not args.all_scripts
+    with ReferenceIndex(args.db) as index:
+        if args.query == ['-']:
+            # translating error 줄(또는 번역되지 않은 항목 JSON Lines)을 출력하고 아래에 관련 참고 자료만 덧붙임
+            for line in sys.stdin:
+                line = line.rstrip('\n')
+                proposal = untranslated_item_proposal(line)
+                line = format_untranslated_item(line)
+                print(line)
+                if proposal:
+                    print(f"  제안: {proposal[0]} (신뢰도 {proposal[1]:.2f})")
+                query = parse_translating_error(line)
+                if not query:
+                    continue
+                for score, site, text in index.search(query, args.k, korean_only):
+                    print(f"  참고: {text} ({site})")
+        else:
+            for score, site, text in index.search(' '.join(args.query), args.k, korean_only):
+                print(f"{score:.3f}\t{site}\t{text}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
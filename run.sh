@@ -32,12 +32,22 @@ echo "=== Bandai Manual 데이터 수집 ==="
 #echo
 #echo "=== 번역 참고 자료 추출 ==="
 #python gemini_agent.py < instruction.md
-if ./convert_bandai_product_ja2ko.py | grep "translating error:" > /dev/null; then
-    (cat instruction.md; ./convert_bandai_product_ja2ko.py | grep "translating error:") | ~/.local/bin/claude --dangerously-skip-permissions -p
-    #(cat instruction.md; ./convert_bandai_product_ja2ko.py | grep "translating error:") | /bin/codex exec --sandbox=workspace-write
-fi
 
+# 한 번의 실행으로 통계(로그), 번역되지 않은 항목(JSON Lines), HTML 목록을 함께 생성
 echo
 echo "=== Bandai Manual 결과 조회 및 HTML 저장 ==="
-./convert_bandai_product_ja2ko.py 
-./convert_bandai_product_ja2ko.py -h > ~/public_html/bandai/gundam.html
+./convert_bandai_product_ja2ko.py -u untranslated.jsonl -o ~/public_html/bandai/gundam.html -d ~/public_html/bandai/catalog > convert.log
+if [ -s untranslated.jsonl ]; then
+    # 이전에 시도하지 않은 항목만 작업 큐(translation_jobs.db)에 추가하고,
+    # 배치마다 관련 참고 자료(reference_index.db 검색 결과)를 덧붙여 백엔드로 번역한 뒤 매핑에 병합
+    ./translation_jobs.py enqueue untranslated.jsonl
+    ./translation_jobs.py run --backend "$HOME/.local/bin/claude --dangerously-skip-permissions -p" > translate.log
+    #./translation_jobs.py run --backend "/bin/codex exec --sandbox=workspace-write -" > translate.log
+    cat translate.log
+
+    # 새 번역이 병합된 뒤에만 한 번 더 실행해 HTML 목록 갱신
+    if grep -q "매핑 병합: [1-9]" translate.log; then
+        ./convert_bandai_product_ja2ko.py -u untranslated.jsonl -o ~/public_html/bandai/gundam.html -d ~/public_html/bandai/catalog > convert.log
+    fi
+fi
+cat convert.log
@@ -0,0 +1,403 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import os
+import re
+import sys
+import json
+import time
+import shlex
+import sqlite3
+import argparse
+import subprocess
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from pathlib import Path
+from typing import Optional
+
+from convert_bandai_product_ja2ko import clean_text
+from mapping_merge import MAPPING_BACKUPS, merge_mapping, validate_translation
+from reference_index import DEFAULT_INDEX_PATH, ReferenceIndex
+from translation_memory import DEFAULT_MAPPING_PATH
+
+
+# 번역되지 않은 항목(convert_bandai_product_ja2ko.py -u)을 쌓아 두고 번역 백엔드에 배치로 보내는 작업 큐
+DEFAULT_JOBS_PATH = "translation_jobs.db"
+DEFAULT_INSTRUCTION_PATH = "instruction.md"
+DEFAULT_BACKEND = "claude -p"
+
+BATCH_SIZE = 20          # 백엔드 호출 한 번에 보낼 항목 수
+BACKEND_WORKERS = 2      # 동시에 실행할 백엔드 수
+BACKEND_TIMEOUT = 600    # 백엔드 호출 한 번의 제한 시간 (초)
+MAX_ATTEMPTS = 3         # 응답이 없거나 거부된 항목을 다시 보낼 최대 횟수 (넘으면 failed)
+REFERENCE_LIMIT = 3      # 항목마다 덧붙일 참고 자료 수
+
+# 작업 상태: 대기 → 번역됨(응답 캐시에 있음) → 매핑에 병합됨, 또는 재시도 횟수를 넘겨 실패
+PENDING = 'pending'
+DONE = 'done'
+MERGED = 'merged'
+FAILED = 'failed'
+
+PROPOSAL_RE = re.compile(r'^\s*제안: (?P<proposal>.+) \(신뢰도 [0-9.]+\)$')
+ID_RE = re.compile(r'^\s*id: (?P<id>\d+)$')
+
+
+class TranslationJobQueue:
+    """번역 작업 큐와 항목별 응답 캐시 (SQLite, 상품명 키로 중복 제거)"""
+
+    def __init__(self, db_path: str = DEFAULT_JOBS_PATH):
+        self.db_path = db_path
+        self.conn = sqlite3.connect(db_path)
+        self.init_database()
+
+    def init_database(self):
+        """데이터베이스 초기화"""
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS jobs (
+                job_id INTEGER PRIMARY KEY,
+                key TEXT UNIQUE,
+                product_name TEXT,
+                brand TEXT,
+                scale TEXT,
+                product_number INTEGER,
+                proposal TEXT,
+                confidence REAL,
+                status TEXT,
+                attempts INTEGER DEFAULT 0,
+                error TEXT,
+                updated_at REAL
+            )
+        """)
+
+        # 받아들인 응답 (같은 키는 다시 보내지 않음)
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS responses (
+                key TEXT PRIMARY KEY,
+                translation TEXT,
+                backend TEXT,
+                created_at REAL
+            )
+        """)
+
+        # 인덱스 생성
+        self.conn.execute("CREATE INDEX IF NOT EXISTS idx_jobs_status ON jobs(status)")
+        self.conn.commit()
+
+    def enqueue(self, items) -> tuple[int, int]:
+        """
+        번역되지 않은 항목들을 큐에 추가 → (새 작업 수, 다시 병합할 작업 수)
+        이미 시도한 키는 건너뛰고, 병합했는데 다시 번역되지 않은 항목으로 나온 키는 캐시된 응답으로 다시 병합
+        """
+        added = remerge = 0
+        now = time.time()
+        with self.conn:
+            for item in items:
+                key = clean_text(item['product_name'])
+                row = self.conn.execute("SELECT status FROM jobs WHERE key = ?", (key,)).fetchone()
+                if row is None:
+                    self.conn.execute("""
+                        INSERT INTO jobs (key, product_name, brand, scale, product_number, proposal, confidence, status, updated_at)
+                        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+                    """, (key, item['product_name'], item.get('brand', ''), item.get('scale', ''),
+                          item.get('product_number'), item.get('proposal'), item.get('confidence'), PENDING, now))
+                    added += 1
+                elif row[0] == MERGED:
+                    self.conn.execute("UPDATE jobs SET status = ?, updated_at = ? WHERE key = ?", (DONE, now, key))
+                    remerge += 1
+        return added, remerge
+
+    def retry_failed(self) -> int:
+        """실패한 작업을 다시 대기 상태로 (재시도 횟수 초기화)"""
+        with self.conn:
+            return self.conn.execute("UPDATE jobs SET status = ?, attempts = 0, error = NULL WHERE status = ?",
+                                     (PENDING, FAILED)).rowcount
+
+    def claim_cached(self) -> int:
+        """캐시에 응답이 있는 대기 작업은 보내지 않고 번역됨으로 표시 (표시한 수 반환)"""
+        with self.conn:
+            return self.conn.execute("""
+                UPDATE jobs SET status = ?, updated_at = ?
+                WHERE status = ? AND key IN (SELECT key FROM responses)
+            """, (DONE, time.time(), PENDING)).rowcount
+
+    def pending_jobs(self) -> list[tuple]:
+        """보낼 작업 목록 (job_id, product_name, brand, scale, product_number, proposal, confidence), 제품번호 순서"""
+        return self.conn.execute("""
+            SELECT job_id, product_name, brand, scale, product_number, proposal, confidence FROM jobs
+            WHERE status = ? ORDER BY product_number, job_id
+        """, (PENDING,)).fetchall()
+
+    def record_batch(self, job_ids: list[int], translations: dict[int, str], errors: dict[int, str],
+                     backend: str, max_attempts: int = MAX_ATTEMPTS) -> None:
+        """배치 결과 저장: 받아들인 번역은 캐시하고 번역됨으로, 나머지는 시도 횟수를 올림 (배치마다 바로 커밋)"""
+        now = time.time()
+        with self.conn:
+            for job_id in job_ids:
+                if job_id in translations:
+                    key = self.conn.execute("SELECT key FROM jobs WHERE job_id = ?", (job_id,)).fetchone()[0]
+                    self.conn.execute("INSERT OR REPLACE INTO responses (key, translation, backend, created_at) VALUES (?, ?, ?, ?)",
+                                      (key, translations[job_id], backend, now))
+                    self.conn.execute("UPDATE jobs SET status = ?, attempts = attempts + 1, error = NULL, updated_at = ? WHERE job_id = ?",
+                                      (DONE, now, job_id))
+                else:
+                    self.conn.execute("""
+                        UPDATE jobs SET attempts = attempts + 1, error = ?, updated_at = ?,
+                                        status = CASE WHEN attempts + 1 >= ? THEN ? ELSE status END
+                        WHERE job_id = ?
+                    """, (errors.get(job_id, "응답 없음"), now, max_attempts, FAILED, job_id))
+
+    def done_translations(self) -> list[tuple[str, str]]:
+        """병합할 (키, 번역) 목록"""
+        return self.conn.execute("""
+            SELECT j.key, r.translation FROM jobs j JOIN responses r ON r.key = j.key
+            WHERE j.status = ? ORDER BY j.key
+        """, (DONE,)).fetchall()
+
+    def mark_merged(self, keys: list[str], conflicts: dict[str, str]) -> None:
+        """병합한 키 표시 (이미 다른 번역이 있던 키는 그 번역을 오류 칸에 기록)"""
+        now = time.time()
+        with self.conn:
+            self.conn.executemany("UPDATE jobs SET status = ?, error = ?, updated_at = ? WHERE key = ?",
+                                  ((MERGED, f"기존 번역 유지: {conflicts[key]}" if key in conflicts else None, now, key)
+                                   for key in keys))
+
+    def status_counts(self) -> dict[str, int]:
+        return dict(self.conn.execute("SELECT status, COUNT(*) FROM jobs GROUP BY status").fetchall())
+
+    def close(self):
+        self.conn.commit()
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+def read_untranslated_items(lines) -> list[dict]:
+    """번역되지 않은 항목 JSON Lines 읽기 (형식이 다른 줄은 건너뜀)"""
+    items = []
+    for line in lines:
+        line = line.strip()
+        if not line.startswith('{'):
+            continue
+        try:
+            item = json.loads(line)
+        except ValueError:
+            continue
+        if isinstance(item, dict) and item.get('product_name'):
+            items.append(item)
+    return items
+
+
+def format_batch(instruction: str, jobs: list[tuple], index: Optional[ReferenceIndex] = None) -> str:
+    """백엔드에 보낼 입력: 작업 지침 + 항목마다 translating error 줄, id, 제안, 참고 자료"""
+    lines = [instruction.rstrip('\n'), ""]
+    for job_id, product_name, brand, scale, product_number, proposal, confidence in jobs:
+        lines.append(f"translating error: {product_name} / {brand} / {scale} / {product_number}")
+        lines.append(f"  id: {job_id}")
+        if proposal:
+            lines.append(f"  제안: {proposal} (신뢰도 {confidence or 0:.2f})")
+        if index is not None:
+            query = ' '.join(value for value in (brand, scale.replace('_', '/'), product_name) if value)
+            for _, site, text in index.search(query, REFERENCE_LIMIT):
+                lines.append(f"  참고: {text} ({site})")
+    return "\n".join(lines) + "\n"
+
+
+def parse_backend_output(output: str, job_ids: list[int]) -> tuple[dict[int, str], dict[int, str]]:
+    """
+    백엔드 출력에서 {"id": ..., "ko": ...} 줄을 찾아 → (받아들인 번역, 거부 사유)
+    다른 줄(설명, 코드 블록 표시 등)은 무시하고, 같은 id가 여러 번 나오면 마지막 줄 사용
+    """
+    wanted = set(job_ids)
+    translations = {}
+    errors = {}
+    for line in output.splitlines():
+        line = line.strip().rstrip(',')
+        if not line.startswith('{'):
+            continue
+        try:
+            response = json.loads(line)
+            job_id = int(response['id'])
+        except (ValueError, KeyError, TypeError):
+            continue
+        if job_id not in wanted:
+            continue
+        translation = response.get('ko')
+        error = validate_translation(translation)
+        if error:
+            errors[job_id] = error
+            translations.pop(job_id, None)
+        else:
+            translations[job_id] = translation.strip()
+            errors.pop(job_id, None)
+    return translations, errors
+
+
+def call_backend(backend: str, prompt: str, timeout: float = BACKEND_TIMEOUT) -> str:
+    """백엔드 명령에 입력을 표준 입력으로 주고 표준 출력 반환 (실패하면 RuntimeError)"""
+    try:
+        result = subprocess.run(shlex.split(backend), input=prompt, capture_output=True, text=True, timeout=timeout)
+    except (OSError, subprocess.TimeoutExpired) as e:
+        raise RuntimeError(f"백엔드 실행 실패: {e}") from e
+    if result.returncode != 0:
+        raise RuntimeError(f"백엔드 종료 코드 {result.returncode}: {result.stderr.strip()[-200:]}")
+    return result.stdout
+
+
+def run_jobs(queue: TranslationJobQueue, backend: str, instruction: str, index: Optional[ReferenceIndex] = None,
+             batch_size: int = BATCH_SIZE, workers: int = BACKEND_WORKERS, max_attempts: int = MAX_ATTEMPTS,
+             timeout: float = BACKEND_TIMEOUT) -> dict[str, int]:
+    """
+    대기 작업을 batch_size개씩 나눠 최대 workers개의 백엔드로 동시에 번역 (결과는 배치가 끝나는 대로 저장)
+    캐시에 응답이 있는 작업은 보내지 않음
+    """
+    counts = {'cached': queue.claim_cached(), 'sent': 0, 'translated': 0, 'rejected': 0, 'batches': 0, 'failed_batches': 0}
+    jobs = queue.pending_jobs()
+    if not jobs:
+        return counts
+
+    # 참고 자료 검색(SQLite 연결)은 이 스레드에서만 하도록 입력을 먼저 만듦
+    batches = [jobs[i:i + batch_size] for i in range(0, len(jobs), batch_size)]
+    prompts = [format_batch(instruction, batch, index) for batch in batches]
+
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+        futures = {executor.submit(call_backend, backend, prompt, timeout): batch for batch, prompt in zip(batches, prompts)}
+        for future in as_completed(futures):
+            batch = futures[future]
+            job_ids = [job[0] for job in batch]
+            counts['batches'] += 1
+            counts['sent'] += len(job_ids)
+            try:
+                translations, errors = parse_backend_output(future.result(), job_ids)
+            except RuntimeError as e:
+                # 배치 전체 실패도 항목마다 시도 횟수에 포함
+                print(f"batch error: {e} ({len(job_ids)}개)")
+                counts['failed_batches'] += 1
+                queue.record_batch(job_ids, {}, {job_id: str(e) for job_id in job_ids}, backend, max_attempts)
+                continue
+            for job_id, error in errors.items():
+                print(f"rejected: id {job_id}: {error}")
+            queue.record_batch(job_ids, translations, errors, backend, max_attempts)
+            counts['translated'] += len(translations)
+            counts['rejected'] += len(errors)
+    return counts
+
+
+def merge_translations(queue: TranslationJobQueue, mapping_path: Path, backups: int = MAPPING_BACKUPS) -> tuple[int, int]:
+    """
+    번역된 작업을 매핑 파일에 병합 (mapping_merge.merge_mapping) → (추가한 수, 기존 번역을 유지한 충돌 수)
+    병합 표시는 매핑을 교체한 뒤에 함 (중간에 중단되면 다음 병합에서 같은 번역이 이미 있는 키로 처리됨)
+    """
+    done = queue.done_translations()
+    if not done:
+        return 0, 0
+    result = merge_mapping(mapping_path, done, backups=backups)
+    queue.mark_merged([key for key, _ in done], {key: old for key, old, _ in result.conflicts})
+    return result.added + result.filled, len(result.conflicts)
+
+
+def mock_backend(prompt: str) -> str:
+    """
+    오프라인 테스트용 백엔드: 제안이 있는 항목은 제안을 번역으로, 없는 항목은 응답하지 않음
+    (translation_jobs.py mock-backend로 실행해 --backend에 지정)
+    """
+    lines = []
+    job_id = None
+    for line in prompt.splitlines():
+        if line.startswith("translating error:"):
+            job_id = None
+        elif m := ID_RE.match(line):
+            job_id = int(m.group('id'))
+        elif (m := PROPOSAL_RE.match(line)) and job_id is not None:
+            lines.append(json.dumps({"id": job_id, "ko": m.group('proposal')}, ensure_ascii=False))
+    return "\n".join(lines) + ("\n" if lines else "")
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='번역되지 않은 항목을 번역 백엔드에 배치로 보내고 결과를 매핑에 병합하는 작업 큐',
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog='''
+사용 예시:
+  python3 translation_jobs.py enqueue untranslated.jsonl
+  python3 translation_jobs.py run --backend "claude -p"
+  python3 translation_jobs.py run --backend "python3 translation_jobs.py mock-backend" -m /tmp/mapping.json
+  python3 translation_jobs.py merge
+  python3 translation_jobs.py status
+        '''
+    )
+    parser.add_argument('-d', '--db', default=DEFAULT_JOBS_PATH, help=f'작업 큐 파일 (기본값: {DEFAULT_JOBS_PATH})')
+    parser.add_argument('-m', '--mapping', default=DEFAULT_MAPPING_PATH, help=f'번역 매핑 파일 (기본값: {DEFAULT_MAPPING_PATH})')
+    sub_parsers = parser.add_subparsers(dest='command', required=True)
+
+    enqueue_parser = sub_parsers.add_parser('enqueue', help='번역되지 않은 항목(JSON Lines)을 큐에 추가 (이미 시도한 상품명은 건너뜀)')
+    enqueue_parser.add_argument('untranslated_file', help="convert_bandai_product_ja2ko.py -u 출력 파일 ('-'이면 표준 입력)")
+
+    run_parser = sub_parsers.add_parser('run', help='대기 작업을 백엔드로 번역하고 매핑에 병합')
+    run_parser.add_argument('--backend', default=DEFAULT_BACKEND, help=f'번역 백엔드 명령 (표준 입력으로 지침과 항목을 받아 항목마다 {{"id": ..., "ko": ...}} 줄 출력, 기본값: {DEFAULT_BACKEND})')
+    run_parser.add_argument('--instruction', default=DEFAULT_INSTRUCTION_PATH, help=f'배치 앞에 붙일 작업 지침 (기본값: {DEFAULT_INSTRUCTION_PATH})')
+    run_parser.add_argument('--references', default=DEFAULT_INDEX_PATH, help=f'참고 자료 검색 인덱스 (없으면 참고 자료 없이 보냄, 기본값: {DEFAULT_INDEX_PATH})')
+    run_parser.add_argument('--batch-size', type=int, default=BATCH_SIZE, help=f'배치당 항목 수 (기본값: {BATCH_SIZE})')
+    run_parser.add_argument('-j', '--jobs', type=int, default=BACKEND_WORKERS, help=f'동시에 실행할 백엔드 수 (기본값: {BACKEND_WORKERS})')
+    run_parser.add_argument('--max-attempts', type=int, default=MAX_ATTEMPTS, help=f'항목별 최대 시도 횟수 (기본값: {MAX_ATTEMPTS})')
+    run_parser.add_argument('--timeout', type=float, default=BACKEND_TIMEOUT, help=f'백엔드 호출 제한 시간 (초, 기본값: {BACKEND_TIMEOUT})')
+    run_parser.add_argument('--retry-failed', action='store_true', help='실패한 작업도 다시 보냄')
+    run_parser.add_argument('--no-merge', action='store_true', help='번역만 하고 매핑에 병합하지 않음')
+
+    sub_parsers.add_parser('merge', help='번역된 작업을 매핑에 병합')
+    sub_parsers.add_parser('status', help='상태별 작업 수 출력')
+    sub_parsers.add_parser('mock-backend', help='오프라인 테스트용 백엔드 (제안이 있는 항목만 제안을 그대로 응답)')
+
+    args = parser.parse_args()
+
+    if args.command == 'mock-backend':
+        sys.stdout.write(mock_backend(sys.stdin.read()))
+        return 0
+
+    mapping_path = Path(args.mapping)
+    with TranslationJobQueue(args.db) as queue:
+        if args.command == 'enqueue':
+            if args.untranslated_file == '-':
+                items = read_untranslated_items(sys.stdin)
+            else:
+                with open(args.untranslated_file, encoding='utf-8') as infile:
+                    items = read_untranslated_items(infile)
+            added, remerge = queue.enqueue(items)
+            print(f"번역되지 않은 항목 {len(items)}개 중 새 작업 {added}개, 다시 병합 {remerge}개")
+
+        elif args.command == 'run':
+            if args.retry_failed:
+                print(f"실패한 작업 다시 대기: {queue.retry_failed()}개")
+            if not os.path.exists(args.instruction):
+                print(f"작업 지침 파일이 없습니다: {args.instruction}")
+                return 1
+            instruction = Path(args.instruction).read_text(encoding='utf-8')
+            index = ReferenceIndex(args.references) if os.path.exists(args.references) else None
+            start = time.time()
+            try:
+                counts = run_jobs(queue, args.backend, instruction, index, args.batch_size, args.jobs,
+                                  args.max_attempts, args.timeout)
+            finally:
+                if index is not None:
+                    index.close()
+            print(f"캐시 사용: {counts['cached']}개, 보냄: {counts['sent']}개 (배치 {counts['batches']}개, 실패 {counts['failed_batches']}개), "
+                  f"번역: {counts['translated']}개, 거부: {counts['rejected']}개 ({time.time() - start:.1f}초)")
+            if not args.no_merge:
+                added, conflicts = merge_translations(queue, mapping_path)
+                print(f"매핑 병합: {added}개 추가, 기존 번역 유지 {conflicts}개 ({mapping_path})")
+
+        elif args.command == 'merge':
+            added, conflicts = merge_translations(queue, mapping_path)
+            print(f"매핑 병합: {added}개 추가, 기존 번역 유지 {conflicts}개 ({mapping_path})")
+
+        else:  # status
+            counts = queue.status_counts()
+            for status in (PENDING, DONE, MERGED, FAILED):
+                print(f"{status}: {counts.get(status, 0)}개")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
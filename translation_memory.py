@@ -0,0 +1,393 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import sys
+import re
+import json
+import argparse
+import unicodedata
+from collections import Counter
+from typing import Optional
+
+from reference_index import consonant_skeleton
+
+
+# 기존 번역 쌍에서 일본어 조각 ↔ 한국어 조각을 정렬해 배운 뒤, 번역이 없는 상품명을 조각 조합으로 제안하는 번역 메모리
+DEFAULT_MAPPING_PATH = "mapping/bandai_product_ja_ko_mapping.json"
+
+# 이 신뢰도 이상인 제안은 자동으로 번역으로 사용 (benchmark.py compose로 보류 데이터 정확도를 보고 정함)
+AUTO_ACCEPT_CONFIDENCE = 0.8
+# 표에 없는 영문/숫자 조각을 그대로 옮길 때의 신뢰도
+LATIN_COPY_CONFIDENCE = 0.95
+# 표에 없는 조각을 아는 조각들로 나눌 때 나눈 곳마다 곱하는 값
+SPLIT_PENALTY = 0.9
+
+# 조각 종류: 영문/숫자(형식번호, Ver. 등), 그리스 문자, 가타카나, 한자/히라가나, 한글 음절, 기호
+LATIN = 'latin'
+GREEK = 'greek'
+KATAKANA = 'katakana'
+KANJI = 'kanji'
+HANGUL = 'hangul'
+SYMBOL = 'symbol'
+
+JA_TOKEN_RE = re.compile(r"(?P<latin>[A-Za-z0-9][A-Za-z0-9.\-+:']*)|(?P<greek>[Ͱ-Ͽ]+)|(?P<katakana>[ァ-ヺー]+)"
+                         r"|(?P<kanji>[ぁ-ゖ々一-鿿]+)|(?P<symbol>[^\s・])")
+# 한국어는 음절 단위로 나눠 조각 경계가 단어 중간에 와도 정렬 (예: 건담용 = ガンダム + 用)
+KO_TOKEN_RE = re.compile(r"(?P<latin>[A-Za-z0-9][A-Za-z0-9.\-+:']*)|(?P<greek>[Ͱ-Ͽ]+)|(?P<hangul>[가-힣])|(?P<symbol>\S)")
+
+# 여는 괄호 뒤, 닫는 괄호/슬래시 앞뒤는 붙여 씀
+OPEN_SYMBOLS = '([【〔'
+CLOSE_SYMBOLS = ')]】〕'
+# NFKC로 바뀌지 않는 대시 (형식번호 TR−1 등)
+DASHES = str.maketrans('−‐‑–', '----')
+
+# 정렬 점수: 같은 조각 / 발음(자음 골격) 일치 / 정렬되지 않은 구간 / 건너뜀
+COPY_SCORE = 2
+GAP_SCORE = -1
+SKIP_SCORE = -2
+BOUNDARY_SCORE = 0.5   # 구간이 한국어 단어 경계에서 끝나면 더함 (같은 점수면 단어 단위로 정렬)
+MAX_SPAN_UNITS = 12
+MAX_GAP_UNITS = 6
+
+
+def tokenize(text: str, token_re: re.Pattern = JA_TOKEN_RE) -> list[tuple[str, str, bool]]:
+    """(조각, 종류, 앞에 공백 있음) 목록"""
+    tokens = []
+    end = 0
+    for m in token_re.finditer(unicodedata.normalize('NFKC', text).translate(DASHES)):
+        tokens.append((m.group(0), m.lastgroup, m.start() == 0 or m.start() > end))
+        end = m.end()
+    return tokens
+
+
+def phonetic_skeleton(text: str) -> str:
+    """자음 골격 (ング는 한글 받침 ㅇ과 맞도록 ン으로, ッ를 옮긴 받침 ㅅ은 생략: アッガイ = 앗가이)"""
+    text = ''.join(chr(ord(ch) - 19) if '가' <= ch <= '힣' and (ord(ch) - 0xAC00) % 28 == 19 else ch for ch in text)
+    return consonant_skeleton(text.replace('ング', 'ン'))
+
+
+def join_units(units: list[tuple[str, str, bool]]) -> str:
+    return ''.join((' ' if i and space else '') + text for i, (text, kind, space) in enumerate(units))
+
+
+# 조각 첫 글자가 될 수 없는 가나 (장음, 작은 가나, ン)
+NON_INITIAL_KANA = 'ーァィゥェォャュョヮッン'
+
+
+def starts_with_vowel(text: str) -> bool:
+    """첫 글자가 모음으로 시작하는지 (한글 초성 ㅇ, 자음 클래스가 없는 가나, 로마자 모음)"""
+    ch = text[0]
+    if '가' <= ch <= '힣':
+        return (ord(ch) - 0xAC00) // 588 == 11
+    if ch.isascii():
+        return ch.lower() in 'aeiou'
+    return not phonetic_skeleton(ch)
+
+
+def split_compound(katakana: str, words: list[str], known: set[str] = frozenset()) -> Optional[list[str]]:
+    """
+    가타카나 합성어를 한국어 단어별 자음 골격에 맞춰 나눔 (예: ストライクフリーダム → ストライク, フリーダム)
+    모음 가나는 골격에 없어 경계가 모호하므로, 조각 첫 글자의 모음/자음 여부를 한국어 단어와 맞추고
+    따로 쓰인 적이 있는 조각(known)이 가장 많은 분할, 같으면 앞 조각이 긴 분할을 고름
+    (예: ダブルオークアンタ → ダブルオー, クアンタ / ガンダムエアリアル → ガンダム, エアリアル)
+    """
+    skeletons = [phonetic_skeleton(word) for word in words]
+    if not all(skeletons):
+        return None
+
+    def splits(start: int, index: int):
+        if index == len(words):
+            if start == len(katakana):
+                yield []
+            return
+        if start == len(katakana) or katakana[start] in NON_INITIAL_KANA or starts_with_vowel(katakana[start]) != starts_with_vowel(words[index]):
+            return
+        for end in range(len(katakana), start, -1):
+            if phonetic_skeleton(katakana[start:end]) != skeletons[index]:
+                continue
+            for rest in splits(end, index + 1):
+                yield [katakana[start:end]] + rest
+
+    best = None
+    for pieces in splits(0, 0):
+        score = sum(piece in known for piece in pieces)
+        if best is None or score > best[0]:
+            best = (score, pieces)
+    return best[1] if best else None
+
+
+def align(ja_tokens: list[tuple[str, str, bool]], ko_units: list[tuple[str, str, bool]]) -> list[tuple]:
+    """
+    일본어 조각과 한국어 음절/조각을 순서대로 정렬 (동적 계획법)
+    같은 영문/기호, 자음 골격이 같은 가타카나 ↔ 한글 구간을 기준점으로 삼고, 기준점 사이의 나머지를 구간으로 대응
+    반환: (종류, 일본어 조각 번호, 한국어 시작, 한국어 끝) 목록, 종류: "copy", "phonetic", "gap", "skip"
+    """
+    n, m = len(ja_tokens), len(ko_units)
+    # 한글 자음 골격은 음절마다 독립이므로 음절별 골격을 이어 붙여 구간 골격을 만듦 (경계의 같은 자음은 하나로)
+    ja_skeletons = [phonetic_skeleton(text) if kind in (KATAKANA, LATIN) else '' for text, kind, _ in ja_tokens]
+    unit_skeletons = [phonetic_skeleton(text) if kind == HANGUL else None for text, kind, _ in ko_units]
+    boundaries = [j == m or ko_units[j][2] or ko_units[j][1] == SYMBOL for j in range(m + 1)]
+    best = [[None] * (m + 1) for _ in range(n + 1)]
+    best[0][0] = (0, None)
+    for i in range(n + 1):
+        for j in range(m + 1):
+            if best[i][j] is None:
+                continue
+            score = best[i][j][0]
+            moves = []
+            if i < n:
+                moves.append((SKIP_SCORE, i + 1, j, 'skip'))
+            if j < m:
+                moves.append((SKIP_SCORE, i, j + 1, 'skip'))
+            if i < n and j < m:
+                text, kind, _ = ja_tokens[i]
+                if kind != HANGUL and ko_units[j][1] == kind and ko_units[j][0].casefold() == text.casefold():
+                    moves.append((COPY_SCORE if kind != SYMBOL else 1, i + 1, j + 1, 'copy'))
+                if kind != SYMBOL:
+                    skeleton = ja_skeletons[i]
+                    span_skeleton = ''
+                    for k in range(1, min(MAX_SPAN_UNITS, m - j) + 1):
+                        unit_skeleton = unit_skeletons[j + k - 1]
+                        if ko_units[j + k - 1][1] == SYMBOL:
+                            break
+                        if unit_skeleton is None:
+                            skeleton = ''  # 한글이 아닌 조각이 섞인 구간은 발음 비교 안 함
+                        elif skeleton:
+                            if span_skeleton and unit_skeleton and span_skeleton[-1] == unit_skeleton[0]:
+                                unit_skeleton = unit_skeleton[1:]
+                            span_skeleton += unit_skeleton
+                            if span_skeleton == skeleton:
+                                moves.append((1 + len(skeleton) + BOUNDARY_SCORE * boundaries[j + k], i + 1, j + k, 'phonetic'))
+                        if k <= MAX_GAP_UNITS:
+                            moves.append((GAP_SCORE + BOUNDARY_SCORE * boundaries[j + k], i + 1, j + k, 'gap'))
+            for gain, next_i, next_j, move in moves:
+                if best[next_i][next_j] is None or score + gain > best[next_i][next_j][0]:
+                    best[next_i][next_j] = (score + gain, (i, j, move))
+
+    steps = []
+    i, j = n, m
+    while best[i][j][1] is not None:
+        prev_i, prev_j, move = best[i][j][1]
+        steps.append((move, prev_i if prev_i < i else None, prev_j, j))
+        i, j = prev_i, prev_j
+    steps.reverse()
+    return steps
+
+
+class TranslationMemory:
+    """
+    번역 매핑에서 배운 조각 번역표 (일본어 조각 → 한국어 조각별 횟수)
+    한국어 조각은 (텍스트, 앞 단어에 붙여 씀) 쌍으로 기록 (예: 用 → ("용", True))
+    """
+
+    def __init__(self):
+        self.segments: dict[str, Counter] = {}
+        self.aligned_pairs = 0
+        # 모든 쌍을 정렬한 뒤 나눌 가타카나 합성어 (가타카나 조각, 한국어 단어들, 붙여 씀)
+        self.compounds: list[tuple[str, list[str], bool]] = []
+
+    @classmethod
+    def from_mapping(cls, translation_data: dict[str, str]) -> "TranslationMemory":
+        memory = cls()
+        for ja, ko in sorted(translation_data.items()):
+            if ko:
+                memory.learn(ja, ko)
+        memory.learn_compounds()
+        return memory
+
+    def state(self) -> tuple:
+        """저장용 상태 (기본 자료형만 사용: 조각 → [(한국어 조각, 붙여 씀, 횟수), ...])"""
+        return ({ja: [(ko, joined, count) for (ko, joined), count in counts.items()] for ja, counts in self.segments.items()},
+                self.aligned_pairs)
+
+    @classmethod
+    def from_state(cls, state: tuple) -> "TranslationMemory":
+        """state()로 저장한 상태에서 복원 (다시 정렬하지 않음)"""
+        memory = cls()
+        segments, memory.aligned_pairs = state
+        memory.segments = {ja: Counter({(ko, joined): count for ko, joined, count in counts}) for ja, counts in segments.items()}
+        return memory
+
+    def add_segment(self, ja: str, ko: str, joined: bool) -> None:
+        self.segments.setdefault(ja, Counter())[(ko, joined)] += 1
+
+    def learn(self, ja: str, ko: str) -> None:
+        """번역 쌍 하나를 정렬해 조각 번역을 기록 (정렬되지 않은 구간은 앞뒤가 기준점일 때만 기록)"""
+        ja_tokens = tokenize(ja)
+        ko_units = tokenize(ko, KO_TOKEN_RE)
+        if not ja_tokens or not ko_units:
+            return
+        steps = align(ja_tokens, ko_units)
+        anchored = [move in ('copy', 'phonetic') for move, *_ in steps]
+        if not any(anchored):
+            return
+        self.aligned_pairs += 1
+
+        for index, (move, ja_index, ko_start, ko_end) in enumerate(steps):
+            if ja_index is None or move == 'skip':
+                continue
+            if move == 'gap':
+                before = index == 0 or anchored[index - 1]
+                after = index == len(steps) - 1 or anchored[index + 1]
+                if not (before and after):
+                    continue
+            # 건너뛴 한국어 음절과 같은 단어에 걸친 구간은 단어 일부만 대응한 것이므로 기록하지 않음
+            span = ko_units[ko_start:ko_end]
+            if index > 0 and steps[index - 1][0] == 'skip' and steps[index - 1][1] is None and not span[0][2]:
+                continue
+            if (index + 1 < len(steps) and steps[index + 1][0] == 'skip' and steps[index + 1][1] is None
+                    and ko_end < len(ko_units) and not ko_units[ko_end][2]):
+                continue
+            text, kind, _ = ja_tokens[ja_index]
+            joined = ko_start > 0 and not span[0][2]
+            ko_text = join_units(span)
+            self.add_segment(text, ko_text, joined)
+
+            # 가타카나 합성어는 한국어 띄어쓰기에 맞춰 나눈 조각도 기록 (learn_compounds)
+            words = ko_text.split(' ')
+            if move == 'phonetic' and kind == KATAKANA and len(words) > 1:
+                self.compounds.append((text, words, joined))
+
+    def learn_compounds(self) -> None:
+        """따로 쓰인 가타카나 조각을 기준으로 합성어를 나눠 조각 번역을 기록"""
+        known = {ja for ja in self.segments if len(ja) > 1}
+        for text, words, joined in self.compounds:
+            pieces = split_compound(text, words, known)
+            if pieces:
+                for piece_index, (piece, word) in enumerate(zip(pieces, words)):
+                    self.add_segment(piece, word, joined if piece_index == 0 else False)
+        self.compounds = []
+
+    def best_segment(self, ja: str) -> Optional[tuple[str, bool, float]]:
+        """
+        가장 많이 쓰인 (한국어 조각, 붙여 씀, 신뢰도), 신뢰도는 그 텍스트의 횟수/(전체 + 1)로 드물게 본 조각일수록 낮음
+        붙여 쓰기는 띄어쓰기 차이일 뿐이므로 같은 텍스트 안에서 많은 쪽을 사용
+        """
+        counts = self.segments.get(ja)
+        if not counts:
+            return None
+        text_counts = Counter()
+        for (ko, joined), count in counts.items():
+            text_counts[ko] += count
+        ko, count = max(text_counts.items(), key=lambda item: (item[1], item[0]))
+        joined = counts[(ko, True)] > counts[(ko, False)]
+        return ko, joined, count / (sum(text_counts.values()) + 1)
+
+    def translate_token(self, text: str, kind: str) -> Optional[list[tuple[str, bool, float]]]:
+        """조각 하나의 번역 (표에 없으면 아는 조각들로 나눔), 번역할 수 없으면 None"""
+        found = self.best_segment(text)
+        if found:
+            return [found]
+        if kind in (LATIN, SYMBOL):
+            return [(text, False, LATIN_COPY_CONFIDENCE)]
+        if kind not in (KATAKANA, KANJI):
+            return None
+
+        # 나눈 조각 신뢰도의 곱이 가장 큰 분할
+        best: list[Optional[tuple[float, list]]] = [None] * (len(text) + 1)
+        best[0] = (1.0, [])
+        for end in range(1, len(text) + 1):
+            for start in range(end):
+                if best[start] is None:
+                    continue
+                found = self.best_segment(text[start:end])
+                if not found:
+                    continue
+                confidence = best[start][0] * found[2] * (SPLIT_PENALTY if start else 1.0)
+                if best[end] is None or confidence > best[end][0]:
+                    pieces = best[start][1] + [(found[0], found[1] if not start else False, found[2] * (SPLIT_PENALTY if start else 1.0))]
+                    best[end] = (confidence, pieces)
+        return best[-1][1] if best[-1] else None
+
+    def propose(self, product_name: str) -> Optional[tuple[str, float]]:
+        """조각 조합으로 만든 (한국어 번역, 신뢰도), 번역할 수 없는 조각이 있으면 None"""
+        words = []
+        confidence = 1.0
+        previous = ''
+        translated = False
+        for text, kind, space in tokenize(product_name):
+            pieces = self.translate_token(text, kind)
+            if pieces is None:
+                return None
+            # 영문/숫자만 그대로 옮긴 이름은 제안하지 않음 (가나/한자/그리스 문자는 배운 조각으로만 번역됨)
+            translated = translated or kind in (KATAKANA, KANJI, GREEK)
+            for ko, joined, piece_confidence in pieces:
+                # 붙여 쓰기: 기호는 괄호 규칙, 한자 조각(用/型/機 등)은 배운 대로, 나머지는 띄어 씀
+                if kind == SYMBOL:
+                    joined = text in CLOSE_SYMBOLS or text == '/' or (text in OPEN_SYMBOLS and joined and not space)
+                elif kind != KANJI or space:
+                    joined = False
+                if previous in OPEN_SYMBOLS or previous == '/':
+                    joined = True
+                if words and not joined:
+                    words.append(' ')
+                words.append(ko)
+                confidence *= piece_confidence
+                previous = ko
+        if not translated:
+            return None
+        return ''.join(words), confidence
+
+
+def load_translation_memory(mapping_path: str = DEFAULT_MAPPING_PATH) -> TranslationMemory:
+    with open(mapping_path, encoding='utf-8') as infile:
+        translation_data = json.load(infile)
+    return TranslationMemory.from_mapping({unicodedata.normalize('NFKC', ja): ko for ja, ko in translation_data.items()})
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='번역 매핑에서 배운 조각을 조합해 번역을 제안하는 번역 메모리',
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog='''
+사용 예시:
+  python3 translation_memory.py propose "ガンダムエアリアル改修型"
+  python3 translation_memory.py propose - < untranslated.jsonl
+  python3 translation_memory.py segments --min-count 3
+        '''
+    )
+    parser.add_argument('-m', '--mapping', default=DEFAULT_MAPPING_PATH, help=f'번역 매핑 파일 (기본값: {DEFAULT_MAPPING_PATH})')
+    sub_parsers = parser.add_subparsers(dest='command', required=True)
+
+    propose_parser = sub_parsers.add_parser('propose', help='상품명의 번역 제안과 신뢰도 출력')
+    propose_parser.add_argument('product_name', nargs='+', help="일본어 상품명 ('-'이면 표준 입력의 상품명 줄 또는 번역되지 않은 항목 JSON Lines마다 제안)")
+
+    segments_parser = sub_parsers.add_parser('segments', help='배운 조각 번역표 출력')
+    segments_parser.add_argument('--min-count', type=int, default=1, help='이 횟수 이상 본 조각만 출력 (기본값: 1)')
+
+    args = parser.parse_args()
+    memory = load_translation_memory(args.mapping)
+
+    if args.command == 'segments':
+        for ja, counts in sorted(memory.segments.items()):
+            if sum(counts.values()) < args.min_count:
+                continue
+            ko, joined, confidence = memory.best_segment(ja)
+            print(f"{ja}\t{'~' if joined else ''}{ko}\t{confidence:.2f}\t{sum(counts.values())}")
+        return 0
+
+    if args.product_name == ['-']:
+        names = []
+        for line in sys.stdin:
+            line = line.strip()
+            if line.startswith('{'):
+                try:
+                    line = json.loads(line)['product_name']
+                except (ValueError, KeyError, TypeError):
+                    continue
+            if line:
+                names.append(line)
+    else:
+        names = [' '.join(args.product_name)]
+
+    for name in names:
+        proposal = memory.propose(name)
+        if proposal:
+            print(f"{name}\t{proposal[0]}\t{proposal[1]:.2f}")
+        else:
+            print(f"{name}\t\t0.00")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())